@@ -0,0 +1,54 @@
+"""
+Mesure du temps de résolution DC en fonction de la taille du circuit.
+
+Génère des maillages 2D de résistances (grille d'alimentation) alimentés par
+une source de tension dans un coin, puis chronomètre DCSolver avec les
+backends dense et creux. Sert à fixer solver.utils.SPARSE_THRESHOLD.
+
+Usage :
+    python benchmarks/bench_dc_scaling.py
+    python benchmarks/bench_dc_scaling.py --sizes 100 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solver.dc_solver import DCSolver
+from generators import build_mesh
+
+# Au-delà, la matrice dense ne tient plus raisonnablement en mémoire
+DENSE_MAX_NODES = 4000
+
+
+def time_solve(circuit, backend, repeat):
+    solver = DCSolver(backend=backend)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        solver.solve(circuit)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[25, 100, 200, 300, 400, 900, 2500, 10000, 40000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'noeuds':>8} {'dense (s)':>12} {'creux (s)':>12}")
+    for size in args.sizes:
+        circuit = build_mesh(size)
+        repeat = args.repeat if size <= 10000 else 1
+        dense = time_solve(circuit, "dense", repeat) if size <= DENSE_MAX_NODES else None
+        sparse = time_solve(circuit, "sparse", repeat)
+        dense_txt = f"{dense:12.5f}" if dense is not None else f"{'-':>12}"
+        print(f"{len(circuit.nodes):8d} {dense_txt} {sparse:12.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Mémoire par objet du modèle (Node, Wire, Dipole).
+
+Mesure avec tracemalloc l'allocation nette de N objets, connexions
+comprises, et l'affiche en octets par objet.
+
+Usage :
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --count 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.node import Node, Wire
+from model.components import Resistor, VoltageSourceAC
+
+
+def measure(factory, count):
+    """Octets alloués par objet créé par factory(i)"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args(argv)
+    count = args.count
+
+    nodes = [Node(i, i, 0) for i in range(count + 1)]
+    ground = Node(-1, 0, 0, is_ground=True)
+    cases = [
+        ("Node", lambda i: Node(i, i, 0)),
+        ("Wire", lambda i: Wire(i, nodes[i], nodes[i + 1])),
+        # Chaque résistance est reliée à un noeud distinct et à une masse commune
+        ("Resistor", lambda i: Resistor(i, nodes[i], ground)),
+        ("VoltageSourceAC", lambda i: VoltageSourceAC(i, nodes[i], ground)),
+    ]
+    print(f"{'objet':>16} {'octets/objet':>13}")
+    for name, factory in cases:
+        for node in nodes + [ground]:
+            node.connected_dipoles = []
+        print(f"{name:>16} {measure(factory, count):13.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Suite de benchmarks des phases du solveur sur circuits synthétiques.
+
+Pour chaque générateur (échelle, maillage 2D, graphe aléatoire, ligne RC)
+et chaque taille, mesure séparément (meilleur temps sur --repeat essais) :
+    group      regroupement des noeuds par les fils (_group_connected_nodes)
+    compile    compilation en NetlistView (index matriciels, tables)
+    assemble   assemblage MNA (triplets + matrice dense ou CSC)
+    factorize  factorisation LU
+    solve      résolution avec la factorisation
+    distribute recopie des résultats dans le modèle
+    to_json    sauvegarde JSON
+    load_json  chargement JSON
+
+Les résultats sont écrits en JSON (--output) ; --compare compare deux
+fichiers (ou un fichier de référence et la mesure courante) et signale les
+phases ralenties au-delà de --threshold. Le code de sortie vaut 1 en cas de
+régression, pour l'intégration continue.
+
+Usage :
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --generators mesh --sizes 1000 10000
+    python benchmarks/bench_suite.py --output new.json --compare bench.json
+    python benchmarks/bench_suite.py --compare bench.json new.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.circuit import Circuit
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC
+from solver.dc_solver import DCSolver
+from solver.utils import build_matrix, factorize, use_sparse
+from generators import GENERATORS
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+PHASES = ("group", "compile", "assemble", "factorize", "solve", "distribute", "to_json", "load_json")
+COMPONENT_CLASSES = {cls.__name__: cls for cls in (Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC)}
+
+# Taille maximale par générateur : la factorisation LU d'un graphe aléatoire
+# (expanseur) se remplit presque entièrement, 10^5 noeuds ne tiennent ni en
+# temps ni en mémoire (--no-size-limit pour passer outre)
+MAX_SIZES = {"random": 10000}
+
+# En dessous, les écarts relèvent du bruit de mesure et ne sont pas signalés
+MIN_SIGNIFICANT_TIME = 1e-3
+
+
+def best_time(func, repeat):
+    """Meilleur temps d'exécution et dernier résultat de func()"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_circuit(circuit, repeat):
+    """Temps de chaque phase pour un circuit"""
+    solver = DCSolver()
+    timings = {}
+    timings["group"], groups = best_time(lambda: solver._group_connected_nodes(circuit), repeat)
+    timings["compile"], view = best_time(lambda: solver._compile(circuit), repeat)
+    sparse = use_sparse(view.size, solver.backend, solver.sparse_threshold)
+
+    def assemble():
+        rows, cols, vals, rhs = view.assemble_dc()
+        return build_matrix(rows, cols, vals, view.size, sparse), rhs
+    timings["assemble"], (A, rhs) = best_time(assemble, repeat)
+    timings["factorize"], solve = best_time(lambda: factorize(A), repeat)
+    timings["solve"], x = best_time(lambda: solve(rhs), repeat)
+    timings["distribute"], _ = best_time(lambda: solver._distribute_results(circuit, view, x), repeat)
+    timings["to_json"], text = best_time(circuit.to_json, repeat)
+    timings["load_json"], _ = best_time(lambda: Circuit().load_from_json(text, COMPONENT_CLASSES), repeat)
+
+    nnz = A.nnz if hasattr(A, "nnz") else int(np.count_nonzero(A))
+    return {
+        "nodes": len(circuit.nodes),
+        "dipoles": len(circuit.dipoles),
+        "unknowns": int(view.size),
+        "nnz": int(nnz),
+        "backend": "sparse" if sparse else "dense",
+        "phases": timings,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    try:
+        import scipy
+        scipy_version = scipy.__version__
+    except ImportError:
+        scipy_version = None
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy_version,
+        "machine": platform.platform(),
+    }
+
+
+def run_suite(generators, sizes, repeat, verbose=True, size_limit=True):
+    results = []
+    for name in generators:
+        for size in sizes:
+            if size_limit and size > MAX_SIZES.get(name, size):
+                if verbose:
+                    print(f"{name:>8} {size:7d} ignoré (au-delà de {MAX_SIZES[name]} noeuds)")
+                continue
+            circuit = GENERATORS[name](size)
+            entry = {"generator": name, "size": size}
+            entry.update(bench_circuit(circuit, repeat if size <= 10000 else 1))
+            results.append(entry)
+            if verbose:
+                phases = " ".join(f"{entry['phases'][p]:9.5f}" for p in PHASES)
+                print(f"{name:>8} {entry['nodes']:7d} {entry['unknowns']:7d} {phases}")
+    return {"environment": environment(), "results": results}
+
+
+def compare(baseline, current, threshold):
+    """
+    Compare deux jeux de résultats phase par phase.
+    Retourne la liste des régressions (générateur, taille, phase, rapport).
+    """
+    reference = {(r["generator"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'circuit':>16} {'phase':>10} {'avant (s)':>11} {'après (s)':>11} {'rapport':>8}")
+    for entry in current["results"]:
+        key = (entry["generator"], entry["size"])
+        if key not in reference:
+            continue
+        for phase in PHASES:
+            before = reference[key]["phases"].get(phase)
+            after = entry["phases"].get(phase)
+            if before is None or after is None:
+                continue
+            ratio = after / before if before > 0 else float("inf")
+            flag = ""
+            if ratio > 1 + threshold and after > MIN_SIGNIFICANT_TIME:
+                regressions.append((key[0], key[1], phase, ratio))
+                flag = "  <- régression"
+            print(f"{key[0] + ' ' + str(key[1]):>16} {phase:>10} {before:11.5f} {after:11.5f} {ratio:8.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--generators", nargs="+", choices=sorted(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--compare", nargs="+", metavar="FICHIER",
+                        help="Référence (comparée à la mesure courante) ou deux fichiers à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Ralentissement relatif toléré avant de signaler une régression")
+    parser.add_argument("--no-size-limit", action="store_true", help="Ignore MAX_SIZES")
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare attend un ou deux fichiers")
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        print(f"{'circuit':>8} {'noeuds':>7} {'inconnues':>7} " + " ".join(f"{p:>9}" for p in PHASES))
+        current = run_suite(args.generators, args.sizes, args.repeat, size_limit=not args.no_size_limit)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        if not args.compare:
+            return 0
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Générateurs de circuits synthétiques pour les benchmarks.
+
+Chaque générateur prend un nombre de noeuds approximatif et retourne un
+Circuit avec une masse et une source DC, prêt à être résolu.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.circuit import Circuit
+from model.components import Resistor, Capacitor, VoltageSourceDC
+
+
+def build_ladder(num_nodes, resistance=100.0, shunt=1000.0, voltage=1.0):
+    """Échelle : résistances en série, chaque noeud relié à la masse"""
+    circuit = Circuit()
+    ground = circuit.create_node(0, -10, is_ground=True)
+    nodes = [circuit.create_node(10 * i, 0) for i in range(max(2, num_nodes - 1))]
+    circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), nodes[0], ground, dc_voltage=voltage))
+    for a, b in zip(nodes, nodes[1:]):
+        circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), a, b, resistance=resistance))
+        circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), b, ground, resistance=shunt))
+    return circuit
+
+
+def build_mesh(num_nodes, resistance=1.0, voltage=1.0):
+    """Maillage 2D de résistances alimenté dans un coin, chargé dans l'autre"""
+    side = max(2, int(round(num_nodes ** 0.5)))
+    circuit = Circuit()
+    grid = [[circuit.create_node(10 * i, 10 * j) for j in range(side)] for i in range(side)]
+    ground = circuit.create_node(-10, -10, is_ground=True)
+    for i in range(side):
+        for j in range(side):
+            if i + 1 < side:
+                circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), grid[i][j], grid[i + 1][j], resistance=resistance))
+            if j + 1 < side:
+                circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), grid[i][j], grid[i][j + 1], resistance=resistance))
+    circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), grid[0][0], ground, dc_voltage=voltage))
+    circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), grid[-1][-1], ground, resistance=resistance))
+    return circuit
+
+
+def build_random_graph(num_nodes, degree=3.0, seed=0, voltage=1.0):
+    """
+    Graphe aléatoire creux connexe : arbre couvrant aléatoire plus des
+    arêtes supplémentaires jusqu'à un degré moyen d'environ degree
+    """
+    rng = np.random.default_rng(seed)
+    circuit = Circuit()
+    count = max(2, num_nodes - 1)
+    ground = circuit.create_node(0, 0, is_ground=True)
+    nodes = [circuit.create_node(*rng.uniform(0, 1000, 2)) for _ in range(count)]
+    parents = [int(rng.integers(0, i)) for i in range(1, count)]
+    edges = list(zip(range(1, count), parents))
+    extra = max(0, int(count * degree / 2) - len(edges))
+    edges += zip(rng.integers(0, count, extra).tolist(), rng.integers(0, count, extra).tolist())
+    values = rng.uniform(10.0, 1000.0, len(edges))
+    for (a, b), value in zip(edges, values.tolist()):
+        if a != b:
+            circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), nodes[a], nodes[b], resistance=value))
+    circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), nodes[0], ground, dc_voltage=voltage))
+    circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), nodes[-1], ground, resistance=100.0))
+    return circuit
+
+
+def build_rc_line(num_nodes, resistance=10.0, capacitance=1e-9, voltage=1.0):
+    """Ligne RC distribuée : R en série, C vers la masse, terminée par une charge"""
+    circuit = Circuit()
+    ground = circuit.create_node(0, -10, is_ground=True)
+    nodes = [circuit.create_node(10 * i, 0) for i in range(max(2, num_nodes - 1))]
+    circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), nodes[0], ground, dc_voltage=voltage))
+    for a, b in zip(nodes, nodes[1:]):
+        circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), a, b, resistance=resistance))
+        circuit.add_dipole(Capacitor(circuit.get_next_dipole_id(), b, ground, capacitance=capacitance))
+    circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), nodes[-1], ground, resistance=1e3))
+    return circuit
+
+
+GENERATORS = {
+    "ladder": build_ladder,
+    "mesh": build_mesh,
+    "random": build_random_graph,
+    "rc_line": build_rc_line,
+}
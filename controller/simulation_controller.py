@@ -0,0 +1,84 @@
+import importlib
+
+
+class SimulationController:
+    """
+    Lance les analyses sur un circuit, indépendamment de l'interface.
+
+    Avec profile=True, chaque analyse est instrumentée par un SolverProfile
+    (temps par phase, taille et remplissage des matrices), consultable dans
+    last_profile ou écrit par dump_profile().
+
+    Les solveurs (et NumPy/SciPy) ne sont importés qu'à la première analyse.
+    """
+
+    ANALYSES = {
+        "dc": ("solver.dc_solver", "DCSolver"),
+        "transient": ("solver.transient_solver", "TransientSolver"),
+        "ac": ("solver.ac_solver", "ACAnalysis"),
+        "pss": ("solver.steady_state", "PeriodicSteadyState"),
+        "sweep": ("solver.sweep", "DCSweep"),
+    }
+
+    def __init__(self, circuit, profile=False, condition=False, allocations=False):
+        """
+        Args:
+            circuit (Circuit): Circuit simulé
+            profile (bool): Instrumente les analyses
+            condition (bool): Estime aussi le conditionnement des matrices
+            allocations (bool): Compte aussi les allocations par phase
+        """
+        self.circuit = circuit
+        self.profile = profile
+        self.condition = condition
+        self.allocations = allocations
+        self.last_result = None
+        self.last_profile = None
+
+    def run(self, analysis="dc", grid=None, cartesian=False, **options):
+        """
+        Args:
+            analysis (str): "dc", "transient", "ac", "pss" ou "sweep"
+            grid (dict): Valeurs balayées par l'analyse "sweep" (voir DCSweep.solve)
+            cartesian (bool): Produit cartésien des valeurs balayées
+            **options: Paramètres du solveur (dt, t_stop, f_start...)
+
+        Returns:
+            Résultat du solveur (None pour une analyse DC)
+        """
+        if analysis not in self.ANALYSES:
+            raise ValueError(f"Analyse inconnue : '{analysis}'")
+        solver = self.solver_class(analysis)(**options)
+        profile = None
+        if self.profile:
+            from solver.profiling import SolverProfile
+            profile = SolverProfile(condition=self.condition, allocations=self.allocations)
+            solver.add_observer(profile)
+        try:
+            if analysis == "sweep":
+                self.last_result = solver.solve(self.circuit, grid or {}, cartesian)
+            else:
+                self.last_result = solver.solve(self.circuit)
+        finally:
+            if profile is not None:
+                profile.close()
+                self.last_profile = profile
+        return self.last_result
+
+    @classmethod
+    def solver_class(cls, analysis):
+        module, name = cls.ANALYSES[analysis]
+        return getattr(importlib.import_module(module), name)
+
+    def dump_profile(self, path=None):
+        """
+        Écrit le profil de la dernière analyse en JSON dans path, ou
+        l'affiche sous forme de tableau si path est None.
+        """
+        if self.last_profile is None:
+            print("Attention: aucune analyse profilée")
+            return
+        if path is None:
+            print(self.last_profile.format())
+        else:
+            self.last_profile.dump(path)
@@ -0,0 +1,160 @@
+"""
+Export d'un Circuit en netlist SPICE (même sous-ensemble que io.importer).
+
+Les noeuds reliés par des fils forment un seul noeud SPICE, nommé "0" s'il
+contient la masse et "n<id>" sinon. Chaque bloc instancié devient une
+définition .subckt/.ends (la masse interne y reste le noeud global "0") et
+chaque instance une carte X. Les cartes sont écrites au fil de l'eau, sans
+construire le texte complet en mémoire.
+"""
+import re
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC
+from solver.netlist import group_connected_nodes
+
+# Lettre SPICE de chaque type de composant
+SPICE_LETTERS = {
+    Resistor: "R",
+    Capacitor: "C",
+    Inductor: "L",
+    VoltageSourceDC: "V",
+    VoltageSourceAC: "V",
+}
+
+# Noms affichés par défaut, jamais repris tels quels comme noms SPICE
+DEFAULT_NAMES = ("Resistor", "Capacitor", "Inductor", "DC Source", "AC Source")
+
+_SPICE_NAME = re.compile(r"^[A-Za-z][\w.:\[\]<>-]*$")
+_INVALID_CHARS = re.compile(r"[^\w.-]", re.ASCII)
+
+
+class SpiceExporter:
+    """
+    Écrit un Circuit au format SPICE.
+
+    Exemple :
+        SpiceExporter().save(circuit, "filtre.cir", title="Filtre RC")
+    """
+
+    def __init__(self):
+        self.warnings = []
+
+    def save(self, circuit, path, title=None):
+        with open(path, "w", encoding="utf-8") as f:
+            self.write(circuit, f, title)
+
+    def write(self, circuit, stream, title=None):
+        """
+        Écrit la netlist dans un flux texte.
+
+        Args:
+            circuit (Circuit): Circuit à exporter
+            stream: Fichier ouvert en écriture (ou io.StringIO)
+            title (str): Première ligne de la netlist
+        """
+        self.warnings = []
+        stream.write(f"{title or 'Circuit'}\n")
+        subckt_names = self._subckt_names(circuit)
+        for definition, name in subckt_names.values():
+            self._write_subckt(definition, name, subckt_names, stream)
+        self._write_body(circuit, subckt_names, stream)
+        stream.write(".end\n")
+
+    def _subckt_names(self, circuit):
+        # Définitions utilisées, les blocs imbriqués avant ceux qui les
+        # instancient : {id(définition): (définition, nom SPICE unique)}
+        names = {}
+        used = set()
+
+        def visit(definition):
+            if id(definition) in names:
+                return
+            for instance in definition.circuit.subcircuits.values():
+                visit(instance.definition)
+            name = _INVALID_CHARS.sub("_", definition.name) or "bloc"
+            while name.lower() in used:
+                name += "_"
+            used.add(name.lower())
+            names[id(definition)] = (definition, name)
+
+        for instance in circuit.subcircuits.values():
+            visit(instance.definition)
+        return names
+
+    def _write_subckt(self, definition, name, subckt_names, stream):
+        node_names = self._node_names(definition.circuit)
+        ports = " ".join(node_names[port.id] for port in definition.ports)
+        stream.write(f".subckt {name} {ports}\n")
+        self._write_body(definition.circuit, subckt_names, stream, node_names)
+        stream.write(f".ends {name}\n")
+
+    def _write_body(self, circuit, subckt_names, stream, node_names=None):
+        if node_names is None:
+            node_names = self._node_names(circuit)
+        used = set()
+        for dipole in circuit.dipoles.values():
+            card = self._card(dipole, node_names, used)
+            if card is not None:
+                stream.write(card)
+        for instance in circuit.subcircuits.values():
+            name = self._unique_name(instance.name, instance.id, "X", used)
+            nodes = " ".join(node_names[node.id] for node in instance.nodes)
+            stream.write(f"{name} {nodes} {subckt_names[id(instance.definition)][1]}\n")
+
+    def _node_names(self, circuit):
+        groups = group_connected_nodes(circuit)
+        ground_roots = {groups[n.id] for n in circuit.nodes.values() if n.is_ground}
+        return {node_id: "0" if root in ground_roots else f"n{root}"
+                for node_id, root in groups.items()}
+
+    def _card(self, dipole, node_names, used):
+        letter = SPICE_LETTERS.get(type(dipole))
+        if letter is None:
+            self._warn(f"{dipole.name} (ID={dipole.id}) : type {type(dipole).__name__} non exportable, ignoré")
+            return None
+        if dipole.node_a is None or dipole.node_b is None:
+            self._warn(f"{dipole.name} (ID={dipole.id}) : dipôle non connecté, ignoré")
+            return None
+        name = self._unique_name(dipole.name, dipole.id, letter, used)
+        nodes = f"{node_names[dipole.node_a.id]} {node_names[dipole.node_b.id]}"
+        if letter == "R":
+            value = _format(dipole.resistance)
+        elif letter == "C":
+            value = _format(dipole.capacitance)
+        elif letter == "L":
+            value = _format(dipole.inductance)
+        elif isinstance(dipole, VoltageSourceAC):
+            # SIN(VO VA FREQ TD THETA PHASE)
+            value = (f"SIN({_format(dipole.offset)} {_format(dipole.amplitude)} "
+                     f"{_format(dipole.frequency)} 0 0 {_format(dipole.phase)})")
+        else:
+            value = f"DC {_format(dipole.dc_voltage)}"
+        return f"{name} {nodes} {value}\n"
+
+    def _unique_name(self, name, item_id, letter, used):
+        # Le nom du dipôle (ou de l'instance) est gardé s'il est un nom SPICE
+        # valide et unique, préfixé de la lettre du type au besoin (X1.R1 -> RX1.R1)
+        if isinstance(name, str) and name not in DEFAULT_NAMES and _SPICE_NAME.match(name):
+            if name[0].upper() != letter:
+                name = letter + name
+        else:
+            name = f"{letter}{item_id}"
+        if name.lower() in used:
+            name = f"{letter}{item_id}"
+            while name.lower() in used:
+                name += "_"
+        used.add(name.lower())
+        return name
+
+    def _warn(self, message):
+        self.warnings.append(message)
+        print(f"Attention: {message}")
+
+
+def _format(value):
+    # repr : représentation la plus courte qui relit exactement le même float
+    return repr(float(value))
+
+
+def export_spice(circuit, path, title=None):
+    """Exporte un Circuit en netlist SPICE"""
+    SpiceExporter().save(circuit, path, title)
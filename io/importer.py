@@ -0,0 +1,377 @@
+"""
+Import de netlists SPICE (sous-ensemble).
+
+Éléments reconnus : R, C, L, V (DC ou SIN(...)) et X (instances de
+sous-circuits, aplaties à l'import). Directives : .include, .subckt/.ends,
+.end ; les autres directives (.tran, .op, .model...) sont ignorées.
+
+Le fichier est lu ligne à ligne (lignes de continuation "+" comprises) et
+le Circuit est construit en une passe : seules les définitions de
+sous-circuits et les instances X qui référencent un sous-circuit défini
+plus loin sont gardées en mémoire. Les noms de noeuds sont internés dans
+un dictionnaire ; "0" et "gnd" désignent la masse.
+"""
+import itertools
+import os
+import re
+from model.circuit import Circuit
+from model.node import Node
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC
+
+GROUND_NAMES = ("0", "gnd")
+
+# Multiplicateurs SPICE (la casse est ignorée : "M" est milli, "MEG" méga)
+SCALE_FACTORS = {
+    "t": 1e12, "g": 1e9, "meg": 1e6, "k": 1e3, "mil": 25.4e-6,
+    "m": 1e-3, "u": 1e-6, "n": 1e-9, "p": 1e-12, "f": 1e-15,
+}
+_NUMBER = re.compile(r"^([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmunpf])?", re.IGNORECASE)
+
+# Espacement des noeuds placés automatiquement sur le schéma
+LAYOUT_SPACING = 40.0
+LAYOUT_COLUMNS = 100
+
+
+def parse_value(token):
+    """Convertit une valeur SPICE ("4.7k", "1MEG", "10uF"...) en float"""
+    try:
+        return float(token)
+    except ValueError:
+        pass
+    match = _NUMBER.match(token)
+    if match is None:
+        raise ValueError(f"Valeur numérique invalide : '{token}'")
+    value = float(match.group(1))
+    suffix = match.group(2)
+    if suffix:
+        value *= SCALE_FACTORS[suffix.lower()]
+    return value
+
+
+def read_cards(path):
+    """
+    Générateur des cartes d'un fichier SPICE : (chemin, numéro de ligne, jetons).
+
+    Les commentaires ("*" en début de ligne, ";" ou "$" en fin de ligne) sont
+    retirés et les lignes de continuation "+" rattachées à la carte précédente.
+    La première ligne d'un fichier principal est le titre (voir SpiceImporter).
+    """
+    card, card_line = None, 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, 1):
+            for marker in (";", " $"):
+                cut = line.find(marker)
+                if cut >= 0:
+                    line = line[:cut]
+            line = line.strip()
+            if not line or line[0] == "*":
+                continue
+            if line[0] == "+":
+                if card is not None:
+                    card.extend(_tokenize(line[1:]))
+                continue
+            if card is not None:
+                yield path, card_line, card
+            card, card_line = _tokenize(line), line_number
+    if card is not None:
+        yield path, card_line, card
+
+
+def _tokenize(line):
+    # Parenthèses et virgules servent de séparateurs : SIN(0 1 50) -> SIN 0 1 50
+    if "(" in line or "," in line:
+        line = line.replace("(", " ").replace(")", " ").replace(",", " ")
+    return line.split()
+
+
+def _positional(tokens):
+    # Retire les paramètres nommés (r=1k, params:) d'une liste de jetons
+    return [t for t in tokens if "=" not in t and t.lower() != "params:"]
+
+
+class _Subcircuit:
+    """Définition .subckt gardée en mémoire jusqu'à son instanciation"""
+
+    def __init__(self, name, ports):
+        self.name = name
+        self.ports = ports
+        self.cards = []
+
+
+class SpiceImporter:
+    """
+    Construit un Circuit à partir d'une netlist SPICE.
+
+    Exemple :
+        circuit = SpiceImporter().load("filtre.cir")
+    """
+
+    def __init__(self):
+        self.title = None
+        self.warnings = []
+
+    def load(self, path, circuit=None):
+        """
+        Lit un fichier SPICE.
+
+        Args:
+            path (str): Fichier principal (sa première ligne est le titre)
+            circuit (Circuit): Circuit à remplir (vidé au préalable)
+
+        Returns:
+            Circuit: Le circuit importé
+        """
+        self.circuit = circuit if circuit is not None else Circuit()
+        self.circuit.clear()
+        self.title = None
+        self.warnings = []
+        self._nodes = {}
+        self._ground = None
+        self._subcircuits = {}
+        self._pending = []
+        self._active = set()
+        self._next_dipole_id = 1
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            self.title = f.readline().strip()
+        cards = read_cards(path)
+        first = next(cards, None)
+        # La première carte est le titre si elle est sur la première ligne
+        if first is not None and first[1] != 1:
+            cards = itertools.chain([first], cards)
+        self._process_all(self._expand(cards, {os.path.realpath(path)}))
+
+        # Instances X en attente : tous les .subckt sont maintenant connus
+        for card, scope in self._pending:
+            self._instantiate(card, scope, deferred=True)
+        self._pending = []
+
+        circuit = self.circuit
+        circuit._next_node_id = len(circuit.nodes) + 1
+        circuit._next_dipole_id = self._next_dipole_id
+        circuit.invalidate_spatial_index()
+        circuit._reset_change_log()
+        return circuit
+
+    def _expand(self, cards, active, included=False):
+        """
+        Cartes d'un fichier, chaque .include remplacé sur place par les cartes
+        du fichier inclus : un .include dans un .subckt complète ce .subckt.
+
+        Args:
+            active (set): Chemins résolus des fichiers en cours de lecture
+                (détection des inclusions circulaires)
+            included (bool): Fichier inclus, dont un .end ne termine que la
+                lecture
+        """
+        for card in cards:
+            tokens = card[2]
+            keyword = tokens[0].lower()
+            if keyword == ".end" and included:
+                return
+            if keyword != ".include" and keyword != ".inc":
+                yield card
+                continue
+            if len(tokens) < 2:
+                self._error(card, ".include sans fichier")
+            include = os.path.join(os.path.dirname(card[0]), tokens[1].strip("'\""))
+            resolved = os.path.realpath(include)
+            if resolved in active:
+                self._error(card, f"inclusion circulaire de '{tokens[1]}'")
+            active.add(resolved)
+            try:
+                yield from self._expand(read_cards(include), active, True)
+            finally:
+                active.discard(resolved)
+
+    def _process_all(self, cards):
+        subckt = None
+        for card in cards:
+            keyword = card[2][0].lower()
+            if subckt is not None:
+                if keyword == ".ends":
+                    subckt = None
+                elif keyword == ".subckt":
+                    self._error(card, "définitions .subckt imbriquées non supportées")
+                else:
+                    subckt.cards.append(card)
+                continue
+            if keyword == ".subckt":
+                tokens = card[2]
+                if len(tokens) < 2:
+                    self._error(card, ".subckt sans nom")
+                subckt = _Subcircuit(tokens[1].lower(), _positional(tokens[2:]))
+                self._subcircuits[subckt.name] = subckt
+            elif keyword == ".end":
+                break
+            else:
+                self._process(card, None)
+        if subckt is not None:
+            raise ValueError(f"{subckt.name} : .subckt sans .ends")
+
+    def _process(self, card, scope):
+        """
+        Traite une carte hors définition de sous-circuit.
+
+        Args:
+            scope (tuple): None au niveau principal, sinon (préfixe, {port: nom
+                de noeud extérieur}) pour une carte d'un sous-circuit instancié
+        """
+        tokens = card[2]
+        letter = tokens[0][0].lower()
+        if letter == ".":
+            # .include déjà développé (voir _expand), autres directives ignorées
+            return
+        if letter == "x":
+            self._instantiate(card, scope)
+        elif letter in "rclv":
+            self._add_element(card, scope)
+        else:
+            self._warn(card, f"élément '{tokens[0]}' non supporté, ignoré")
+
+    def _add_element(self, card, scope):
+        tokens = card[2]
+        name = tokens[0]
+        letter = name[0].lower()
+        if len(tokens) < (3 if letter == "v" else 4):
+            self._error(card, "élément incomplet")
+        node_a = self._node(tokens[1], scope)
+        node_b = self._node(tokens[2], scope)
+        if scope is not None:
+            name = scope[0] + name
+        values = tokens[3:]
+        if letter == "r":
+            dipole = Resistor(self._next_dipole_id, None, None, resistance=self._value(card, values[0]))
+        elif letter == "c":
+            dipole = Capacitor(self._next_dipole_id, None, None, capacitance=self._value(card, values[0]))
+        elif letter == "l":
+            dipole = Inductor(self._next_dipole_id, None, None, inductance=self._value(card, values[0]))
+        else:
+            dipole = self._voltage_source(card, values)
+        dipole.name = name
+        dipole.node_a = node_a
+        dipole.node_b = node_b
+        node_a.add_connection(dipole)
+        node_b.add_connection(dipole)
+        ax, ay = node_a.position
+        bx, by = node_b.position
+        dipole.position = ((ax + bx) / 2, (ay + by) / 2)
+        dipole._circuit = self.circuit
+        self.circuit.dipoles[dipole.id] = dipole
+        self._next_dipole_id += 1
+
+    def _voltage_source(self, card, values):
+        lowered = [v.lower() for v in values]
+        if "sin" in lowered:
+            start = lowered.index("sin") + 1
+            args = []
+            for token in values[start:]:
+                try:
+                    args.append(self._value(card, token))
+                except ValueError:
+                    break
+            if len(args) < 3:
+                self._error(card, "SIN(VO VA FREQ ...) incomplet")
+            # SIN(VO VA FREQ TD THETA PHASE) : TD et THETA ne sont pas modélisés
+            if len(args) > 3 and any(args[3:5]):
+                self._warn(card, "retard et amortissement de SIN ignorés")
+            phase = args[5] if len(args) > 5 else 0.0
+            return VoltageSourceAC(self._next_dipole_id, None, None, amplitude=args[1],
+                                   frequency=args[2], phase=phase, offset=args[0])
+        if "dc" in lowered:
+            start = lowered.index("dc") + 1
+            if start >= len(values):
+                self._error(card, "valeur DC manquante")
+            value = self._value(card, values[start])
+        elif values and lowered[0] not in ("ac", "pulse", "pwl", "exp"):
+            value = self._value(card, values[0])
+        else:
+            if values:
+                self._warn(card, f"forme de source '{values[0]}' non supportée, 0 V utilisé")
+            value = 0.0
+        return VoltageSourceDC(self._next_dipole_id, None, None, dc_voltage=value)
+
+    def _instantiate(self, card, scope, deferred=False):
+        tokens = _positional(card[2])
+        if len(tokens) < 2:
+            self._error(card, "instance de sous-circuit incomplète")
+        subckt = self._subcircuits.get(tokens[-1].lower())
+        if subckt is None:
+            if deferred:
+                self._error(card, f"sous-circuit '{tokens[-1]}' non défini")
+            # Le .subckt peut être défini plus loin dans le fichier
+            self._pending.append((card, scope))
+            return
+        connections = tokens[1:-1]
+        if len(connections) != len(subckt.ports):
+            self._error(card, f"{subckt.name} attend {len(subckt.ports)} noeuds, {len(connections)} donnés")
+        if subckt.name in self._active:
+            self._error(card, f"instanciation récursive de '{subckt.name}'")
+        prefix = (scope[0] if scope is not None else "") + tokens[0] + "."
+        ports = {}
+        for port, outer in zip(subckt.ports, connections):
+            ports[port.lower()] = self._resolve(outer, scope)
+        self._active.add(subckt.name)
+        try:
+            for inner in subckt.cards:
+                self._process(inner, (prefix, ports))
+        finally:
+            self._active.discard(subckt.name)
+
+    def _resolve(self, name, scope):
+        # Nom global (en minuscules) d'un noeud vu depuis un sous-circuit instancié
+        key = name.lower()
+        if key in GROUND_NAMES:
+            return "0"
+        if scope is None:
+            return key
+        outer = scope[1].get(key)
+        return outer if outer is not None else scope[0].lower() + key
+
+    def _node(self, name, scope):
+        # Noms de noeuds insensibles à la casse, comme en SPICE
+        name = self._resolve(name, scope)
+        node = self._nodes.get(name)
+        if node is None:
+            if name == "0":
+                if self._ground is None:
+                    self._ground = self._create_node(is_ground=True)
+                node = self._ground
+            else:
+                node = self._create_node()
+            self._nodes[name] = node
+        return node
+
+    def _create_node(self, is_ground=False):
+        nodes = self.circuit.nodes
+        index = len(nodes)
+        x = (index % LAYOUT_COLUMNS) * LAYOUT_SPACING
+        y = (index // LAYOUT_COLUMNS) * LAYOUT_SPACING
+        node = Node(index + 1, x, y, is_ground)
+        node._circuit = self.circuit
+        nodes[node.id] = node
+        return node
+
+    def _value(self, card, token):
+        try:
+            return parse_value(token)
+        except ValueError as e:
+            self._error(card, str(e))
+
+    def _warn(self, card, message):
+        message = f"{card[0]}:{card[1]}: {message}"
+        self.warnings.append(message)
+        print(f"Attention: {message}")
+
+    def _error(self, card, message):
+        raise ValueError(f"{card[0]}:{card[1]}: {message}")
+
+    @property
+    def node_names(self):
+        """{nom SPICE: Node} des noeuds importés"""
+        return dict(self._nodes)
+
+
+def import_spice(path, circuit=None):
+    """Importe une netlist SPICE dans un Circuit"""
+    return SpiceImporter().load(path, circuit)
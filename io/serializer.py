@@ -0,0 +1,315 @@
+"""
+Format binaire compact des circuits (.eslb).
+
+Disposition du fichier :
+    MAGIC (4 octets) | version (uint16) | réservé (uint16) | taille de
+    l'en-tête (uint32) | en-tête JSON (utf-8) | colonnes alignées sur 64 octets
+
+L'en-tête décrit chaque colonne (dtype, forme, position) et contient les
+tables de chaînes (noms, couleurs). Noeuds, fils et dipôles de chaque type
+sont stockés en colonnes (tableaux NumPy) ; la lecture passe par mmap,
+les colonnes sont des vues sans copie et les objets Python ne sont
+construits qu'à la demande. Le contenu est le même que celui de
+Circuit.to_json : un aller-retour binaire <-> JSON est sans perte.
+"""
+import json
+import mmap
+import struct
+import numpy as np
+from model.circuit import Circuit
+from model.node import Node, Wire
+
+MAGIC = b"ESLB"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<4sHHI")
+
+
+class _StringTable:
+    """Encodage par dictionnaire d'une colonne de chaînes"""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+
+def save_binary(circuit, path):
+    """Écrit un circuit au format binaire"""
+    columns = {}
+    strings = {}
+
+    def add_strings(name, values):
+        table = _StringTable()
+        columns[name] = np.fromiter((table.code(v) for v in values), dtype=np.uint32)
+        strings[name] = table.values
+
+    nodes = list(circuit.nodes.values())
+    columns["nodes/id"] = np.array([n.id for n in nodes], dtype=np.int64)
+    columns["nodes/x"] = np.array([n.position[0] for n in nodes], dtype=np.float64)
+    columns["nodes/y"] = np.array([n.position[1] for n in nodes], dtype=np.float64)
+    columns["nodes/is_ground"] = np.array([bool(n.is_ground) for n in nodes], dtype=np.uint8)
+    columns["nodes/potential"] = np.array([n.potential for n in nodes], dtype=np.float64)
+
+    wires = list(circuit.wires.values())
+    columns["wires/id"] = np.array([w.id for w in wires], dtype=np.int64)
+    columns["wires/node_a"] = np.array([w.node_a.id if w.node_a else -1 for w in wires], dtype=np.int64)
+    columns["wires/node_b"] = np.array([w.node_b.id if w.node_b else -1 for w in wires], dtype=np.int64)
+    add_strings("wires/color", (w.color for w in wires))
+
+    # Une table par type de dipôle ; "dipoles/order" garde l'ordre d'origine
+    by_type = {}
+    type_codes = {}
+    order_type = []
+    order_row = []
+    for dipole in circuit.dipoles.values():
+        type_name = type(dipole).__name__
+        if type_name not in by_type:
+            by_type[type_name] = []
+            type_codes[type_name] = len(type_codes)
+        group = by_type[type_name]
+        order_type.append(type_codes[type_name])
+        order_row.append(len(group))
+        group.append(dipole)
+    columns["dipoles/order_type"] = np.array(order_type, dtype=np.uint16)
+    columns["dipoles/order_row"] = np.array(order_row, dtype=np.int64)
+
+    types = {}
+    for type_name, dipoles in by_type.items():
+        prefix = f"dipoles/{type_name}/"
+        columns[prefix + "id"] = np.array([d.id for d in dipoles], dtype=np.int64)
+        columns[prefix + "node_a"] = np.array([d.node_a.id if d.node_a else -1 for d in dipoles], dtype=np.int64)
+        columns[prefix + "node_b"] = np.array([d.node_b.id if d.node_b else -1 for d in dipoles], dtype=np.int64)
+        columns[prefix + "x"] = np.array([d.position[0] for d in dipoles], dtype=np.float64)
+        columns[prefix + "y"] = np.array([d.position[1] for d in dipoles], dtype=np.float64)
+        columns[prefix + "rotation"] = np.array([d.rotation for d in dipoles], dtype=np.float64)
+        add_strings(prefix + "name", (d.name for d in dipoles))
+        params = [d.get_params() for d in dipoles]
+        numeric = {}
+        for key in params[0]:
+            values = [p.get(key) for p in params]
+            if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                columns[prefix + "param/" + key] = np.array(values, dtype=np.float64)
+                numeric[key] = True
+            else:
+                add_strings(prefix + "param/" + key, (json.dumps(v) for v in values))
+                numeric[key] = False
+        types[type_name] = {"count": len(dipoles), "params": numeric}
+
+    header = {
+        "json_version": "1.0",
+        "next_node_id": circuit._next_node_id,
+        "next_dipole_id": circuit._next_dipole_id,
+        "next_wire_id": circuit._next_wire_id,
+        "types": types,
+        "strings": strings,
+        "columns": {},
+    }
+    if circuit.subcircuits:
+        # Blocs peu nombreux et de petite taille : gardés dans l'en-tête
+        header["subcircuits"] = circuit.subcircuits_to_dict()
+    # Positions relatives au début de la zone de données (après l'en-tête)
+    offset = 0
+    for name, array in columns.items():
+        header["columns"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += _aligned(array.nbytes)
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - _PREFIX.size - len(header_bytes)))
+        for array in columns.values():
+            data = np.ascontiguousarray(array).tobytes()
+            f.write(data)
+            f.write(b"\0" * (_aligned(len(data)) - len(data)))
+
+
+def _aligned(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class BinaryCircuitFile:
+    """
+    Lecture d'un fichier binaire par mmap.
+
+    Les colonnes (column) sont des vues NumPy sur le fichier, sans copie ;
+    node(i), wire(i) et dipoles() construisent les objets à la demande, et
+    to_circuit() reconstruit un Circuit complet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._cache = {}
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Fichier vide
+            self._file.close()
+            raise ValueError(f"Fichier binaire de circuit invalide : {path}")
+        if len(self._map) < _PREFIX.size or self._map[:4] != MAGIC:
+            self.close()
+            raise ValueError(f"Fichier binaire de circuit invalide : {path}")
+        _, version, _, header_size = _PREFIX.unpack_from(self._map, 0)
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Version de format non supportée : {version}")
+        self.header = json.loads(bytes(self._map[_PREFIX.size:_PREFIX.size + header_size]).decode("utf-8"))
+        self._data_start = _aligned(_PREFIX.size + header_size)
+
+    def close(self):
+        self._cache.clear()
+        try:
+            self._map.close()
+        except (AttributeError, BufferError):
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name):
+        """Colonne brute (vue en lecture seule sur le fichier)"""
+        array = self._cache.get(name)
+        if array is None:
+            spec = self.header["columns"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+            array = np.frombuffer(self._map, dtype=dtype, count=count,
+                                  offset=self._data_start + spec["offset"]).reshape(spec["shape"])
+            self._cache[name] = array
+        return array
+
+    def strings(self, name):
+        """Colonne de chaînes décodée"""
+        table = self.header["strings"][name]
+        return [table[code] for code in self.column(name).tolist()]
+
+    @property
+    def node_count(self):
+        return len(self.column("nodes/id"))
+
+    @property
+    def wire_count(self):
+        return len(self.column("wires/id"))
+
+    @property
+    def dipole_count(self):
+        return len(self.column("dipoles/order_type"))
+
+    @property
+    def dipole_types(self):
+        return list(self.header["types"])
+
+    def node(self, index):
+        node = Node(int(self.column("nodes/id")[index]),
+                    float(self.column("nodes/x")[index]),
+                    float(self.column("nodes/y")[index]),
+                    bool(self.column("nodes/is_ground")[index]))
+        node._potential = float(self.column("nodes/potential")[index])
+        return node
+
+    def wire(self, index, nodes):
+        """Fil d'indice index ; nodes : {id: Node} des extrémités"""
+        return Wire(int(self.column("wires/id")[index]),
+                    nodes[int(self.column("wires/node_a")[index])],
+                    nodes[int(self.column("wires/node_b")[index])],
+                    self.header["strings"]["wires/color"][int(self.column("wires/color")[index])])
+
+    def to_circuit(self, component_classes, circuit=None):
+        """
+        Construit (ou remplit) un Circuit à partir du fichier.
+
+        Args:
+            component_classes (dict): {nom de type: classe}, comme pour
+                Circuit.load_from_json
+            circuit (Circuit): Circuit à remplir (vidé au préalable)
+        """
+        circuit = circuit if circuit is not None else Circuit()
+        circuit.clear()
+        header = self.header
+        circuit._next_node_id = header.get("next_node_id", 1)
+        circuit._next_dipole_id = header.get("next_dipole_id", 1)
+        circuit._next_wire_id = header.get("next_wire_id", 1)
+
+        nodes = circuit.nodes
+        for node_id, x, y, is_ground, potential in zip(
+                self.column("nodes/id").tolist(), self.column("nodes/x").tolist(),
+                self.column("nodes/y").tolist(), self.column("nodes/is_ground").tolist(),
+                self.column("nodes/potential").tolist()):
+            node = Node(node_id, x, y, bool(is_ground))
+            node._potential = potential
+            node._circuit = circuit
+            nodes[node_id] = node
+
+        for wire_id, a, b, color in zip(self.column("wires/id").tolist(), self.column("wires/node_a").tolist(),
+                                        self.column("wires/node_b").tolist(), self.strings("wires/color")):
+            node_a, node_b = nodes.get(a), nodes.get(b)
+            if node_a and node_b:
+                circuit.wires[wire_id] = Wire(wire_id, node_a, node_b, color)
+
+        for dipole in self.dipoles(component_classes, nodes):
+            dipole._circuit = circuit
+            circuit.dipoles[dipole.id] = dipole
+        if "subcircuits" in header:
+            circuit.load_subcircuits_from_dict(header["subcircuits"], component_classes)
+        circuit.invalidate_spatial_index()
+        circuit._reset_change_log()
+        return circuit
+
+    def dipoles(self, component_classes, nodes):
+        """Générateur des dipôles, dans l'ordre d'origine"""
+        type_names = self.dipole_types
+        tables = {}
+        for type_name in type_names:
+            if type_name not in component_classes:
+                print(f"Attention: Type de composant inconnu '{type_name}', ignoré.")
+                continue
+            tables[type_name] = self._dipole_table(type_name)
+
+        for type_code, row in zip(self.column("dipoles/order_type").tolist(),
+                                  self.column("dipoles/order_row").tolist()):
+            type_name = type_names[type_code]
+            table = tables.get(type_name)
+            if table is None:
+                continue
+            dipole_id, a, b, x, y, rotation, name, params = (column[row] for column in table)
+            cls = component_classes[type_name]
+            dipole = cls(dipole_id=dipole_id, name=name, node_a=nodes.get(a) if a >= 0 else None,
+                         node_b=nodes.get(b) if b >= 0 else None, x=x, y=y, rotation=rotation)
+            # Les constructeurs des composants imposent leur nom par défaut
+            dipole.name = name
+            dipole.set_params(params)
+            yield dipole
+
+    def _dipole_table(self, type_name):
+        prefix = f"dipoles/{type_name}/"
+        count = self.header["types"][type_name]["count"]
+        param_columns = {}
+        for key, numeric in self.header["types"][type_name]["params"].items():
+            if numeric:
+                param_columns[key] = self.column(prefix + "param/" + key).tolist()
+            else:
+                param_columns[key] = [json.loads(v) for v in self.strings(prefix + "param/" + key)]
+        params = [{key: values[k] for key, values in param_columns.items()} for k in range(count)]
+        return (self.column(prefix + "id").tolist(), self.column(prefix + "node_a").tolist(),
+                self.column(prefix + "node_b").tolist(), self.column(prefix + "x").tolist(),
+                self.column(prefix + "y").tolist(), self.column(prefix + "rotation").tolist(),
+                self.strings(prefix + "name"), params)
+
+
+def load_binary(path, component_classes, circuit=None):
+    """Charge un circuit depuis un fichier binaire"""
+    with BinaryCircuitFile(path) as reader:
+        return reader.to_circuit(component_classes, circuit)
@@ -0,0 +1,271 @@
+"""
+ElectricSystemLab en ligne de commande, sans interface graphique.
+
+Charge un ou plusieurs circuits (motifs glob acceptés), lance l'analyse
+demandée sur un pool de processus et écrit les résultats dans --output-dir :
+    <nom>.dc.json              potentiels des noeuds et courants des dipôles
+    <nom>.transient.npz        formes d'onde (times, potentials, currents...)
+    <nom>.sweep.npz            points du balayage
+    <nom>.<analyse>.profile.json  profil du solveur (avec --profile)
+
+Usage :
+    python main.py circuit.json
+    python main.py "circuits/**/*.json" --output-dir resultats --workers 4
+    python main.py circuit.cir --analysis transient --t-stop 1e-3 --profile
+    python main.py "*.cir" --analysis sweep --sweep 3=100:1000:10 --output-dir resultats
+"""
+import argparse
+import functools
+import glob
+import importlib.util
+import json
+import os
+import sys
+import time
+
+from model.circuit import Circuit
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC, Diode
+from controller.simulation_controller import SimulationController
+
+COMPONENT_CLASSES = {cls.__name__: cls for cls in (Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC,
+                                                   Diode)}
+
+SPICE_EXTENSIONS = (".cir", ".sp", ".spice", ".net")
+
+
+@functools.lru_cache(maxsize=None)
+def _io_module(name):
+    # Le paquet io/ du projet est masqué par le module io de la bibliothèque
+    # standard : chargé par son chemin, une seule fois par processus
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "io", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"esl_io_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_circuit(path):
+    """Charge un circuit JSON, binaire (.eslb) ou SPICE selon l'extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".eslb":
+        return _io_module("serializer").load_binary(path, COMPONENT_CLASSES)
+    if extension in SPICE_EXTENSIONS:
+        return _io_module("importer").import_spice(path)
+    circuit = Circuit()
+    with open(path) as f:
+        circuit.load_from_json(f.read(), COMPONENT_CLASSES)
+    return circuit
+
+
+def expand_inputs(patterns):
+    """Fichiers désignés par une liste de chemins ou de motifs glob, sans doublon"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"Attention: aucun fichier ne correspond à '{pattern}'")
+        paths.extend(path for path in matches if os.path.isfile(path) or not glob.has_magic(pattern))
+    return list(dict.fromkeys(paths))
+
+
+def parse_sweep(specs):
+    """
+    Grille de balayage à partir de spécifications DIPOLE[.PARAM]=DEBUT:FIN:POINTS
+    ou DIPOLE[.PARAM]=V1,V2,...
+    """
+    import numpy as np
+    grid = {}
+    for spec in specs or ():
+        key, _, values = spec.partition("=")
+        dipole_id, _, param = key.partition(".")
+        try:
+            if ":" in values:
+                start, stop, num = values.split(":")
+                vals = np.linspace(float(start), float(stop), int(num))
+            else:
+                vals = [float(v) for v in values.split(",")]
+            grid[(int(dipole_id), param) if param else int(dipole_id)] = vals
+        except ValueError:
+            raise ValueError(f"Balayage invalide : '{spec}' (attendu ID=DEBUT:FIN:POINTS ou ID=V1,V2,...)")
+    return grid
+
+
+def output_name(path, root):
+    """Nom de sortie : chemin relatif à la racine commune des entrées, sans extension"""
+    relative = os.path.relpath(os.path.abspath(path), root) if root else os.path.basename(path)
+    return os.path.splitext(relative)[0]
+
+
+def save_result(circuit, analysis, result, base):
+    """Écrit le résultat d'une analyse ; retourne le chemin du fichier"""
+    import numpy as np
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    if analysis == "dc":
+        path = f"{base}.dc.json"
+        data = {
+            "potentials": {str(node_id): node.potential for node_id, node in circuit.nodes.items()},
+            "currents": {str(dipole_id): dipole.current for dipole_id, dipole in circuit.dipoles.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    path = f"{base}.{analysis}.npz"
+    if analysis == "sweep":
+        arrays = {"parameters": np.array([f"{d}.{p}" for d, p in result.parameters]),
+                  "values": np.column_stack(list(result.parameters.values())),
+                  "potentials": result.potentials, "currents": result.currents}
+    elif analysis == "ac":
+        arrays = {"frequencies": result.frequencies, "potentials": result.node_phasors,
+                  "currents": result.dipole_phasors}
+    else:
+        arrays = {"times": result.times, "potentials": result.potentials, "currents": result.currents}
+    np.savez(path, node_ids=result.node_ids, dipole_ids=result.dipole_ids, **arrays)
+    return path
+
+
+def run_file(path, analysis="dc", options=None, grid=None, cartesian=False, output_dir=None, root=None,
+             profile=False, condition=False, allocations=False):
+    """
+    Charge, simule et sauvegarde un circuit.
+
+    Returns:
+        dict: Compte rendu (fichier, statut, durée, sorties, message d'erreur)
+    """
+    start = time.perf_counter()
+    report = {"input": path, "status": "ok", "outputs": []}
+    try:
+        circuit = load_circuit(path)
+        controller = SimulationController(circuit, profile=profile, condition=condition, allocations=allocations)
+        result = controller.run(analysis, grid=grid, cartesian=cartesian, **(options or {}))
+        if output_dir is not None:
+            base = os.path.join(output_dir, output_name(path, root))
+            report["outputs"].append(save_result(circuit, analysis, result, base))
+            if profile:
+                profile_path = f"{base}.{analysis}.profile.json"
+                controller.dump_profile(profile_path)
+                report["outputs"].append(profile_path)
+        else:
+            if analysis == "dc":
+                for node_id, node in circuit.nodes.items():
+                    print(f"noeud {node_id} : {node.potential:.6g} V")
+            if profile:
+                controller.dump_profile()
+    except Exception as e:
+        report["status"] = "erreur"
+        report["error"] = f"{type(e).__name__}: {e}"
+        # SingularCircuitError : noeuds et dipôles en cause
+        for attr in ("nodes", "dipoles"):
+            if hasattr(e, attr):
+                report[attr] = getattr(e, attr)
+    report["time"] = time.perf_counter() - start
+    return report
+
+
+# Paramètres du lot, transmis une fois par l'initialiseur du pool
+_worker_job = None
+
+
+def _init_worker(job):
+    global _worker_job
+    _worker_job = job
+
+
+def _run_worker_file(path):
+    return run_file(path, **_worker_job)
+
+
+def run_batch(paths, workers=None, **job):
+    """
+    Simule une liste de circuits, en parallèle sur workers processus (par
+    défaut os.cpu_count() ; 0 ou 1 pour tout traiter dans le processus
+    courant). Retourne les comptes rendus dans l'ordre des fichiers.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(paths) <= 1:
+        return [run_file(path, **job) for path in paths]
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths)), initializer=_init_worker,
+                             initargs=(job,)) as executor:
+        return list(executor.map(_run_worker_file, paths, chunksize=chunksize))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Fichiers ou motifs glob (.json, .eslb, .cir)")
+    parser.add_argument("--analysis", choices=sorted(SimulationController.ANALYSES), default="dc")
+    parser.add_argument("--output-dir", help="Dossier des résultats (sinon affichage seulement)")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (défaut : nombre de coeurs)")
+    parser.add_argument("--dt", type=float, help="Pas de temps de l'analyse transitoire (s)")
+    parser.add_argument("--t-stop", type=float, help="Durée de l'analyse transitoire (s)")
+    parser.add_argument("--sweep", action="append", metavar="ID[.PARAM]=DEBUT:FIN:POINTS",
+                        help="Valeurs balayées (répétable)")
+    parser.add_argument("--cartesian", action="store_true", help="Produit cartésien des balayages")
+    parser.add_argument("--backend", choices=("auto", "dense", "sparse"), default="auto")
+    parser.add_argument("--gmin", type=float, help="Analyse DC : conductance (S) reliant les noeuds flottants à la masse")
+    parser.add_argument("--fallback", action="store_true",
+                        help="Analyse DC : résolution dégradée (moindres carrés) d'un système singulier")
+    parser.add_argument("--report", help="Écrit les comptes rendus du lot en JSON dans ce fichier")
+    parser.add_argument("--profile", action="store_true", help="Profil du solveur par circuit")
+    parser.add_argument("--condition", action="store_true", help="Estime le conditionnement des matrices")
+    parser.add_argument("--allocations", action="store_true", help="Compte les allocations par phase")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("aucun circuit à simuler")
+
+    options = {"backend": args.backend}
+    if args.analysis == "transient":
+        if args.dt is not None:
+            options["dt"] = args.dt
+        if args.t_stop is not None:
+            options["t_stop"] = args.t_stop
+    elif args.dt is not None or args.t_stop is not None:
+        parser.error("--dt et --t-stop ne concernent que l'analyse transient")
+    if args.analysis == "dc":
+        if args.gmin is not None:
+            options["gmin"] = args.gmin
+        if args.fallback:
+            options["fallback"] = True
+    elif args.gmin is not None or args.fallback:
+        parser.error("--gmin et --fallback ne concernent que l'analyse dc")
+    if args.analysis == "ac" and len(paths) > 1:
+        # Les circuits sont déjà répartis sur les processus
+        options["workers"] = 1
+    try:
+        grid = parse_sweep(args.sweep)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.analysis == "sweep" and not grid:
+        parser.error("l'analyse sweep demande au moins un --sweep")
+
+    root = None
+    if len(paths) > 1:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    job = dict(analysis=args.analysis, options=options, grid=grid, cartesian=args.cartesian,
+               output_dir=args.output_dir, root=root, profile=args.profile,
+               condition=args.condition, allocations=args.allocations)
+
+    start = time.perf_counter()
+    reports = run_batch(paths, workers=args.workers, **job)
+    elapsed = time.perf_counter() - start
+
+    failures = [report for report in reports if report["status"] != "ok"]
+    for report in failures:
+        print(f"{report['input']} : {report['error']}")
+    print(f"{len(reports)} circuit(s) en {elapsed:.3f} s ({len(reports) / elapsed:.1f} circuits/s), "
+          f"{len(failures)} échec(s)")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"analysis": args.analysis, "time": elapsed, "circuits": reports}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
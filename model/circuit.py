@@ -1,6 +1,15 @@
 import json
+from bisect import bisect_right
 from .node import Node, Wire
 from .dipole import Dipole
+from .spatial import SpatialGrid, segment_distance_sq
+
+# Nombre maximal d'entrées conservées dans le journal des modifications
+MAX_CHANGE_LOG = 100000
+
+# Côté des cellules des index spatiaux (unités de la grille du schéma)
+SPATIAL_CELL_SIZE = 20.0
+
 class Circuit:
     """
     Classe principale représentant le circuit électrique complet
@@ -11,9 +20,25 @@ class Circuit:
         self.nodes = {} 
         self.dipoles = {}
         self.wires = {}
+        # Instances de sous-circuits (model.subcircuit.SubcircuitInstance)
+        self.subcircuits = {}
         self._next_node_id = 1
         self._next_dipole_id = 1
         self._next_wire_id = 1
+        self._next_subcircuit_id = 1
+        # Versions : topologie (noeuds, fils, dipôles), paramètres des dipôles
+        # et géométrie (positions sur le schéma)
+        self.topology_version = 0
+        self.parameter_version = 0
+        self.geometry_version = 0
+        # Journal (version, catégorie, id, topologique) des éléments modifiés
+        self._change_log = []
+        self._log_floor = 0
+        # Index spatiaux (construits à la première requête de sélection)
+        self._node_grid = None
+        self._dipole_grid = None
+        self._wire_grid = None
+        self._node_wires = None
 
     # Gestion des noeuds
 
@@ -21,20 +46,43 @@ class Circuit:
         node_id = self._next_node_id
         self._next_node_id += 1
         node = Node(node_id, x, y, is_ground)
+        node._circuit = self
         self.nodes[node_id] = node
+        if self._node_grid is not None:
+            self._node_grid.insert(node_id, *node.position)
+        self._topology_changed(nodes=(node_id,))
         return node
 
     def remove_node(self, node_id):
         node_id = int(node_id)
         if node_id in self.nodes:
-            del self.nodes[node_id]
+            self.nodes.pop(node_id)._circuit = None
+            if self._node_grid is not None:
+                self._node_grid.remove(node_id)
+            self._topology_changed(nodes=(node_id,))
+
+    def move_node(self, node_id, x, y):
+        """Déplace un noeud en gardant les index spatiaux à jour"""
+        node = self.nodes[int(node_id)]
+        node.position = (float(x), float(y))
+        if self._node_grid is not None:
+            self._node_grid.insert(node.id, *node.position)
+            for wire_id in self._node_wires.get(node.id, ()):
+                self._index_wire(self.wires[wire_id])
+        self.geometry_version += 1
+        self._log("node", node.id, False)
 
     def get_node_at(self, x, y, tolerance=10.0):
-        for node in self.nodes.values():
+        """Noeud le plus proche de (x, y) à moins de tolerance, sinon None"""
+        self._ensure_spatial_index()
+        best, best_dist = None, tolerance ** 2
+        for node_id in self._node_grid.candidates(x, y, tolerance):
+            node = self.nodes[node_id]
             nx, ny = node.position
-            if (nx - x)**2 + (ny - y)**2 <= tolerance**2:
-                return node
-        return None
+            dist = (nx - x) ** 2 + (ny - y) ** 2
+            if dist <= best_dist and (best is None or dist < best_dist or node_id < best.id):
+                best, best_dist = node, dist
+        return best
     
     # Gestion des Fils
 
@@ -45,13 +93,33 @@ class Circuit:
         self._next_wire_id += 1
         wire = Wire(wire_id, node_a, node_b)
         self.wires[wire_id] = wire
+        if self._wire_grid is not None:
+            self._index_wire(wire)
+        self._topology_changed(nodes=(node_a.id, node_b.id), wires=(wire_id,))
         return wire
     
     def remove_wire(self, wire_id):
         wire_id = int(wire_id)
         if wire_id in self.wires:
-            self.wires[wire_id].disconnect()
+            wire = self.wires[wire_id]
+            nodes = [n.id for n in (wire.node_a, wire.node_b) if n]
+            if self._wire_grid is not None:
+                self._unindex_wire(wire)
+            wire.disconnect()
             del self.wires[wire_id]
+            self._topology_changed(nodes=nodes, wires=(wire_id,))
+
+    def get_wire_at(self, x, y, tolerance=5.0):
+        """Fil le plus proche de (x, y) à moins de tolerance, sinon None"""
+        self._ensure_spatial_index()
+        best, best_dist = None, tolerance ** 2
+        for wire_id in self._wire_grid.candidates(x, y, tolerance):
+            wire = self.wires[wire_id]
+            (ax, ay), (bx, by) = wire.node_a.position, wire.node_b.position
+            dist = segment_distance_sq(x, y, ax, ay, bx, by)
+            if dist <= best_dist and (best is None or dist < best_dist or wire_id < best.id):
+                best, best_dist = wire, dist
+        return best
 
     # Gestion des Dipôles
 
@@ -61,18 +129,174 @@ class Circuit:
         if dipole.node_b and dipole.node_b.id not in self.nodes:
             raise ValueError(f"Le Node B ({dipole.node_b.id}) n'existe pas dans ce circuit.")
         self.dipoles[dipole.id] = dipole
+        dipole._circuit = self
+        if self._dipole_grid is not None:
+            self._dipole_grid.insert(dipole.id, *dipole.position)
         if dipole.id >= self._next_dipole_id:
             self._next_dipole_id = dipole.id + 1
+        nodes = [n.id for n in (dipole.node_a, dipole.node_b) if n]
+        self._topology_changed(nodes=nodes, dipoles=(dipole.id,))
 
     def remove_dipole(self, dipole_id):
         dipole_id = int(dipole_id)
         if dipole_id in self.dipoles:
-            self.dipoles[dipole_id].disconnect()
+            dipole = self.dipoles[dipole_id]
+            nodes = [n.id for n in (dipole.node_a, dipole.node_b) if n]
+            dipole.disconnect()
+            dipole._circuit = None
             del self.dipoles[dipole_id]
+            if self._dipole_grid is not None:
+                self._dipole_grid.remove(dipole_id)
+            self._topology_changed(nodes=nodes, dipoles=(dipole_id,))
+
+    def move_dipole(self, dipole_id, x, y):
+        """Déplace un dipôle en gardant l'index spatial à jour"""
+        dipole = self.dipoles[int(dipole_id)]
+        dipole.position = (float(x), float(y))
+        if self._dipole_grid is not None:
+            self._dipole_grid.insert(dipole.id, *dipole.position)
+        self.geometry_version += 1
+        self._log("dipole", dipole.id, False)
+
+    def get_dipole_at(self, x, y, tolerance=20.0):
+        """Dipôle dont le centre est le plus proche de (x, y) à moins de tolerance"""
+        self._ensure_spatial_index()
+        best, best_dist = None, tolerance ** 2
+        for dipole_id in self._dipole_grid.candidates(x, y, tolerance):
+            dipole = self.dipoles[dipole_id]
+            dx, dy = dipole.position
+            dist = (dx - x) ** 2 + (dy - y) ** 2
+            if dist <= best_dist and (best is None or dist < best_dist or dipole_id < best.id):
+                best, best_dist = dipole, dist
+        return best
 
     def get_next_dipole_id(self):
         return self._next_dipole_id
 
+    # Gestion des sous-circuits
+
+    def add_subcircuit(self, instance):
+        for node in instance.nodes:
+            if node.id not in self.nodes:
+                raise ValueError(f"Le noeud {node.id} n'existe pas dans ce circuit.")
+        self.subcircuits[instance.id] = instance
+        if instance.id >= self._next_subcircuit_id:
+            self._next_subcircuit_id = instance.id + 1
+        self._topology_changed(nodes=[n.id for n in instance.nodes], subcircuits=(instance.id,))
+
+    def remove_subcircuit(self, instance_id):
+        instance_id = int(instance_id)
+        if instance_id in self.subcircuits:
+            instance = self.subcircuits.pop(instance_id)
+            self._topology_changed(nodes=[n.id for n in instance.nodes], subcircuits=(instance_id,))
+
+    def get_next_subcircuit_id(self):
+        return self._next_subcircuit_id
+
+    def flattened(self):
+        """Copie du circuit où les sous-circuits sont remplacés par leur contenu"""
+        from .subcircuit import flatten
+        return flatten(self)
+
+    # Index spatiaux
+
+    def _ensure_spatial_index(self):
+        if self._node_grid is not None:
+            return
+        self._node_grid = SpatialGrid(SPATIAL_CELL_SIZE)
+        self._dipole_grid = SpatialGrid(SPATIAL_CELL_SIZE)
+        self._wire_grid = SpatialGrid(SPATIAL_CELL_SIZE)
+        self._node_wires = {}
+        for node in self.nodes.values():
+            self._node_grid.insert(node.id, *node.position)
+        for dipole in self.dipoles.values():
+            self._dipole_grid.insert(dipole.id, *dipole.position)
+        for wire in self.wires.values():
+            self._index_wire(wire)
+
+    def invalidate_spatial_index(self):
+        """
+        À appeler si des positions ont été modifiées sans passer par
+        move_node / move_dipole : l'index sera reconstruit à la prochaine requête
+        """
+        self._node_grid = None
+        self._dipole_grid = None
+        self._wire_grid = None
+        self._node_wires = None
+
+    def _index_wire(self, wire):
+        if not wire.node_a or not wire.node_b:
+            return
+        (ax, ay), (bx, by) = wire.node_a.position, wire.node_b.position
+        self._wire_grid.insert_segment(wire.id, ax, ay, bx, by)
+        for node in (wire.node_a, wire.node_b):
+            self._node_wires.setdefault(node.id, set()).add(wire.id)
+
+    def _unindex_wire(self, wire):
+        self._wire_grid.remove(wire.id)
+        for node in (wire.node_a, wire.node_b):
+            if node:
+                self._node_wires.get(node.id, set()).discard(wire.id)
+
+    # Suivi des modifications
+
+    @property
+    def version(self):
+        """Version globale, croissante à chaque modification enregistrée"""
+        return self.topology_version + self.parameter_version + self.geometry_version
+
+    def mark_parameters_changed(self, dipole):
+        """Signale la modification des paramètres d'un dipôle (appelé par Dipole)"""
+        self.parameter_version += 1
+        self._log("dipole", dipole.id, False)
+
+    def mark_ground_changed(self, node):
+        """Signale qu'un noeud devient (ou n'est plus) la masse (appelé par Node)"""
+        self._topology_changed(nodes=(node.id,))
+
+    def changes_since(self, version):
+        """
+        Éléments modifiés depuis une version donnée de Circuit.version.
+
+        Returns:
+            dict: {"topology": bool, "nodes": set, "wires": set, "dipoles": set,
+            "subcircuits": set},
+            ou None si le journal ne remonte plus jusqu'à cette version (les
+            structures dérivées doivent alors être entièrement reconstruites)
+        """
+        if version < self._log_floor:
+            return None
+        changes = {"topology": False, "nodes": set(), "wires": set(), "dipoles": set(), "subcircuits": set()}
+        start = bisect_right(self._change_log, version, key=lambda entry: entry[0])
+        for _, category, item_id, topological in self._change_log[start:]:
+            changes[category + "s"].add(item_id)
+            changes["topology"] |= topological
+        return changes
+
+    def _topology_changed(self, nodes=(), wires=(), dipoles=(), subcircuits=()):
+        self.topology_version += 1
+        for node_id in nodes:
+            self._log("node", node_id, True)
+        for wire_id in wires:
+            self._log("wire", wire_id, True)
+        for dipole_id in dipoles:
+            self._log("dipole", dipole_id, True)
+        for instance_id in subcircuits:
+            self._log("subcircuit", instance_id, True)
+
+    def _log(self, category, item_id, topological):
+        self._change_log.append((self.version, category, item_id, topological))
+        if len(self._change_log) > MAX_CHANGE_LOG:
+            # On oublie la moitié la plus ancienne du journal
+            dropped = self._change_log[:MAX_CHANGE_LOG // 2]
+            del self._change_log[:MAX_CHANGE_LOG // 2]
+            self._log_floor = dropped[-1][0]
+
+    def _reset_change_log(self):
+        self.topology_version += 1
+        self._change_log.clear()
+        self._log_floor = self.version
+
     # Méthodes pour le Solveur
 
     def get_ground_node(self):
@@ -91,31 +315,70 @@ class Circuit:
         self.nodes.clear()
         self.dipoles.clear()
         self.wires.clear()
+        self.subcircuits.clear()
         self._next_node_id = 1
         self._next_dipole_id = 1
         self._next_wire_id = 1
+        self._next_subcircuit_id = 1
+        self.invalidate_spatial_index()
+        self._reset_change_log()
 
     # Sauvegarde / Chargement (JSON)
 
     def to_json(self):
+        return json.dumps(self.to_dict(), indent=4)
+
+    def to_dict(self):
         data = {
             "version": "1.0",
             "next_node_id": self._next_node_id,
             "next_dipole_id": self._next_dipole_id,
+            "next_wire_id": self._next_wire_id,
             "nodes": [n.to_dict() for n in self.nodes.values()],
             "wires": [w.to_dict() for w in self.wires.values()],
             "dipoles": [d.to_dict() for d in self.dipoles.values()]
         }
-        return json.dumps(data, indent=4)
+        if self.subcircuits:
+            data.update(self.subcircuits_to_dict())
+        return data
+
+    def subcircuits_to_dict(self):
+        """Définitions (une par nom) et instances des sous-circuits"""
+        definitions = {}
+        for instance in self.subcircuits.values():
+            definition = instance.definition
+            known = definitions.get(definition.name)
+            if known is not None and known is not definition:
+                raise ValueError(f"Deux sous-circuits différents portent le nom '{definition.name}'.")
+            definitions[definition.name] = definition
+        return {
+            "next_subcircuit_id": self._next_subcircuit_id,
+            "subcircuit_definitions": [d.to_dict() for d in definitions.values()],
+            "subcircuits": [i.to_dict() for i in self.subcircuits.values()]
+        }
+
+    def load_subcircuits_from_dict(self, data, component_classes):
+        from .subcircuit import SubcircuitDefinition, SubcircuitInstance
+        definitions = {}
+        for definition_data in data.get("subcircuit_definitions", ()):
+            definition = SubcircuitDefinition.from_dict(definition_data, component_classes)
+            definitions[definition.name] = definition
+        for instance_data in data.get("subcircuits", ()):
+            instance = SubcircuitInstance.from_dict(instance_data, definitions, self.nodes)
+            self.subcircuits[instance.id] = instance
+        self._next_subcircuit_id = data.get("next_subcircuit_id", 1)
 
     def load_from_json(self, json_str, component_classes):
+        self.load_from_dict(json.loads(json_str), component_classes)
+
+    def load_from_dict(self, data, component_classes):
         self.clear()
-        data = json.loads(json_str)
         self._next_node_id = data.get("next_node_id", 1)
         self._next_dipole_id = data.get("next_dipole_id", 1)
         self._next_wire_id = data.get("next_wire_id", 1)
         for node_data in data["nodes"]:
             node = Node.from_dict(node_data)
+            node._circuit = self
             self.nodes[node.id] = node
         if "wires" in data:
             for wire_data in data["wires"]:
@@ -127,9 +390,13 @@ class Circuit:
             if dtype in component_classes:
                 cls = component_classes[dtype]
                 dipole = cls.from_dict(dipole_data, self.nodes)
+                dipole._circuit = self
                 self.dipoles[dipole.id] = dipole
             else:
                 print(f"Attention: Type de composant inconnu '{dtype}', ignoré.")
+        self.load_subcircuits_from_dict(data, component_classes)
+        self.invalidate_spatial_index()
+        self._reset_change_log()
 
     def __repr__(self):
         return (f"<Circuit: {len(self.nodes)} nodes, "
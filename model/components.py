@@ -5,6 +5,9 @@ class Resistor(Dipole):
     """
     Résistance idéale
     """
+    PARAM_ATTRS = ("resistance",)
+    __slots__ = PARAM_ATTRS
+
     def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="Resistor", resistance=1000.0):
         super().__init__(dipole_id, "Resistor", node_a, node_b, x, y, rotation)
         self.resistance = float(resistance)
@@ -20,6 +23,9 @@ class Capacitor(Dipole):
     """
     Condensateur idéal
     """
+    PARAM_ATTRS = ("capacitance",)
+    __slots__ = PARAM_ATTRS
+
     def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="Capacitor", capacitance=1e-6):
         super().__init__(dipole_id, "Capacitor", node_a, node_b, x, y, rotation)
         self.capacitance = float(capacitance)
@@ -35,6 +41,9 @@ class Inductor(Dipole):
     """
     Bobine (Inductance) idéale
     """
+    PARAM_ATTRS = ("inductance",)
+    __slots__ = PARAM_ATTRS
+
     def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="Inductor", inductance=1e-3):
         super().__init__(dipole_id, "Inductor", node_a, node_b, x, y, rotation)
         self.inductance = float(inductance)
@@ -49,6 +58,9 @@ class VoltageSourceDC(Dipole):
     """
     Source de tension continue idéale (Générateur DC)
     """
+    PARAM_ATTRS = ("dc_voltage",)
+    __slots__ = PARAM_ATTRS
+
     def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="VoltageSourceDC", dc_voltage=5.0):
         super().__init__(dipole_id, "DC Source", node_a, node_b, x, y, rotation)
         self.dc_voltage = float(dc_voltage)
@@ -64,6 +76,9 @@ class VoltageSourceAC(Dipole):
     """
     Source de tension alternative sinusoïdale
     """
+    PARAM_ATTRS = ("amplitude", "frequency", "phase", "offset")
+    __slots__ = PARAM_ATTRS
+
     def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="VoltageSourceAC", 
                  amplitude=10.0, frequency=50.0, phase=0.0, offset=0.0):
         super().__init__(dipole_id, "AC Source", node_a, node_b, x, y, rotation)
@@ -89,4 +104,62 @@ class VoltageSourceAC(Dipole):
         self.amplitude = float(params.get("amplitude", 10.0))
         self.frequency = float(params.get("frequency", 50.0))
         self.phase = float(params.get("phase", 0.0))
-        self.offset = float(params.get("offset", 0.0))
\ No newline at end of file
+        self.offset = float(params.get("offset", 0.0))
+
+class Diode(Dipole):
+    """
+    Diode à jonction, modèle de Shockley : i = Is (exp(v / (n Vt)) - 1),
+    avec v = V(anode) - V(cathode), l'anode étant node_a.
+    """
+    PARAM_ATTRS = ("saturation_current", "emission_coefficient")
+    __slots__ = PARAM_ATTRS
+    NONLINEAR = True
+
+    # Tension thermique kT/q à 300 K (V)
+    THERMAL_VOLTAGE = 0.025852
+    # Au-delà de v / (n Vt) = MAX_EXPONENT, la caractéristique est prolongée
+    # par sa tangente (pas de dépassement de capacité des flottants)
+    MAX_EXPONENT = 80.0
+
+    def __init__(self, dipole_id, node_a, node_b, x=0.0, y=0.0, rotation=0.0, name="Diode",
+                 saturation_current=1e-14, emission_coefficient=1.0):
+        super().__init__(dipole_id, "Diode", node_a, node_b, x, y, rotation)
+        self.saturation_current = float(saturation_current)
+        self.emission_coefficient = float(emission_coefficient)
+
+    def get_params(self):
+        return {"saturation_current": self.saturation_current, "emission_coefficient": self.emission_coefficient}
+
+    def set_params(self, params):
+        self.saturation_current = float(params.get("saturation_current", 1e-14))
+        self.emission_coefficient = float(params.get("emission_coefficient", 1.0))
+
+    @classmethod
+    def companion_model(cls, params, voltage):
+        import numpy as np
+        i_s = params[:, 0]
+        n_vt = params[:, 1] * cls.THERMAL_VOLTAGE
+        x = voltage / n_vt
+        clipped = np.minimum(x, cls.MAX_EXPONENT)
+        e = np.exp(clipped)
+        current = i_s * (e * (1.0 + x - clipped) - 1.0)
+        g = i_s * e / n_vt
+        return g, current - g * voltage
+
+    @classmethod
+    def limit_voltage(cls, params, voltage, previous):
+        # Limitation de jonction (pnjlim de SPICE) : au-dessus de la tension
+        # critique, un pas de plus de 2 n Vt suit la caractéristique en
+        # logarithme au lieu de l'exponentielle
+        import numpy as np
+        i_s = params[:, 0]
+        n_vt = params[:, 1] * cls.THERMAL_VOLTAGE
+        v_crit = n_vt * np.log(n_vt / (math.sqrt(2.0) * i_s))
+        large = (voltage > v_crit) & (np.abs(voltage - previous) > 2.0 * n_vt)
+        if not np.any(large):
+            return voltage
+        arg = 1.0 + (voltage - previous) / n_vt
+        from_forward = np.where(arg > 0, previous + n_vt * np.log(np.maximum(arg, 1e-300)), v_crit)
+        from_reverse = n_vt * np.log(np.maximum(voltage / n_vt, 1e-300))
+        limited = np.where(previous > 0, from_forward, from_reverse)
+        return np.where(large, limited, voltage)
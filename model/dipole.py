@@ -1,10 +1,32 @@
 import math
 
+
+def _parameter(slot):
+    # Lecture directe du slot ; l'écriture est signalée au circuit propriétaire
+    def set_value(self, value):
+        slot.__set__(self, value)
+        if self._circuit is not None:
+            self._circuit.mark_parameters_changed(self)
+    return property(slot.__get__, set_value)
+
+
 class Dipole:
     """
     Classe de base représentant un composant électrique générique
     """
 
+    # Attributs de paramètres : leur modification est signalée au circuit
+    # propriétaire (Circuit.parameter_version et journal des modifications)
+    PARAM_ATTRS = ()
+
+    # Composant non linéaire : les solveurs le remplacent, à chaque itération
+    # de Newton-Raphson, par son modèle compagnon (voir companion_model)
+    NONLINEAR = False
+
+    # Les sous-classes déclarent aussi leurs paramètres dans __slots__ : sans
+    # __dict__, un dipôle occupe environ deux fois moins de mémoire
+    __slots__ = ("id", "name", "node_a", "node_b", "position", "rotation", "_current", "_circuit")
+
     def __init__(self, dipole_id, name, node_a, node_b, x=0.0, y=0.0, rotation=0.0):
         """
         Initialise un dipôle générique.
@@ -18,6 +40,8 @@ class Dipole:
             y (float): Coordonnée Y du centre du composant
             rotation (float): Angle de rotation en degrés
         """
+        # Circuit propriétaire, fixé par Circuit.add_dipole
+        self._circuit = None
         self.id = int(dipole_id)
         self.name = name
         self.node_a = node_a
@@ -30,6 +54,15 @@ class Dipole:
         self.rotation = float(rotation)
         self._current = 0.0
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Seuls les paramètres déclarés dans les __slots__ de la classe passent
+        # par une propriété : les autres attributs (courant, position...)
+        # restent une simple affectation de slot
+        for attr in cls.__dict__.get("__slots__", ()):
+            if attr in cls.PARAM_ATTRS:
+                setattr(cls, attr, _parameter(cls.__dict__[attr]))
+
     @property
     def voltage(self):
         va = self.node_a.potential if self.node_a else 0.0
@@ -71,6 +104,38 @@ class Dipole:
     def get_params(self):
         return {}
 
+    @classmethod
+    def companion_model(cls, params, voltage):
+        """
+        Modèle compagnon d'un composant non linéaire, linéarisé autour de la
+        tension voltage : i(v) ~ g * v + i_eq. Évalué pour tous les dipôles
+        d'une même classe à la fois.
+
+        Args:
+            params (ndarray): Paramètres (une ligne par dipôle, colonnes dans
+                l'ordre de PARAM_ATTRS)
+            voltage (ndarray): Tension aux bornes de chaque dipôle
+
+        Returns:
+            tuple: (g, i_eq) conductances et sources de courant équivalentes
+        """
+        raise NotImplementedError(f"{cls.__name__} n'est pas un composant non linéaire")
+
+    @classmethod
+    def limit_voltage(cls, params, voltage, previous):
+        """
+        Limite la variation de tension d'une itération de Newton à la
+        suivante (convergence des modèles exponentiels). Par défaut aucune.
+        """
+        return voltage
+
+    def companion(self, voltage):
+        """Modèle compagnon (g, i_eq) de ce dipôle autour de voltage"""
+        import numpy as np
+        params = [[getattr(self, attr) for attr in self.PARAM_ATTRS]]
+        g, i_eq = self.companion_model(np.array(params, dtype=float), np.array([voltage], dtype=float))
+        return float(g[0]), float(i_eq[0])
+
     @classmethod
     def from_dict(cls, data, nodes_dict):
         node_a_id = data.get("node_a_id")
@@ -1,8 +1,18 @@
+# Au-delà de ce degré, les connexions d'un noeud sont rangées dans un dict
+# (ensemble ordonné : appartenance et retrait en O(1) au lieu d'un parcours) ;
+# seuls les noeuds très connectés, comme la masse, en paient le coût mémoire
+CONNECTION_INDEX_DEGREE = 16
+
+
 class Node:
     """
     Représente un noeud électrique du circuit
     """
 
+    # Pas de __dict__ par instance : un circuit peut compter des millions de noeuds
+    __slots__ = ("id", "position", "is_ground", "_potential", "_connections", "_connection_list",
+                 "_circuit")
+
     def __init__(self, node_id, x=0.0, y=0.0, is_ground=False):
         """
         Initialise un nouveau noeud
@@ -13,11 +23,17 @@ class Node:
             y (float): Coordonnée Y sur la grille
             is_ground (bool): Si True, ce noeud est la référence de masse (0V)
         """
+        # Circuit propriétaire, fixé à l'ajout du noeud dans un circuit
+        self._circuit = None
         self.id = int(node_id)
         self.position = (float(x), float(y))
         self.is_ground = is_ground
         self._potential = 0.0
-        self.connected_dipoles = []
+        # Liste des dipôles connectés, dict {dipôle: None} au-delà de
+        # CONNECTION_INDEX_DEGREE ; _connection_list en est alors la liste
+        # (None après un retrait, reconstruite à la lecture suivante)
+        self._connections = []
+        self._connection_list = None
 
     @property
     def potential(self):
@@ -30,13 +46,48 @@ class Node:
         else:
             self._potential = float(value)
 
+    @property
+    def connected_dipoles(self):
+        """Dipôles connectés, dans l'ordre de connexion (liste à ne pas modifier)"""
+        connections = self._connections
+        if type(connections) is list:
+            return connections
+        if self._connection_list is None:
+            self._connection_list = list(connections)
+        return self._connection_list
+
+    @connected_dipoles.setter
+    def connected_dipoles(self, dipoles):
+        self._connections = []
+        self._connection_list = None
+        for dipole in dipoles:
+            self.add_connection(dipole)
+
     def add_connection(self, dipole):
-        if dipole not in self.connected_dipoles:
-            self.connected_dipoles.append(dipole)
+        connections = self._connections
+        if type(connections) is list:
+            if dipole in connections:
+                return
+            if len(connections) < CONNECTION_INDEX_DEGREE:
+                connections.append(dipole)
+                return
+            self._connections = dict.fromkeys(connections)
+            self._connection_list = connections
+            connections = self._connections
+        elif dipole in connections:
+            return
+        connections[dipole] = None
+        if self._connection_list is not None:
+            self._connection_list.append(dipole)
 
     def remove_connection(self, dipole):
-        if dipole in self.connected_dipoles:
-            self.connected_dipoles.remove(dipole)
+        connections = self._connections
+        if type(connections) is list:
+            if dipole in connections:
+                connections.remove(dipole)
+        elif dipole in connections:
+            del connections[dipole]
+            self._connection_list = None
 
     def to_dict(self):
         return {
@@ -62,13 +113,29 @@ class Node:
     def __repr__(self):
         state = "GND" if self.is_ground else f"{self._potential:.2f}V"
         return f"<Node {self.id} | Pos={self.position} | {state}>"
-    
-    
+
+
+def _ground_property(slot):
+    # Lecture directe du slot ; passer un noeud à la masse (ou l'en retirer)
+    # change la référence du système : topologie du circuit propriétaire
+    def set_value(self, value):
+        changed = self._circuit is not None and slot.__get__(self) != value
+        slot.__set__(self, value)
+        if changed:
+            self._circuit.mark_ground_changed(self)
+    return property(slot.__get__, set_value)
+
+
+Node.is_ground = _ground_property(Node.__dict__["is_ground"])
+
+
 class Wire:
     """
     Représente un fil électrique idéal
     """
 
+    __slots__ = ("id", "node_a", "node_b", "color")
+
     def __init__(self, wire_id, node_a, node_b, color="#000000"):
         """
         Initialise un fil.
@@ -0,0 +1,116 @@
+import math
+
+
+class SpatialGrid:
+    """
+    Index spatial par grille uniforme (hachage des cellules).
+
+    Chaque élément est rangé dans les cellules couvertes par sa boîte
+    englobante, ou, pour un segment, dans les seules cellules qu'il traverse
+    (insert_segment) ; une requête ne parcourt que les cellules proches du
+    point cherché, d'où un coût quasi constant quelle que soit la taille du
+    schéma.
+    """
+
+    def __init__(self, cell_size=20.0):
+        """
+        Args:
+            cell_size (float): Côté d'une cellule, idéalement de l'ordre de la
+                tolérance de sélection
+        """
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._item_cells = {}
+
+    def __len__(self):
+        return len(self._item_cells)
+
+    def __contains__(self, key):
+        return key in self._item_cells
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        cx0, cx1 = math.floor(x0 / size), math.floor(x1 / size)
+        cy0, cy1 = math.floor(y0 / size), math.floor(y1 / size)
+        return [(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)]
+
+    def insert(self, key, x0, y0, x1=None, y1=None):
+        """Ajoute (ou déplace) un point ou une boîte [x0, x1] x [y0, y1]"""
+        if key in self._item_cells:
+            self.remove(key)
+        if x1 is None:
+            x1, y1 = x0, y0
+        self._add(key, self._cell_range(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)))
+
+    def insert_segment(self, key, x0, y0, x1, y1):
+        """
+        Ajoute (ou déplace) le segment [(x0, y0), (x1, y1)] : O(L / cell_size)
+        cellules au lieu de toute sa boîte englobante pour un fil en diagonale
+        """
+        if key in self._item_cells:
+            self.remove(key)
+        self._add(key, self._segment_cells(x0, y0, x1, y1))
+
+    def _add(self, key, cells):
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+        self._item_cells[key] = cells
+
+    def _segment_cells(self, x0, y0, x1, y1):
+        # Parcours de grille d'Amanatides et Woo : t (0 en A, 1 en B) avance
+        # jusqu'à la prochaine frontière verticale ou horizontale
+        size = self.cell_size
+        cx, cy = math.floor(x0 / size), math.floor(y0 / size)
+        end_x, end_y = math.floor(x1 / size), math.floor(y1 / size)
+        dx, dy = x1 - x0, y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_x = ((cx + (step_x > 0)) * size - x0) / dx if dx else math.inf
+        t_y = ((cy + (step_y > 0)) * size - y0) / dy if dy else math.inf
+        delta_x = size / abs(dx) if dx else math.inf
+        delta_y = size / abs(dy) if dy else math.inf
+        cells = [(cx, cy)]
+        # Autant de pas que de frontières franchies : la dernière cellule est
+        # celle de B même avec les arrondis
+        for _ in range(abs(end_x - cx) + abs(end_y - cy)):
+            if cy == end_y or (cx != end_x and t_x < t_y):
+                cx += step_x
+                t_x += delta_x
+            else:
+                cy += step_y
+                t_y += delta_y
+            cells.append((cx, cy))
+        return cells
+
+    def remove(self, key):
+        for cell in self._item_cells.pop(key, ()):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._item_cells.clear()
+
+    def candidates(self, x, y, radius):
+        """Éléments dont les cellules recoupent le carré de demi-côté radius"""
+        found = set()
+        for cell in self._cell_range(x - radius, y - radius, x + radius, y + radius):
+            bucket = self._cells.get(cell)
+            if bucket:
+                found.update(bucket)
+        return found
+
+
+def segment_distance_sq(px, py, ax, ay, bx, by):
+    """Carré de la distance du point P au segment [A, B]"""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0.0:
+        t = 0.0
+    else:
+        t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    cx, cy = ax + t * dx, ay + t * dy
+    return (px - cx) ** 2 + (py - cy) ** 2
@@ -0,0 +1,182 @@
+from .circuit import Circuit
+from .node import Node, Wire
+
+# Circuits en cours d'aplatissement (détection des blocs qui se contiennent)
+_FLATTENING = set()
+
+
+class SubcircuitDefinition:
+    """
+    Bloc réutilisable : un circuit interne et la liste de ses ports.
+
+    Le noeud de masse éventuel du circuit interne est relié à la masse du
+    circuit qui instancie le bloc ; les autres noeuds internes lui sont
+    propres (une copie par instance).
+    """
+
+    def __init__(self, name, circuit, ports):
+        """
+        Args:
+            name (str): Nom du bloc (unique dans un circuit sauvegardé)
+            circuit (Circuit): Circuit interne
+            ports (list): Noeuds du circuit interne exposés comme ports
+        """
+        self.name = name
+        self.circuit = circuit
+        self.ports = list(ports)
+        for port in self.ports:
+            if port.id not in circuit.nodes:
+                raise ValueError(f"Le port {port.id} n'appartient pas au circuit interne de '{name}'.")
+            if port.is_ground:
+                raise ValueError(f"Le port {port.id} de '{name}' ne peut pas être la masse.")
+
+    @property
+    def num_ports(self):
+        return len(self.ports)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "ports": [port.id for port in self.ports],
+            "circuit": self.circuit.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data, component_classes):
+        circuit = Circuit()
+        circuit.load_from_dict(data["circuit"], component_classes)
+        return cls(data["name"], circuit, [circuit.nodes[port_id] for port_id in data["ports"]])
+
+    def __repr__(self):
+        return f"<SubcircuitDefinition {self.name} | {self.num_ports} ports | {self.circuit}>"
+
+
+class SubcircuitInstance:
+    """
+    Instance d'un SubcircuitDefinition, reliée aux noeuds du circuit parent
+    (un noeud par port, dans l'ordre de definition.ports).
+    """
+
+    def __init__(self, instance_id, definition, nodes, x=0.0, y=0.0, rotation=0.0, name=None):
+        """
+        Args:
+            instance_id (int): Identifiant unique de l'instance
+            definition (SubcircuitDefinition): Bloc instancié
+            nodes (list): Noeuds du circuit parent reliés aux ports
+            x (float): Coordonnée X du centre
+            y (float): Coordonnée Y du centre
+            rotation (float): Angle de rotation en degrés
+            name (str): Nom affiché (par défaut celui du bloc)
+        """
+        if len(nodes) != definition.num_ports:
+            raise ValueError(f"'{definition.name}' attend {definition.num_ports} noeuds, {len(nodes)} donnés.")
+        self.id = int(instance_id)
+        self.definition = definition
+        self.nodes = list(nodes)
+        self.name = name if name is not None else definition.name
+        self.position = (float(x), float(y))
+        self.rotation = float(rotation)
+        # Résultats de simulation : courant entrant par chaque port et
+        # potentiels des noeuds internes {id du noeud interne: potentiel}
+        self.port_currents = [0.0] * definition.num_ports
+        self.internal_potentials = {}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "definition": self.definition.name,
+            "name": self.name,
+            "node_ids": [node.id for node in self.nodes],
+            "position": self.position,
+            "rotation": self.rotation
+        }
+
+    @classmethod
+    def from_dict(cls, data, definitions, nodes_dict):
+        x, y = data.get("position", (0.0, 0.0))
+        return cls(
+            instance_id=data["id"],
+            definition=definitions[data["definition"]],
+            nodes=[nodes_dict[node_id] for node_id in data["node_ids"]],
+            x=x,
+            y=y,
+            rotation=data.get("rotation", 0.0),
+            name=data.get("name")
+        )
+
+    def __repr__(self):
+        return (f"<SubcircuitInstance {self.name} (ID={self.id}) | {self.definition.name} | "
+                f"Nodes: {'-'.join(str(node.id) for node in self.nodes)}>")
+
+
+def flatten(circuit):
+    """
+    Copie à plat d'un circuit : chaque instance de sous-circuit est remplacée
+    par une copie de ses noeuds et dipôles internes (noms préfixés par celui
+    de l'instance), récursivement pour les instances placées dans un bloc.
+    Pour les analyses qui ne gèrent pas les blocs réduits.
+    """
+    if id(circuit) in _FLATTENING:
+        raise ValueError("Sous-circuit contenant une instance de lui-même.")
+    _FLATTENING.add(id(circuit))
+    try:
+        return _flatten(circuit)
+    finally:
+        _FLATTENING.discard(id(circuit))
+
+
+def _flatten(circuit):
+    flat = Circuit()
+    for node in circuit.nodes.values():
+        copy = Node(node.id, *node.position, is_ground=node.is_ground)
+        copy._potential = node.potential
+        copy._circuit = flat
+        flat.nodes[node.id] = copy
+    for wire in circuit.wires.values():
+        if wire.node_a and wire.node_b:
+            flat.wires[wire.id] = Wire(wire.id, flat.nodes[wire.node_a.id], flat.nodes[wire.node_b.id], wire.color)
+    flat._next_node_id = circuit._next_node_id
+    flat._next_wire_id = circuit._next_wire_id
+    flat._next_dipole_id = circuit._next_dipole_id
+    for dipole in circuit.dipoles.values():
+        _copy_dipole(flat, dipole, dipole.id, flat.nodes, dipole.name)
+
+    flat_inners = {}
+    for instance in circuit.subcircuits.values():
+        inner = flat_inners.get(instance.definition)
+        if inner is None:
+            # Copie à plat conservant les ids des noeuds, donc des ports
+            inner = instance.definition.circuit
+            if inner.subcircuits:
+                inner = flatten(inner)
+            flat_inners[instance.definition] = inner
+        mapping = {port.id: flat.nodes[node.id] for port, node in zip(instance.definition.ports, instance.nodes)}
+        ground = flat.get_ground_node()
+        for node in inner.nodes.values():
+            if node.id in mapping:
+                continue
+            if node.is_ground:
+                if ground is None:
+                    ground = flat.create_node(*instance.position, is_ground=True)
+                mapping[node.id] = ground
+            else:
+                mapping[node.id] = flat.create_node(*instance.position)
+        for wire in inner.wires.values():
+            if wire.node_a and wire.node_b:
+                flat.create_wire(mapping[wire.node_a.id], mapping[wire.node_b.id])
+        for dipole in inner.dipoles.values():
+            _copy_dipole(flat, dipole, flat.get_next_dipole_id(), mapping, f"{instance.name}.{dipole.name}")
+    flat.invalidate_spatial_index()
+    flat._reset_change_log()
+    return flat
+
+
+def _copy_dipole(circuit, dipole, dipole_id, nodes, name):
+    node_a = nodes[dipole.node_a.id] if dipole.node_a else None
+    node_b = nodes[dipole.node_b.id] if dipole.node_b else None
+    copy = type(dipole)(dipole_id=dipole_id, node_a=node_a, node_b=node_b,
+                        x=dipole.position[0], y=dipole.position[1], rotation=dipole.rotation)
+    copy.name = name
+    copy.set_params(dipole.get_params())
+    circuit.add_dipole(copy)
+    return copy
@@ -0,0 +1,249 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .base_solver import BaseSolver
+from .netlist import (KIND_CAPACITOR, KIND_INDUCTOR, KIND_RESISTOR, KIND_VOLTAGE_AC, KIND_VOLTAGE_DC,
+                      stamp_conductances, stamp_voltage_sources)
+from .utils import MatrixPattern, use_sparse
+
+# Au-delà de cette taille, chaque fréquence est résolue par LU creux plutôt
+# que par lots de systèmes denses empilés
+BATCH_DENSE_MAX_SIZE = 64
+
+# Par défaut, un pool de processus n'est lancé qu'au-delà de ce travail
+# (inconnues x fréquences, environ 1 µs chacun) : en dessous, le démarrage
+# des processus coûte plus que le balayage lui-même
+PARALLEL_MIN_WORK = 100_000
+
+
+def log_frequencies(f_start, f_stop, points_per_decade=20):
+    """Fréquences réparties logarithmiquement, bornes comprises"""
+    if f_start <= 0 or f_stop < f_start:
+        raise ValueError("Il faut 0 < f_start <= f_stop.")
+    decades = math.log10(f_stop / f_start)
+    return np.logspace(math.log10(f_start), math.log10(f_stop), max(2, int(math.ceil(decades * points_per_decade)) + 1))
+
+
+class ACResult:
+    """
+    Réponse fréquentielle petits signaux.
+
+    node_phasors[k, j] est le phaseur (complexe) du potentiel du noeud
+    node_ids[j] à la fréquence frequencies[k], dipole_phasors[k, j] celui
+    du courant du dipôle dipole_ids[j].
+    """
+
+    def __init__(self, frequencies, node_ids, dipole_ids, node_phasors, dipole_phasors):
+        self.frequencies = frequencies
+        self.node_ids = node_ids
+        self.dipole_ids = dipole_ids
+        self.node_phasors = node_phasors
+        self.dipole_phasors = dipole_phasors
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    @property
+    def magnitude(self):
+        """Module des potentiels (fréquences x noeuds)"""
+        return np.abs(self.node_phasors)
+
+    @property
+    def phase(self):
+        """Phase des potentiels en degrés (fréquences x noeuds)"""
+        return np.degrees(np.angle(self.node_phasors))
+
+    def node(self, node_id):
+        j = int(np.flatnonzero(self.node_ids == int(node_id))[0])
+        return self.node_phasors[:, j]
+
+    def dipole(self, dipole_id):
+        j = int(np.flatnonzero(self.dipole_ids == int(dipole_id))[0])
+        return self.dipole_phasors[:, j]
+
+    def bode(self, node_id, reference_id=None):
+        """
+        Diagramme de Bode d'un noeud, éventuellement rapporté à un autre.
+
+        Returns:
+            tuple: (fréquences, gain en dB, phase en degrés dépliée)
+        """
+        h = self.node(node_id)
+        if reference_id is not None:
+            h = h / self.node(reference_id)
+        with np.errstate(divide="ignore"):
+            gain = 20 * np.log10(np.abs(h))
+        return self.frequencies, gain, np.degrees(np.unwrap(np.angle(h)))
+
+
+class _PointSolver:
+    """
+    Système A(ω) = G + jωC + Γ/(jω) sur une structure commune.
+
+    G (résistances, incidence des sources), C (condensateurs) et Γ (inverses
+    des inductances) sont assemblés une seule fois, chacun comme valeurs des
+    cases d'un même MatrixPattern ; un point de fréquence ne coûte que leur
+    combinaison et la factorisation.
+    """
+
+    def __init__(self, view, sparse):
+        res = view.of_kind(KIND_RESISTOR)
+        cap = view.of_kind(KIND_CAPACITOR)
+        ind = view.of_kind(KIND_INDUCTOR)
+        dc = view.of_kind(KIND_VOLTAGE_DC)
+        ac = view.of_kind(KIND_VOLTAGE_AC)
+        self.sources = np.concatenate((dc, ac))
+        self.size = view.num_v_vars + len(self.sources)
+        self.branch = view.num_v_vars + np.arange(len(self.sources))
+        self.sparse = sparse
+
+        parts = [
+            stamp_conductances(view.idx_a[res], view.idx_b[res], 1.0 / view.value[res]),
+            stamp_voltage_sources(view.idx_a[self.sources], view.idx_b[self.sources], self.branch),
+            stamp_conductances(view.idx_a[cap], view.idx_b[cap], view.value[cap]),
+            stamp_conductances(view.idx_a[ind], view.idx_b[ind], 1.0 / view.value[ind]),
+        ]
+        rows = np.concatenate([p[0] for p in parts])
+        cols = np.concatenate([p[1] for p in parts])
+        self.pattern = MatrixPattern(rows, cols, self.size, sparse)
+        lengths = [len(p[2]) for p in parts]
+        bounds = np.cumsum([0] + lengths)
+
+        def part_data(first, last):
+            vals = np.zeros(bounds[-1])
+            vals[bounds[first]:bounds[last]] = np.concatenate([p[2] for p in parts[first:last]])
+            return self.pattern.data(vals)
+        self.g_data = part_data(0, 2)
+        self.c_data = part_data(2, 3)
+        self.gamma_data = part_data(3, 4)
+
+        self.view = view
+        # Excitation : sources AC (amplitude, phase) ; sources DC court-circuitées
+        self.rhs = np.zeros(self.size, dtype=complex)
+        phase = np.radians(view.ac_params[:, 1])
+        self.rhs[view.num_v_vars + len(dc):] = view.value[ac] * np.exp(1j * phase)
+
+    def run(self, frequencies, rhs=None):
+        """
+        Solutions (fréquences x inconnues) pour un lot de fréquences.
+
+        Args:
+            rhs (ndarray): Seconds membres (fréquences x inconnues) ; par
+                défaut l'excitation des sources AC, la même à chaque fréquence
+        """
+        omega = 2 * math.pi * np.asarray(frequencies, dtype=float)
+        if rhs is None:
+            rhs = np.broadcast_to(self.rhs, (len(omega), self.size))
+        data = (self.g_data[None, :] + 1j * omega[:, None] * self.c_data[None, :]
+                + self.gamma_data[None, :] / (1j * omega[:, None]))
+        pattern = self.pattern
+        if not self.sparse and self.size <= BATCH_DENSE_MAX_SIZE:
+            A = np.zeros((len(omega), self.size, self.size), dtype=complex)
+            A[:, pattern.rows, pattern.cols] = data
+            return np.linalg.solve(A, rhs[..., None])[..., 0]
+
+        # Même structure à chaque fréquence : en creux, l'ordonnancement
+        # calculé à la première factorisation sert à tout le balayage
+        X = np.empty((len(omega), self.size), dtype=complex)
+        for k in range(len(omega)):
+            X[k] = pattern.factorize(pattern.from_data(data[k]))(rhs[k])
+        return X
+
+    def dipole_currents(self, X, frequencies):
+        """Phaseurs des courants des dipôles (fréquences x dipôles)"""
+        view = self.view
+        jw = 2j * math.pi * np.asarray(frequencies, dtype=float)[:, None]
+        voltages = view.dipole_voltages(X.T).T
+        currents = np.zeros_like(voltages)
+        res = view.of_kind(KIND_RESISTOR)
+        cap = view.of_kind(KIND_CAPACITOR)
+        ind = view.of_kind(KIND_INDUCTOR)
+        currents[:, res] = voltages[:, res] / view.value[res]
+        currents[:, cap] = jw * view.value[cap] * voltages[:, cap]
+        currents[:, ind] = voltages[:, ind] / (jw * view.value[ind])
+        currents[:, self.sources] = -X[:, self.branch]
+        return currents
+
+
+# Solveur du processus de travail, transmis une fois par l'initialiseur du pool
+_worker_solver = None
+
+
+def _init_worker(point_solver):
+    global _worker_solver
+    _worker_solver = point_solver
+
+
+def _run_worker_batch(frequencies):
+    return _worker_solver.run(frequencies)
+
+
+class ACAnalysis(BaseSolver):
+    """
+    Analyse fréquentielle petits signaux (MNA complexe).
+
+    Les sources AC sont prises comme phaseurs amplitude∠phase (offset
+    ignoré), les sources DC comme des courts-circuits. Le circuit étant
+    linéaire, aucun point de fonctionnement n'est nécessaire. Les fréquences
+    sont résolues par lots, répartis sur un pool de processus pour les
+    grands balayages.
+    """
+
+    def __init__(self, f_start=1.0, f_stop=1e6, points_per_decade=20, workers=None, batch_size=64, **kwargs):
+        """
+        Args:
+            f_start (float): Première fréquence (Hz, > 0)
+            f_stop (float): Dernière fréquence (Hz)
+            points_per_decade (int): Densité du balayage logarithmique
+            workers (int): Nombre de processus ; 0 ou 1 pour tout calculer
+                dans le processus courant ; par défaut os.cpu_count() si le
+                balayage atteint PARALLEL_MIN_WORK, sinon calcul en série
+            batch_size (int): Fréquences par lot envoyé à un processus
+        """
+        super().__init__(**kwargs)
+        self.f_start = float(f_start)
+        self.f_stop = float(f_stop)
+        self.points_per_decade = points_per_decade
+        self.workers = workers
+        self.batch_size = max(1, int(batch_size))
+
+    def solve(self, circuit, frequencies=None):
+        """
+        Args:
+            circuit (Circuit): Circuit à analyser
+            frequencies (array): Fréquences (Hz) ; par défaut balayage
+                logarithmique de f_start à f_stop
+
+        Returns:
+            ACResult
+        """
+        view = self._compile(circuit)
+        if view is None:
+            return None
+        if frequencies is None:
+            frequencies = log_frequencies(self.f_start, self.f_stop, self.points_per_decade)
+        frequencies = np.asarray(frequencies, dtype=float)
+        if np.any(frequencies <= 0):
+            raise ValueError("L'analyse AC demande des fréquences strictement positives.")
+
+        size = view.num_v_vars + len(view.voltage_sources) + len(view.of_kind(KIND_VOLTAGE_AC))
+        with self._phase("assemble"):
+            point_solver = _PointSolver(view, use_sparse(size, self.backend, self.sparse_threshold))
+        batches = [frequencies[k:k + self.batch_size] for k in range(0, len(frequencies), self.batch_size)]
+        workers = self.workers
+        if workers is None:
+            workers = (os.cpu_count() or 1) if size * len(frequencies) >= PARALLEL_MIN_WORK else 1
+        with self._phase("solve"):
+            if workers <= 1 or len(batches) <= 1:
+                solutions = [point_solver.run(batch) for batch in batches]
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(point_solver,)) as executor:
+                    solutions = list(executor.map(_run_worker_batch, batches))
+            X = np.concatenate(solutions) if solutions else np.empty((0, point_solver.size), dtype=complex)
+
+        with self._phase("distribute"):
+            node_phasors = view.node_potentials(X.T).T
+            dipole_phasors = point_solver.dipole_currents(X, frequencies)
+        return ACResult(frequencies, view.node_ids, view.dipole_ids, node_phasors, dipole_phasors)
@@ -0,0 +1,89 @@
+import numpy as np
+from .netlist import KIND_NONLINEAR, NetlistView, group_connected_nodes
+from .profiling import NO_PHASE, _Phase
+from .utils import SPARSE_THRESHOLD
+
+
+class BaseSolver:
+    """
+    Classe de base des solveurs de circuit
+    """
+
+    # Les solveurs qui ne gèrent pas les blocs réduits travaillent sur
+    # circuit.flattened()
+    supports_subcircuits = False
+
+    # Seuls les solveurs à boucle de Newton acceptent les composants non
+    # linéaires (Dipole.NONLINEAR)
+    supports_nonlinear = False
+
+    def __init__(self, backend="auto", sparse_threshold=SPARSE_THRESHOLD):
+        """
+        Args:
+            backend (str): "auto" (dense pour les petits circuits, creux au-delà
+                de sparse_threshold inconnues), "dense" ou "sparse"
+            sparse_threshold (int): Taille de bascule du mode "auto"
+        """
+        self.backend = backend
+        self.sparse_threshold = sparse_threshold
+        self.observers = []
+
+    def add_observer(self, observer):
+        """
+        Abonne un observateur (voir profiling.SolverObserver) aux phases de
+        résolution et aux matrices assemblées. Sans observateur,
+        l'instrumentation ne coûte qu'un test de liste vide par phase.
+        """
+        if observer not in self.observers:
+            self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    def _phase(self, name):
+        """Contexte chronométrant une phase pour les observateurs"""
+        if not self.observers:
+            return NO_PHASE
+        return _Phase(self, name)
+
+    def _report_matrix(self, A, name="mna"):
+        for observer in self.observers:
+            observer.matrix_built(self, A, name)
+
+    def solve(self, circuit):
+        raise NotImplementedError
+
+    def _compile(self, circuit):
+        """
+        Groupe les noeuds, fixe la référence de potentiel et compile le
+        circuit en NetlistView. Retourne None pour un circuit vide.
+        """
+        if circuit.subcircuits and not self.supports_subcircuits:
+            raise ValueError(f"{type(self).__name__} ne gère pas les sous-circuits : "
+                             "résoudre circuit.flattened() à la place.")
+
+        # Groupement des noeuds
+        with self._phase("group"):
+            node_groups = self._group_connected_nodes(circuit)
+
+        # Gestion de la masse
+        ground_node = circuit.get_ground_node()
+        if not ground_node:
+            if circuit.nodes:
+                first_node = list(circuit.nodes.values())[0]
+                first_node.is_ground = True
+                ground_node = first_node
+            else:
+                print("Circuit vide")
+                return None
+
+        with self._phase("compile"):
+            view = NetlistView.from_circuit(circuit, node_groups, ground_node)
+        if not self.supports_nonlinear and np.any(view.kind == KIND_NONLINEAR):
+            raise ValueError(f"{type(self).__name__} ne gère pas les composants non linéaires "
+                             "(diodes...) : utiliser DCSolver.")
+        return view
+
+    def _group_connected_nodes(self, circuit):
+        return group_connected_nodes(circuit)
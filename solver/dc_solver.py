@@ -1,124 +1,306 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from model.components import Resistor, VoltageSourceDC
+from .netlist import KIND_NONLINEAR, KIND_RESISTOR
+from .base_solver import BaseSolver
+from .diagnostics import MIN_RESISTANCE, SingularCircuitError, check_dc_structure
+from .newton import DEFAULT_MAX_ITERATIONS, DEFAULT_RELTOL, DEFAULT_VNTOL, NonlinearStamps
+from .subcircuit import SubcircuitStamps
+from .utils import MatrixPattern, build_matrix, least_squares, solve_matrix, use_sparse
+
+# Nombre d'inconnues à partir duquel un réseau isolé est résolu comme un
+# système à part ; les réseaux plus petits restent ensemble dans un même
+# système (bloc-diagonal), une résolution par réseau coûterait plus en appels
+ISLAND_MIN_SIZE = 1000
+
+
+class DCSolver(BaseSolver):
+    """
+    Point de fonctionnement continu.
+
+    Les réseaux isolés du circuit (sans dipôle ni fil en commun) ont chacun
+    leur référence de potentiel ; les plus grands sont résolus séparément,
+    en parallèle.
+
+    Avant l'assemblage, un contrôle structurel (diagnostics.check_dc_structure)
+    repère les noeuds flottants, les boucles de sources et les résistances
+    nulles ; selon gmin et fallback, ils sont corrigés ou signalés par une
+    SingularCircuitError.
+
+    En creux, la structure du système et son ordonnancement (MatrixPattern)
+    sont conservés d'une résolution à l'autre tant que les positions des
+    termes ne changent pas : seule la factorisation numérique est refaite.
+
+    Un circuit avec des composants non linéaires (diodes) est résolu par
+    Newton-Raphson : à chaque itération, seuls leurs modèles compagnons
+    sont réévalués et ajoutés à la partie linéaire, cumulée une fois pour
+    toutes ; la structure de la matrice (et son ordonnancement) est fixe.
+    Le nombre d'itérations et la durée sont dans last_newton.
+    """
+
+    # Chaque sous-circuit n'apporte que l'équivalent de ses ports
+    supports_subcircuits = True
+    supports_nonlinear = True
+
+    def __init__(self, workers=None, island_min_size=ISLAND_MIN_SIZE, check=True, gmin=0.0, fallback=False,
+                 max_iterations=DEFAULT_MAX_ITERATIONS, reltol=DEFAULT_RELTOL, vntol=DEFAULT_VNTOL, max_step=None,
+                 **kwargs):
+        """
+        Args:
+            workers (int): Nombre de threads pour les réseaux isolés ; 0 ou 1
+                pour les résoudre l'un après l'autre ; par défaut os.cpu_count()
+            island_min_size (int): Taille (inconnues) à partir de laquelle un
+                réseau isolé est résolu séparément
+            check (bool): Contrôle structurel avant l'assemblage
+            gmin (float): Conductance (S) ajoutée entre chaque noeud flottant
+                et la masse ; 0 pour signaler les noeuds flottants
+            fallback (bool): Accepte un système dégradé au lieu de lever
+                SingularCircuitError : résistances nulles remplacées par
+                MIN_RESISTANCE, résolution aux moindres carrés si la
+                factorisation échoue
+            max_iterations (int): Itérations de Newton-Raphson au maximum
+            reltol (float): Tolérance relative de convergence de Newton
+            vntol (float): Tolérance absolue (V ou A) de convergence de Newton
+            max_step (float): Variation maximale d'une inconnue par itération
+                de Newton (amortissement) ; None pour ne pas limiter
+        """
+        super().__init__(**kwargs)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.island_min_size = island_min_size
+        self.check = check
+        self.gmin = gmin
+        self.fallback = fallback
+        self.max_iterations = max_iterations
+        self.reltol = reltol
+        self.vntol = vntol
+        self.max_step = max_step
+        self.last_diagnostics = None
+        self.last_newton = None
+        self._system_pattern = None
+        self._system_terms = None
 
-class DCSolver:
     def solve(self, circuit):
-        # Groupement des noeuds
-        node_groups = self._group_connected_nodes(circuit)
-        
-        # Gestion de la masse
-        ground_node = circuit.get_ground_node()
-        ground_group_id = None
-        if ground_node:
-            ground_group_id = node_groups[ground_node.id]
-        else:
-            if circuit.nodes:
-                first_node = list(circuit.nodes.values())[0]
-                first_node.is_ground = True
-                ground_node = first_node
-                ground_group_id = node_groups[first_node.id]
-            else:
-                print("Circuit vide")
-                return
-
-        # Mapping Groupe -> Index Matrice
-        matrix_index = 0
-        group_to_idx = {}
-        unique_groups = set(node_groups.values())
-        for gid in unique_groups:
-            if gid != ground_group_id:
-                group_to_idx[gid] = matrix_index
-                matrix_index += 1
-        num_v_vars = matrix_index
-
-        # Variables de courant pour sources de tension
-        voltage_sources = []
-        for dipole in circuit.dipoles.values():
-            if isinstance(dipole, VoltageSourceDC):
-                voltage_sources.append(dipole)
-        num_i_vars = len(voltage_sources)
-        total_vars = num_v_vars + num_i_vars
+        # Vue compilée (tableaux) et assemblage vectorisé
+        view = self._compile(circuit)
+        if view is None:
+            return
+        total_vars = view.size
         if total_vars == 0:
             return
-        
-        # Matrices
-        A = np.zeros((total_vars, total_vars))
-        Z = np.zeros(total_vars)
-
-        # Remplissage Passifs
-        for dipole in circuit.dipoles.values():
-            idx_a = self._get_matrix_index(dipole.node_a, node_groups, group_to_idx, ground_group_id)
-            idx_b = self._get_matrix_index(dipole.node_b, node_groups, group_to_idx, ground_group_id)
-            if isinstance(dipole, Resistor):
-                g = 1.0 / dipole.resistance
-                if idx_a is not None:
-                    A[idx_a, idx_a] += g
-                    if idx_b is not None:
-                        A[idx_a, idx_b] -= g
-                if idx_b is not None:
-                    A[idx_b, idx_b] += g
-                    if idx_a is not None:
-                        A[idx_b, idx_a] -= g
-
-        # Remplissage Sources
-        current_var_offset = num_v_vars
-        for i, v_src in enumerate(voltage_sources):
-            idx_src = current_var_offset + i
-            idx_a = self._get_matrix_index(v_src.node_a, node_groups, group_to_idx, ground_group_id)
-            idx_b = self._get_matrix_index(v_src.node_b, node_groups, group_to_idx, ground_group_id)
-            if idx_a is not None:
-                A[idx_src, idx_a] = 1
-                A[idx_a, idx_src] = 1
-            if idx_b is not None:
-                A[idx_src, idx_b] = -1
-                A[idx_b, idx_src] = -1
-            Z[idx_src] = v_src.dc_voltage
-
-        # Résolution
-        x = np.linalg.solve(A, Z)
+        shunts = None
+        if self.check:
+            with self._phase("check"):
+                shunts = self._check_structure(circuit, view)
+        with self._phase("assemble"):
+            rows, cols, vals, Z = view.assemble_dc()
+            if shunts is not None:
+                rows = np.concatenate((rows, shunts))
+                cols = np.concatenate((cols, shunts))
+                vals = np.concatenate((vals, np.full(len(shunts), self.gmin)))
+            blocks = None
+            if circuit.subcircuits:
+                blocks = SubcircuitStamps(circuit, view)
+                b_rows, b_cols, b_vals, b_rhs = blocks.assemble(total_vars)
+                rows = np.concatenate((rows, b_rows))
+                cols = np.concatenate((cols, b_cols))
+                vals = np.concatenate((vals, b_vals))
+                Z = Z + b_rhs
+            nonlinear = None
+            if np.any(view.kind == KIND_NONLINEAR):
+                nonlinear = NonlinearStamps(circuit, view)
+            else:
+                systems = self._split_islands(view, rows, cols, vals, Z)
+        if nonlinear is None:
+            self.last_newton = None
+            x = self._solve_systems(view, systems, Z)
+        else:
+            x = self._solve_newton(view, nonlinear, rows, cols, vals, Z)
+        with self._phase("distribute"):
+            self._distribute_results(circuit, view, x)
+            if blocks is not None:
+                blocks.distribute(view, x)
+            if nonlinear is not None:
+                nonlinear.distribute(nonlinear.voltages(view, x))
 
-        # Distribution des résultats
-        for node_id, node in circuit.nodes.items():
-            group_id = node_groups[node_id]
-            if group_id == ground_group_id:
-                node.potential = 0.0
+    def _solve_newton(self, view, nonlinear, rows, cols, vals, Z):
+        """
+        Newton-Raphson sur les composants non linéaires ; retourne x.
+
+        La partie linéaire (rows, cols, vals, Z) est cumulée une seule fois ;
+        chaque itération n'ajoute que les conductances et courants
+        équivalents des modèles compagnons, évalués à la tension limitée
+        (Dipole.limit_voltage) de l'itération précédente.
+        """
+        start = time.perf_counter()
+        size = view.size
+        sparse = use_sparse(size, self.backend, self.sparse_threshold)
+        pattern = MatrixPattern(np.concatenate((rows, nonlinear.rows)), np.concatenate((cols, nonlinear.cols)),
+                                size, sparse)
+        linear = len(rows)
+        linear_data = pattern.data(np.concatenate((vals, np.zeros(len(nonlinear.rows)))))
+        nonlinear_slot = pattern.slot[linear:]
+
+        voltage = nonlinear.initial_voltages()
+        x_prev = None
+        limited = 0
+        for iteration in range(1, self.max_iterations + 1):
+            with self._phase("stamp"):
+                g, i_eq = nonlinear.companion(voltage)
+                data = linear_data + np.bincount(nonlinear_slot, weights=nonlinear.stamp_values(g),
+                                                 minlength=pattern.nnz)
+                A = pattern.from_data(data)
+                rhs = Z + nonlinear.injection(i_eq, size)
+            if iteration == 1 and self.observers:
+                self._report_matrix(A)
+            with self._phase("solve"):
+                x = self._solve_system(A, rhs, pattern)
+            if self.max_step is not None and x_prev is not None:
+                step = np.max(np.abs(x - x_prev))
+                if step > self.max_step:
+                    x = x_prev + (self.max_step / step) * (x - x_prev)
+            raw = nonlinear.voltages(view, x)
+            next_voltage = nonlinear.limit(raw, voltage)
+            clamped = not np.array_equal(next_voltage, raw)
+            limited += clamped
+            converged = (x_prev is not None and not clamped
+                         and np.all(np.abs(x - x_prev) <= self.vntol + self.reltol * np.abs(x))
+                         and np.all(np.abs(next_voltage - voltage) <= self.vntol + self.reltol * np.abs(voltage)))
+            voltage = next_voltage
+            x_prev = x
+            if converged:
+                break
+        self.last_newton = {"iterations": iteration, "limited": limited, "converged": bool(converged),
+                            "time": time.perf_counter() - start}
+        if not converged:
+            raise ValueError(f"Newton-Raphson non convergé après {iteration} itérations.")
+        return x
+
+    def _solve_systems(self, view, systems, Z):
+        """Résout les systèmes préparés par _split_islands ; retourne x"""
+        total_vars = view.size
+        if self.observers:
+            for k, (_, A, _) in enumerate(systems):
+                self._report_matrix(A, "mna" if len(systems) == 1 else f"island {k}")
+
+        # Résolution, un système par réseau isolé séparé
+        with self._phase("solve"):
+            if len(systems) == 1:
+                x = self._solve_system(systems[0][1], Z, self._system_pattern)
             else:
-                idx = group_to_idx.get(group_id)
-                if idx is not None:
-                    new_pot = float(x[idx])
-                    node.potential = new_pot
+                x = np.empty(total_vars)
+                if self.workers > 1:
+                    # LAPACK et SuperLU relâchent le GIL : des threads suffisent,
+                    # sans copier les matrices vers d'autres processus
+                    with ThreadPoolExecutor(max_workers=min(self.workers, len(systems))) as executor:
+                        solutions = list(executor.map(lambda system: self._solve_system(system[1], system[2]),
+                                                      systems))
+                else:
+                    solutions = [self._solve_system(A, z) for _, A, z in systems]
+                for (unknowns, _, _), solution in zip(systems, solutions):
+                    x[unknowns] = solution
+        return x
 
-        # Mise à jour des courants
-        for dipole in circuit.dipoles.values():
-            if isinstance(dipole, Resistor):
-                dipole.current = dipole.voltage / dipole.resistance
-        for i, v_src in enumerate(voltage_sources):
-            idx_src = current_var_offset + i
-            v_src.current = -float(x[idx_src])
-
-    def _group_connected_nodes(self, circuit):
-        parent = {node_id: node_id for node_id in circuit.nodes}
-        def find(i):
-            if parent[i] == i:
-                return i
-            parent[i] = find(parent[i])
-            return parent[i]
-        def union(i, j):
-            root_i = find(i)
-            root_j = find(j)
-            if root_i != root_j:
-                parent[root_i] = root_j
-
-        for wire in circuit.wires.values():
-            if wire.node_a and wire.node_b:
-                union(wire.node_a.id, wire.node_b.id)
-
-        return {node_id: find(node_id) for node_id in circuit.nodes}
-
-    def _get_matrix_index(self, node, node_groups, group_to_idx, ground_group_id):
-        if node is None:
-            return None
-        gid = node_groups[node.id]
-        if gid == ground_group_id:
+    def _check_structure(self, circuit, view):
+        """
+        Diagnostic structurel du système ; retourne les inconnues à relier à
+        la masse par gmin (ou None). Lève SingularCircuitError pour un défaut
+        que ni gmin ni fallback ne couvrent.
+        """
+        diagnostics = check_dc_structure(view, circuit)
+        self.last_diagnostics = diagnostics
+        if diagnostics.ok:
             return None
-        return group_to_idx.get(gid)
\ No newline at end of file
+        shunts = None
+        if self.gmin > 0 and diagnostics.floating_nodes:
+            shunts = diagnostics.floating
+            print(f"Attention: {len(diagnostics.floating_nodes)} noeud(s) flottant(s) relié(s) à la masse "
+                  f"par gmin = {self.gmin:g} S")
+        remaining = diagnostics.source_loops or diagnostics.zero_resistors or (shunts is None
+                                                                             and diagnostics.floating_nodes)
+        if remaining:
+            if not self.fallback:
+                raise diagnostics.error()
+            print(f"Attention: {diagnostics.message()}, résolution dégradée")
+            res = view.of_kind(KIND_RESISTOR)
+            view.value[res[view.value[res] == 0]] = MIN_RESISTANCE
+        return shunts
+
+    def _solve_system(self, A, z, pattern=None):
+        """Résout A x = z ; moindres carrés si A est singulière et fallback est actif"""
+        try:
+            x = pattern.factorize(A)(z) if pattern is not None else solve_matrix(A, z)
+            if np.all(np.isfinite(x)):
+                return x
+            error = None
+        except (np.linalg.LinAlgError, RuntimeError) as e:
+            error = e
+        if not self.fallback:
+            raise SingularCircuitError("Système singulier : factorisation impossible.") from error
+        print("Attention: système singulier, solution aux moindres carrés")
+        return least_squares(A, z)
+
+    def _split_islands(self, view, rows, cols, vals, Z):
+        """
+        Systèmes à résoudre : [(inconnues, matrice, second membre)], un par
+        réseau isolé d'au moins island_min_size inconnues, plus un pour
+        l'ensemble des autres. Un seul système (inconnues None) sinon.
+        """
+        size = view.size
+        labels, island, counts = np.unique(view.unknown_islands(), return_inverse=True, return_counts=True)
+        large = counts >= self.island_min_size
+        num_large = int(np.count_nonzero(large))
+        if num_large == 0 or (num_large == 1 and len(labels) == 1):
+            return [(None, self._single_matrix(rows, cols, vals, size), Z)]
+
+        # Bloc de chaque inconnue : rang du grand réseau, ou bloc commun des petits
+        rank = np.where(large, np.cumsum(large) - 1, num_large)
+        block = rank[island.ravel()]
+        num_blocks = num_large + int(num_large < len(labels))
+        unknowns = np.argsort(block, kind="stable")
+        bounds = np.searchsorted(block[unknowns], np.arange(num_blocks + 1))
+        local = np.empty(size, dtype=np.int64)
+        local[unknowns] = np.arange(size) - bounds[block[unknowns]]
+
+        # Aucun terme ne relie deux réseaux : la ligne suffit à classer un triplet
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.argsort(block[rows], kind="stable")
+        term_bounds = np.searchsorted(block[rows][order], np.arange(num_blocks + 1))
+        systems = []
+        for k in range(num_blocks):
+            terms = order[term_bounds[k]:term_bounds[k + 1]]
+            block_unknowns = unknowns[bounds[k]:bounds[k + 1]]
+            n = len(block_unknowns)
+            A = build_matrix(local[rows[terms]], local[np.asarray(cols)[terms]], np.asarray(vals)[terms], n,
+                             use_sparse(n, self.backend, self.sparse_threshold))
+            systems.append((block_unknowns, A, Z[block_unknowns]))
+        return systems
+
+    def _single_matrix(self, rows, cols, vals, size):
+        """Matrice du système entier ; la structure creuse est réutilisée si inchangée"""
+        if not use_sparse(size, self.backend, self.sparse_threshold):
+            self._system_pattern = None
+            return build_matrix(rows, cols, vals, size, False)
+        terms = self._system_terms
+        if (self._system_pattern is None or self._system_pattern.size != size or len(terms[0]) != len(rows)
+                or not np.array_equal(terms[0], rows) or not np.array_equal(terms[1], cols)):
+            self._system_pattern = MatrixPattern(rows, cols, size, True)
+            self._system_terms = (np.array(rows), np.array(cols))
+        return self._system_pattern.matrix(vals)
+
+    def _distribute_results(self, circuit, view, x):
+        # Distribution des résultats
+        potentials = view.node_potentials(x)
+        for node, potential in zip(circuit.nodes.values(), potentials.tolist()):
+            node.potential = potential
+
+        # Mise à jour des courants
+        voltages = view.dipole_voltages(x)
+        res = view.of_kind(KIND_RESISTOR)
+        currents = voltages[res] / view.value[res]
+        dipoles = circuit.dipoles
+        for dipole_id, current in zip(view.dipole_ids[res].tolist(), currents.tolist()):
+            dipoles[dipole_id].current = current
+        branch = view.num_v_vars + np.arange(len(view.voltage_sources))
+        for dipole_id, current in zip(view.dipole_ids[view.voltage_sources].tolist(), (-x[branch]).tolist()):
+            dipoles[dipole_id].current = current
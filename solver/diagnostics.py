@@ -0,0 +1,127 @@
+import numpy as np
+from .netlist import KIND_NONLINEAR, KIND_RESISTOR, connected_components
+
+# Valeur donnée aux résistances nulles quand le solveur accepte un système
+# dégradé (DCSolver(fallback=True)) : un court-circuit de 1 µOhm
+MIN_RESISTANCE = 1e-6
+
+
+class SingularCircuitError(ValueError):
+    """
+    Système du circuit singulier : noeuds sans chemin vers une référence,
+    boucle de sources de tension, résistance nulle...
+
+    Attributes:
+        nodes (list): Ids des noeuds en cause
+        dipoles (list): Ids des dipôles en cause
+    """
+
+    def __init__(self, message, nodes=(), dipoles=()):
+        super().__init__(message)
+        self.nodes = list(nodes)
+        self.dipoles = list(dipoles)
+
+
+class DCDiagnostics:
+    """
+    Défauts structurels du système DC, détectés sur le graphe du circuit
+    avant toute factorisation (voir check_dc_structure).
+
+    Attributes:
+        floating (ndarray): Inconnues de potentiel sans chemin conducteur
+            (résistance, source continue, composant non linéaire ou
+            sous-circuit) vers une référence
+        floating_nodes (list): Ids des noeuds correspondants
+        source_loops (list): Ids des sources continues formant une boucle
+            (ou court-circuitées par des fils)
+        zero_resistors (list): Ids des résistances nulles
+    """
+
+    def __init__(self, floating, floating_nodes, source_loops, zero_resistors):
+        self.floating = floating
+        self.floating_nodes = floating_nodes
+        self.source_loops = source_loops
+        self.zero_resistors = zero_resistors
+
+    @property
+    def ok(self):
+        return not (self.floating_nodes or self.source_loops or self.zero_resistors)
+
+    def message(self):
+        parts = []
+        if self.floating_nodes:
+            parts.append("noeuds flottants (aucun chemin continu vers la masse) : "
+                         f"{_ids(self.floating_nodes)}")
+        if self.source_loops:
+            parts.append(f"boucle de sources de tension : {_ids(self.source_loops)}")
+        if self.zero_resistors:
+            parts.append(f"résistances nulles : {_ids(self.zero_resistors)}")
+        return "Système singulier, " + " ; ".join(parts)
+
+    def error(self):
+        return SingularCircuitError(self.message(), self.floating_nodes,
+                                    self.source_loops + self.zero_resistors)
+
+    def to_dict(self):
+        return {"floating_nodes": self.floating_nodes, "source_loops": self.source_loops,
+                "zero_resistors": self.zero_resistors}
+
+
+def _ids(ids, limit=10):
+    shown = ", ".join(str(i) for i in ids[:limit])
+    return shown + (f"... ({len(ids)} au total)" if len(ids) > limit else "")
+
+
+def check_dc_structure(view, circuit=None):
+    """
+    Contrôle structurel du système MNA continu, en O(n) sur les tableaux de
+    la vue compilée (groupes de noeuds issus de _group_connected_nodes) :
+    - composantes connexes du graphe des résistances non nulles, sources
+      continues, composants non linéaires et ports de sous-circuits : une
+      composante qui ne touche aucune référence a des potentiels
+      indéterminés ;
+    - composantes du graphe des seules sources continues : une composante
+      avec autant de sources que de sommets contient une boucle, dont les
+      courants sont indéterminés.
+
+    Args:
+        view (NetlistView): Circuit compilé
+        circuit (Circuit): Circuit d'origine, pour ses sous-circuits
+
+    Returns:
+        DCDiagnostics
+    """
+    n = view.num_v_vars
+    res = view.of_kind(KIND_RESISTOR)
+    src = view.voltage_sources
+    zero = res[view.value[res] == 0]
+    conductive = np.concatenate((res[view.value[res] != 0], src, view.of_kind(KIND_NONLINEAR)))
+    # Sommet n : toutes les références (masse et références des réseaux isolés)
+    a = np.where(view.idx_a < 0, n, view.idx_a)
+    b = np.where(view.idx_b < 0, n, view.idx_b)
+    edges_a = [a[conductive]]
+    edges_b = [b[conductive]]
+    if circuit is not None:
+        for instance in circuit.subcircuits.values():
+            ports = view.matrix_index_of([node.id for node in instance.nodes])
+            ports = np.where(ports < 0, n, ports)
+            edges_a.append(ports[:-1])
+            edges_b.append(ports[1:])
+            if instance.definition.circuit.get_ground_node() is not None:
+                edges_a.append(ports[:1])
+                edges_b.append([n])
+    root = connected_components(n + 1, np.concatenate(edges_a), np.concatenate(edges_b))
+    floating = np.flatnonzero(root[:n] != root[n])
+    floating_nodes = view.node_ids[np.isin(view.node_index, floating)].tolist()
+
+    # Boucles de sources : autant d'arêtes que de sommets dans une composante
+    loops = []
+    if len(src):
+        ends, inverse = np.unique(np.concatenate((a[src], b[src])), return_inverse=True)
+        sa, sb = inverse[:len(src)], inverse[len(src):]
+        label = connected_components(len(ends), sa, sb)
+        vertices = np.bincount(label, minlength=len(ends))
+        edges = np.bincount(label[sa], minlength=len(ends))
+        loops = view.dipole_ids[src[edges[label[sa]] >= vertices[label[sa]]]].tolist()
+
+    return DCDiagnostics(floating, floating_nodes, loops, view.dipole_ids[zero].tolist())
@@ -0,0 +1,191 @@
+import weakref
+import numpy as np
+from .dc_solver import DCSolver
+from .diagnostics import SingularCircuitError, check_dc_structure
+from .netlist import KIND_RESISTOR, KIND_VOLTAGE_DC, VALUE_ATTR
+from .utils import MatrixPattern, use_sparse
+
+# Rang maximal des corrections de Woodbury avant refactorisation complète
+MAX_UPDATE_RANK = 32
+# Conditionnement au-delà duquel la correction est tenue pour singulière
+MAX_UPDATE_CONDITION = 1e12
+
+
+class IncrementalDCSolver(DCSolver):
+    """
+    Solveur DC qui conserve sa factorisation d'une résolution à l'autre.
+
+    Tant que le circuit résolu reste le même et que sa topologie
+    (Circuit.topology_version) ne change pas, le groupement des noeuds, les index matriciels et la factorisation
+    LU sont réutilisés :
+    - une tension de source modifiée ne change que le second membre ;
+    - une résistance modifiée est une correction de rang 1 de la matrice
+      (g * (e_a - e_b)(e_a - e_b)^T), appliquée par la formule de
+      Sherman-Morrison-Woodbury avec la factorisation existante.
+    Au-delà de max_rank résistances modifiées depuis la dernière
+    factorisation, la matrice est refactorisée (structure réutilisée).
+    Seuls les dipôles signalés par Circuit.changes_since sont relus.
+
+    Le contrôle structurel n'est refait qu'avec la topologie ; gmin et
+    fallback ne s'appliquent pas (un défaut lève SingularCircuitError). Une
+    correction qui rend le système singulier (noeud isolé par une résistance
+    infinie...) est reprise par une refactorisation complète, qui lève
+    SingularCircuitError si la matrice l'est aussi.
+    """
+
+    # Les corrections de Woodbury ne portent que sur les dipôles du circuit
+    supports_subcircuits = False
+    supports_nonlinear = False
+
+    def __init__(self, max_rank=MAX_UPDATE_RANK, **kwargs):
+        super().__init__(**kwargs)
+        self.max_rank = max_rank
+        self.last_mode = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Oublie les structures en cache (prochaine résolution complète)"""
+        self._circuit = None
+        self._topology_version = None
+        self._version = None
+        self._view = None
+        self._values = None
+        self._positions = {}
+        self._pattern = None
+        self._solve = None
+        self._base_values = None
+        self._columns = {}
+
+    def solve(self, circuit):
+        # Les versions de deux circuits distincts peuvent coïncider : le cache
+        # n'est valable que pour le circuit qui l'a construit
+        if (self._view is None or self._circuit() is not circuit
+                or circuit.topology_version != self._topology_version):
+            self._rebuild(circuit)
+            if self._view is None:
+                return
+            mode = "full"
+        else:
+            mode = "update"
+
+        view = self._view
+        values = self._current_values(circuit)
+        self._version = circuit.version
+        res = view.of_kind(KIND_RESISTOR)
+        changed = res[values[res] != self._base_values[res]]
+        if np.any(values[changed] == 0):
+            zero = self._view.dipole_ids[changed[values[changed] == 0]].tolist()
+            raise SingularCircuitError(f"Système singulier, résistances nulles : {zero}", dipoles=zero)
+        if len(changed) > self.max_rank:
+            self._refactor(values)
+            changed = changed[:0]
+            mode = "refactor"
+
+        rhs = np.zeros(view.size)
+        src = view.voltage_sources
+        rhs[view.num_v_vars + np.arange(len(src))] = values[src]
+        with self._phase("solve"):
+            try:
+                x = self._solve_updated(rhs, changed, values)
+            except np.linalg.LinAlgError:
+                x = None
+        if x is None or not np.all(np.isfinite(x)):
+            self._refactor(values)
+            with self._phase("solve"):
+                x = self._solve(rhs)
+            mode = "refactor"
+
+        view.value = values.copy()
+        with self._phase("distribute"):
+            self._distribute_results(circuit, view, x)
+        self.last_mode = mode
+
+    def _rebuild(self, circuit):
+        self.invalidate()
+        view = self._compile(circuit)
+        if view is None or view.size == 0:
+            return
+        if self.check:
+            self.last_diagnostics = check_dc_structure(view)
+            if not self.last_diagnostics.ok:
+                raise self.last_diagnostics.error()
+        self._view = view
+        self._circuit = weakref.ref(circuit)
+        self._topology_version = circuit.topology_version
+        self._version = circuit.version
+        self._values = view.value.copy()
+        self._positions = {dipole_id: pos for pos, dipole_id in enumerate(view.dipole_ids.tolist())}
+        rows, cols, vals, _ = view.assemble_dc()
+        sparse = use_sparse(view.size, self.backend, self.sparse_threshold)
+        self._pattern = MatrixPattern(rows, cols, view.size, sparse)
+        self._refactor(view.value.copy())
+
+    def _refactor(self, values):
+        rows, cols, vals, _ = self._view.assemble_dc(values)
+        A = self._pattern.matrix(vals)
+        if self.observers:
+            self._report_matrix(A)
+        with self._phase("factorize"):
+            try:
+                self._solve = self._pattern.factorize(A)
+            except (np.linalg.LinAlgError, RuntimeError) as error:
+                raise SingularCircuitError("Système singulier : factorisation impossible.") from error
+        self._base_values = values.copy()
+        self._columns = {}
+
+    def _current_values(self, circuit):
+        # Relecture des seules valeurs modifiées depuis la dernière résolution
+        changes = circuit.changes_since(self._version)
+        if changes is None:
+            return self._read_all_values(circuit)
+        values = self._values
+        kind = self._view.kind
+        for dipole_id in changes["dipoles"]:
+            pos = self._positions[dipole_id]
+            if kind[pos] in (KIND_RESISTOR, KIND_VOLTAGE_DC):
+                values[pos] = getattr(circuit.dipoles[dipole_id], VALUE_ATTR[int(kind[pos])])
+        return values
+
+    def _read_all_values(self, circuit):
+        view = self._view
+        values = self._values
+        dipoles = circuit.dipoles
+        for kind in (KIND_RESISTOR, KIND_VOLTAGE_DC):
+            positions = view.of_kind(kind)
+            attr = VALUE_ATTR[kind]
+            values[positions] = np.fromiter(
+                (getattr(dipoles[i], attr) for i in view.dipole_ids[positions].tolist()),
+                dtype=float, count=len(positions))
+        return values
+
+    def _column(self, pos):
+        # Z[:, k] = A^-1 (e_a - e_b), mis en cache par résistance
+        column = self._columns.get(pos)
+        if column is None:
+            column = self._solve(self._incidence(pos))
+            self._columns[pos] = column
+        return column
+
+    def _incidence(self, pos):
+        u = np.zeros(self._view.size)
+        a, b = self._view.idx_a[pos], self._view.idx_b[pos]
+        if a >= 0:
+            u[a] += 1.0
+        if b >= 0:
+            u[b] -= 1.0
+        return u
+
+    def _solve_updated(self, rhs, changed, values):
+        y = self._solve(rhs)
+        if not len(changed):
+            return y
+        # Woodbury : (A + U D U^T)^-1 b = y - Z (I + D U^T Z)^-1 D U^T y,
+        # forme proche de l'identité pour de petites modifications, dont le
+        # conditionnement révèle un système devenu singulier
+        delta_g = 1.0 / values[changed] - 1.0 / self._base_values[changed]
+        U = np.column_stack([self._incidence(pos) for pos in changed])
+        Z = np.column_stack([self._column(pos) for pos in changed])
+        capacitance = np.eye(len(changed)) + delta_g[:, None] * (U.T @ Z)
+        if np.linalg.cond(capacitance) > MAX_UPDATE_CONDITION:
+            raise np.linalg.LinAlgError("Correction de rang faible singulière")
+        return y - Z @ np.linalg.solve(capacitance, delta_g * (U.T @ y))
@@ -0,0 +1,218 @@
+import numpy as np
+from .dc_solver import DCSolver
+from .diagnostics import SingularCircuitError
+from .multigrid import AggregationAMG
+from .utils import build_matrix, sparse_available
+
+# Résidu relatif visé par défaut (||b - A x|| / ||b||)
+DEFAULT_TOL = 1e-10
+
+PRECONDITIONERS = ("amg", "jacobi")
+
+
+def pcg(A, B, precondition, X0=None, tol=DEFAULT_TOL, maxiter=None):
+    """
+    Gradient conjugué préconditionné sur une matrice symétrique définie
+    positive, pour plusieurs seconds membres à la fois (une colonne de B
+    chacun, itérations indépendantes mais produits matrice-vecteur groupés).
+
+    Args:
+        A: Matrice creuse (n x n)
+        B (ndarray): Seconds membres (n x k)
+        precondition: Fonction R -> M^-1 R (n x k)
+        X0 (ndarray): Solution initiale (n x k), zéro par défaut
+        tol (float): Résidu relatif visé pour chaque colonne
+        maxiter (int): Nombre maximal d'itérations (10 n par défaut)
+
+    Returns:
+        tuple: (X, itérations, résidu relatif maximal)
+    """
+    n, k = B.shape
+    maxiter = 10 * n if maxiter is None else maxiter
+    X = np.zeros((n, k)) if X0 is None else np.array(X0, dtype=float)
+    R = B - A @ X if X0 is not None else B.copy()
+    norm_b = np.linalg.norm(B, axis=0)
+    norm_b[norm_b == 0] = 1.0
+    Z = precondition(R)
+    P = Z.copy()
+    rz = np.einsum("ij,ij->j", R, Z)
+    residual = np.linalg.norm(R, axis=0) / norm_b
+    iterations = 0
+    while iterations < maxiter:
+        active = residual > tol
+        if not np.any(active):
+            break
+        AP = A @ P
+        pap = np.einsum("ij,ij->j", P, AP)
+        # Les colonnes convergées ne bougent plus
+        alpha = np.where(active & (pap > 0), rz / np.where(pap > 0, pap, 1.0), 0.0)
+        X += alpha * P
+        R -= alpha * AP
+        Z = precondition(R)
+        rz_next = np.einsum("ij,ij->j", R, Z)
+        beta = np.where(rz != 0, rz_next / np.where(rz != 0, rz, 1.0), 0.0)
+        P = Z + beta * P
+        rz = rz_next
+        residual = np.linalg.norm(R, axis=0) / norm_b
+        iterations += 1
+    return X, iterations, float(residual.max()) if k else 0.0
+
+
+def preconditioner(G, kind="amg"):
+    """
+    Préconditionneur de la matrice de conductance G (creuse, SPD) :
+    "amg" (multigrille par agrégation, voir multigrid.AggregationAMG) ou
+    "jacobi" (inverse de la diagonale). Retourne une fonction R -> M^-1 R.
+    """
+    if kind == "amg":
+        return AggregationAMG(G)
+    if kind == "jacobi":
+        inverse = 1.0 / G.diagonal()
+        return lambda R: inverse[:, None] * R
+    raise ValueError(f"Préconditionneur inconnu : '{kind}'")
+
+
+class IterativeDCSolver(DCSolver):
+    """
+    Point de fonctionnement continu par gradient conjugué préconditionné,
+    pour les très grands réseaux de résistances (maillages, réseaux
+    d'alimentation) que la factorisation LU creuse ne tient plus en mémoire.
+
+    Seule la matrice de conductance G (symétrique définie positive après le
+    contrôle structurel) est itérée :
+    - une source reliée à une référence fixe le potentiel de son noeud, qui
+      sort des inconnues (condition de Dirichlet) ;
+    - les autres sources sont des contraintes traitées par complément de
+      Schur : une résolution de G par source, puis un petit système dense
+      sur leurs courants. Ce mode vise donc les circuits à peu de sources
+      flottantes.
+    Les potentiels actuels des noeuds servent de point de départ
+    (warm_start) : une résolution après une petite modification converge en
+    quelques itérations. Tant que G ne change pas, le préconditionneur et
+    les colonnes G^-1 C du complément de Schur sont réutilisés.
+    """
+
+    # Le gradient conjugué ne porte que sur la partie linéaire
+    supports_nonlinear = False
+
+    def __init__(self, tol=DEFAULT_TOL, maxiter=None, preconditioner="amg", warm_start=True, **kwargs):
+        """
+        Args:
+            tol (float): Résidu relatif visé
+            maxiter (int): Nombre maximal d'itérations (10 n par défaut)
+            preconditioner (str): "amg" ou "jacobi"
+            warm_start (bool): Part des potentiels actuels des noeuds
+        """
+        super().__init__(**kwargs)
+        if preconditioner not in PRECONDITIONERS:
+            raise ValueError(f"Préconditionneur inconnu : '{preconditioner}'")
+        self.tol = tol
+        self.maxiter = maxiter
+        self.preconditioner = preconditioner
+        self.warm_start = warm_start
+        self.last_iterations = 0
+        self.last_residual = 0.0
+        self._potentials = None
+        self._cache = None
+
+    def solve(self, circuit):
+        if not sparse_available():
+            raise RuntimeError("Le solveur itératif nécessite SciPy.")
+        self._potentials = None
+        if self.warm_start:
+            self._potentials = np.fromiter((node.potential for node in circuit.nodes.values()),
+                                           dtype=float, count=len(circuit.nodes))
+        super().solve(circuit)
+
+    def _split_islands(self, view, rows, cols, vals, Z):
+        # Les réseaux isolés sont des blocs de G, itérés ensemble
+        return [(None, build_matrix(rows, cols, vals, view.size, True), Z)]
+
+    def _solve_systems(self, view, systems, Z):
+        A = systems[0][1].tocsr()
+        if self.observers:
+            self._report_matrix(A)
+        n = view.num_v_vars
+        G = A[:n, :n]
+        C = A[:n, n:].tocsc()
+        z, e = Z[:n], Z[n:]
+
+        with self._phase("precondition"):
+            # Sources à une seule borne inconnue : potentiel imposé
+            single = np.flatnonzero(np.diff(C.indptr) == 1)
+            nodes, first = np.unique(C.indices[C.indptr[single]], return_index=True)
+            grounded = single[first]
+            coef = C.data[C.indptr[grounded]]
+            others = np.setdiff1d(np.arange(C.shape[1]), grounded)
+            fixed = np.zeros(n, dtype=bool)
+            fixed[nodes] = True
+            free = np.flatnonzero(~fixed)
+
+            v = np.zeros(n)
+            v[nodes] = e[grounded] / coef
+            G_free = G[free]
+            G_ff = G_free[:, free]
+            C_f = C[free][:, others].toarray()
+            C_d = C[nodes][:, others]
+            # Même matrice qu'à la résolution précédente : préconditionneur et
+            # colonnes G^-1 C du complément de Schur réutilisés
+            cache = previous = self._cache
+            if cache is not None and not (_same_matrix(cache["G"], G_ff) and np.array_equal(cache["C_f"], C_f)):
+                cache = None
+            if cache is None and len(free):
+                cache = {"G": G_ff, "C_f": C_f, "precondition": preconditioner(G_ff, self.preconditioner),
+                         "W": None, "currents": np.zeros(len(others))}
+            self._cache = cache
+            # Colonnes G^-1 C précédentes : point de départ des nouvelles
+            warm_W = None
+            if previous is not None and previous["W"] is not None and previous["W"].shape == C_f.shape:
+                warm_W = previous["W"]
+
+        with self._phase("solve"):
+            currents = np.zeros(C.shape[1])
+            B = (z[free] - G_free[:, nodes] @ v[nodes])[:, None]
+            W = cache["W"] if cache is not None else None
+            if len(others) and W is None:
+                B = np.column_stack((B, C_f))
+            X0 = None
+            if self._potentials is not None:
+                X0 = np.zeros(B.shape)
+                known = view.node_index >= 0
+                guess = np.zeros(n)
+                guess[view.node_index[known]] = self._potentials[known]
+                X0[:, 0] = guess[free]
+                if warm_W is not None:
+                    X0[:, 0] += warm_W @ previous["currents"]
+                    if W is None:
+                        X0[:, 1:] = warm_W
+            if len(free):
+                X, self.last_iterations, self.last_residual = pcg(G_ff, B, cache["precondition"], X0, self.tol,
+                                                                  self.maxiter)
+            else:
+                X, self.last_iterations, self.last_residual = B, 0, 0.0
+            if self.last_residual > self.tol:
+                print(f"Attention: gradient conjugué non convergé après {self.last_iterations} itérations "
+                      f"(résidu relatif {self.last_residual:.3g})")
+
+            # Complément de Schur sur les courants des sources flottantes
+            v_free = X[:, 0]
+            if len(others):
+                if W is None:
+                    W = cache["W"] = X[:, 1:]
+                S = C_f.T @ W
+                try:
+                    currents[others] = np.linalg.solve(S, C_f.T @ v_free + C_d.T @ v[nodes] - e[others])
+                except np.linalg.LinAlgError as error:
+                    raise SingularCircuitError("Système singulier : boucle de sources de tension.") from error
+                cache["currents"] = currents[others]
+                v_free = v_free - W @ currents[others]
+            v[free] = v_free
+            # Courant des sources à la masse : reste de la loi des noeuds
+            residual = z - G @ v - C[:, others] @ currents[others]
+            currents[grounded] = residual[nodes] / coef
+        return np.concatenate((v, currents))
+
+
+def _same_matrix(A, B):
+    return (A.shape == B.shape and A.nnz == B.nnz and np.array_equal(A.indptr, B.indptr)
+            and np.array_equal(A.indices, B.indices) and np.array_equal(A.data, B.data))
@@ -0,0 +1,254 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .base_solver import BaseSolver
+from .netlist import (KIND_BY_CLASS, KIND_CAPACITOR, KIND_INDUCTOR, KIND_RESISTOR,
+                      conductance_pattern, stamp_voltage_sources)
+from .utils import MatrixPattern, use_sparse
+
+# Tolérances relatives par défaut (par nom de classe)
+DEFAULT_TOLERANCES = {"Resistor": 0.05, "Capacitor": 0.10, "Inductor": 0.10}
+TOLERANT_KINDS = (KIND_RESISTOR, KIND_CAPACITOR, KIND_INDUCTOR)
+
+# Au-delà de cette taille, les échantillons sont résolus un par un (LU creux)
+# plutôt que par lots de systèmes denses empilés
+BATCH_DENSE_MAX_SIZE = 64
+
+# Par défaut, un pool de processus n'est lancé qu'au-delà de ce travail
+# (inconnues x échantillons, environ 1 µs chacun) : en dessous, le démarrage
+# des processus coûte plus que l'analyse elle-même
+PARALLEL_MIN_WORK = 100_000
+
+
+class MonteCarloResult:
+    """
+    Statistiques des potentiels de noeuds, agrégées au fil des lots.
+
+    mean, std, minimum, maximum sont indexés comme node_ids ; hist_counts[j]
+    est l'histogramme du noeud node_ids[j] sur les bornes hist_edges[j]
+    (fixées au premier lot). underflow/overflow comptent les échantillons
+    tombés hors de ces bornes.
+    """
+
+    def __init__(self, node_ids, bins):
+        self.node_ids = np.asarray(node_ids)
+        self.bins = bins
+        self.count = 0
+        n = len(self.node_ids)
+        self.mean = np.zeros(n)
+        self._m2 = np.zeros(n)
+        self.minimum = np.full(n, np.inf)
+        self.maximum = np.full(n, -np.inf)
+        self.hist_edges = None
+        self.hist_counts = np.zeros((n, bins), dtype=np.int64)
+        self.underflow = np.zeros(n, dtype=np.int64)
+        self.overflow = np.zeros(n, dtype=np.int64)
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return np.sqrt(self._m2 / (self.count - 1))
+
+    def merge(self, samples):
+        """Ajoute un lot d'échantillons (n_échantillons x n_noeuds)"""
+        samples = np.asarray(samples)
+        count = len(samples)
+        if count == 0:
+            return
+        # Fusion de moyennes/variances (Chan et al.)
+        batch_mean = samples.mean(axis=0)
+        batch_m2 = ((samples - batch_mean) ** 2).sum(axis=0)
+        total = self.count + count
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self._m2 = self._m2 + batch_m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.minimum = np.minimum(self.minimum, samples.min(axis=0))
+        self.maximum = np.maximum(self.maximum, samples.max(axis=0))
+
+        if self.hist_edges is None:
+            low = samples.min(axis=0)
+            high = samples.max(axis=0)
+            margin = np.maximum(0.5 * (high - low), 1e-12 * np.maximum(np.abs(low), 1.0))
+            self.hist_edges = np.linspace(low - margin, high + margin, self.bins + 1, axis=1)
+        low = self.hist_edges[:, 0]
+        width = (self.hist_edges[:, -1] - low) / self.bins
+        position = np.floor((samples - low) / width).astype(np.int64)
+        self.underflow += np.count_nonzero(position < 0, axis=0)
+        self.overflow += np.count_nonzero(position >= self.bins, axis=0)
+        inside = (position >= 0) & (position < self.bins)
+        node_index = np.broadcast_to(np.arange(len(self.node_ids)), samples.shape)
+        np.add.at(self.hist_counts, (node_index[inside], position[inside]), 1)
+
+    def node(self, node_id):
+        """Statistiques d'un noeud : dict mean/std/min/max/edges/counts"""
+        j = int(np.flatnonzero(self.node_ids == int(node_id))[0])
+        return {
+            "mean": float(self.mean[j]),
+            "std": float(self.std[j]),
+            "min": float(self.minimum[j]),
+            "max": float(self.maximum[j]),
+            "edges": self.hist_edges[j] if self.hist_edges is not None else None,
+            "counts": self.hist_counts[j],
+        }
+
+
+class _SampleSolver:
+    """
+    Forme compacte (tableaux seuls) d'un circuit, envoyée une fois à chaque
+    processus de travail, et résolution DC d'un lot de valeurs perturbées.
+    """
+
+    def __init__(self, view, tolerance, distribution, sparse):
+        self.view = view
+        self.tolerance = tolerance
+        self.distribution = distribution
+        self.res = view.of_kind(KIND_RESISTOR)
+        src = view.voltage_sources
+        branch = view.num_v_vars + np.arange(len(src))
+        g_rows, g_cols, self.owner, self.sign = conductance_pattern(view.idx_a[self.res],
+                                                                    view.idx_b[self.res])
+        v_rows, v_cols, self.v_vals = stamp_voltage_sources(view.idx_a[src], view.idx_b[src], branch)
+        self.rows = np.concatenate((g_rows, v_rows))
+        self.cols = np.concatenate((g_cols, v_cols))
+        self.rhs = np.zeros(view.size)
+        self.rhs[branch] = view.value[src]
+        self.batched = not sparse and view.size <= BATCH_DENSE_MAX_SIZE
+        self.pattern = MatrixPattern(self.rows, self.cols, view.size, sparse)
+
+    def perturb(self, rng, count):
+        shape = (count, len(self.view.value))
+        if self.distribution == "gaussian":
+            # La tolérance correspond à 3 écarts-types
+            factor = 1.0 + self.tolerance / 3.0 * rng.standard_normal(shape)
+        else:
+            factor = 1.0 + self.tolerance * rng.uniform(-1.0, 1.0, shape)
+        return self.view.value * factor
+
+    def run(self, seed, count):
+        rng = np.random.default_rng(seed)
+        values = self.perturb(rng, count)
+        conductances = 1.0 / values[:, self.res]
+        term_vals = np.concatenate((self.sign * conductances[:, self.owner],
+                                    np.broadcast_to(self.v_vals, (count, len(self.v_vals)))), axis=1)
+        if self.batched:
+            size = self.view.size
+            A = np.zeros((count, size, size))
+            np.add.at(A, (slice(None), self.rows, self.cols), term_vals)
+            X = np.linalg.solve(A, np.broadcast_to(self.rhs, (count, size))[..., None])[..., 0]
+        else:
+            pattern = self.pattern
+            X = np.array([pattern.factorize(pattern.matrix(v))(self.rhs) for v in term_vals])
+        return self.view.node_potentials(X.T).T
+
+
+_worker_solver = None
+
+
+def _init_worker(sample_solver):
+    global _worker_solver
+    _worker_solver = sample_solver
+
+
+def _run_worker_batch(seed, count):
+    return _worker_solver.run(seed, count)
+
+
+class MonteCarloAnalysis(BaseSolver):
+    """
+    Analyse de dispersion (Monte Carlo) du point de fonctionnement continu.
+
+    Chaque résistance, capacité et inductance est tirée dans sa tolérance,
+    puis le circuit est résolu ; pour les grandes analyses, les lots
+    d'échantillons sont répartis sur un pool de processus. La forme compacte
+    du circuit (NetlistView, uniquement des tableaux NumPy) est transmise une
+    seule fois par processus, via l'initialiseur du pool, et non à chaque
+    lot. Seules les résistances influent sur le point de fonctionnement DC ;
+    capacités et inductances sont tout de même tirées pour que les tirages
+    restent identiques quelle que soit l'analyse.
+    """
+
+    def __init__(self, tolerances=None, distribution="uniform", workers=None,
+                 batch_size=256, bins=50, **kwargs):
+        """
+        Args:
+            tolerances (dict): Tolérance relative par nom de classe
+                ("Resistor") ou par id de dipôle ; DEFAULT_TOLERANCES sinon
+            distribution (str): "uniform" (±tol) ou "gaussian" (tol = 3σ)
+            workers (int): Nombre de processus ; 0 ou 1 pour tout calculer
+                dans le processus courant ; par défaut os.cpu_count() si
+                l'analyse atteint PARALLEL_MIN_WORK, sinon calcul en série
+            batch_size (int): Échantillons par lot envoyé à un processus
+            bins (int): Nombre de classes des histogrammes
+        """
+        super().__init__(**kwargs)
+        if distribution not in ("uniform", "gaussian"):
+            raise ValueError(f"Distribution inconnue : '{distribution}'")
+        self.tolerances = dict(DEFAULT_TOLERANCES if tolerances is None else tolerances)
+        self.distribution = distribution
+        self.workers = workers
+        self.batch_size = max(1, int(batch_size))
+        self.bins = bins
+
+    def solve(self, circuit, num_samples, seed=None, callback=None):
+        """
+        Args:
+            circuit (Circuit): Circuit nominal
+            num_samples (int): Nombre de tirages
+            seed (int): Graine pour des résultats reproductibles, identiques
+                quel que soit le nombre de processus
+            callback (callable): Appelé avec le MonteCarloResult partiel après
+                chaque lot fusionné (dans l'ordre des lots)
+
+        Returns:
+            MonteCarloResult
+        """
+        view = self._compile(circuit)
+        if view is None:
+            return None
+        sparse = use_sparse(view.size, self.backend, self.sparse_threshold)
+        sample_solver = _SampleSolver(view, self._tolerance_array(circuit, view), self.distribution, sparse)
+        result = MonteCarloResult(view.node_ids, self.bins)
+
+        counts = [self.batch_size] * (num_samples // self.batch_size)
+        if num_samples % self.batch_size:
+            counts.append(num_samples % self.batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(counts))
+
+        workers = self.workers
+        if workers is None:
+            workers = (os.cpu_count() or 1) if view.size * num_samples >= PARALLEL_MIN_WORK else 1
+        if workers <= 1 or len(counts) <= 1:
+            for batch_seed, count in zip(seeds, counts):
+                result.merge(sample_solver.run(batch_seed, count))
+                if callback:
+                    callback(result)
+            return result
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(sample_solver,)) as executor:
+            futures = [executor.submit(_run_worker_batch, batch_seed, count)
+                       for batch_seed, count in zip(seeds, counts)]
+            # Fusion dans l'ordre des lots : bornes des histogrammes (fixées
+            # par le premier lot) et arrondis identiques d'une exécution à l'autre
+            for future in futures:
+                result.merge(future.result())
+                if callback:
+                    callback(result)
+        return result
+
+    def _tolerance_array(self, circuit, view):
+        tolerance = np.zeros(len(view.kind))
+        class_names = {cls.__name__: kind for cls, kind in KIND_BY_CLASS.items()}
+        for key, tol in self.tolerances.items():
+            if isinstance(key, str):
+                kind = class_names.get(key)
+                if kind is None:
+                    raise ValueError(f"Type de composant inconnu : '{key}'")
+                tolerance[view.kind == kind] = tol
+        for key, tol in self.tolerances.items():
+            if not isinstance(key, str):
+                tolerance[view.dipole_ids == int(key)] = tol
+        tolerance[~np.isin(view.kind, TOLERANT_KINDS)] = 0.0
+        return tolerance
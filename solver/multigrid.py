@@ -0,0 +1,136 @@
+import numpy as np
+from .utils import PERMC_SPEC, scipy_sparse
+
+# Taille à partir de laquelle le niveau le plus grossier est factorisé (LU)
+COARSE_SIZE = 500
+# Seuil de couplage fort : |a_ij| >= STRENGTH * sqrt(a_ii a_jj)
+STRENGTH = 0.08
+# Balayages de Jacobi amorti avant et après la correction grossière
+SWEEPS = 2
+JACOBI_WEIGHT = 2.0 / 3.0
+
+
+def _tie_break(i, j):
+    # Perturbation symétrique et déterministe des poids : départage les
+    # arêtes de même conductance (maillages réguliers)
+    lo = np.minimum(i, j).astype(np.int64)
+    hi = np.maximum(i, j).astype(np.int64)
+    return 1.0 + 1e-3 * (((lo * 2654435761 + hi * 40503) % 65536) / 65536.0)
+
+
+def pairwise_aggregates(A, strength=STRENGTH, rounds=8):
+    """
+    Agrégats de deux noeuds par appariement : à chaque tour, deux noeuds
+    libres dont chacun est le voisin le plus fortement couplé de l'autre
+    forment un agrégat. Les noeuds restés seuls rejoignent l'agrégat de
+    leur voisin le plus fort, ou forment un agrégat à eux seuls.
+
+    Returns:
+        tuple: (agrégat de chaque noeud, nombre d'agrégats)
+    """
+    A = A.tocoo()
+    n = A.shape[0]
+    diag = np.abs(A.diagonal())
+    i, j, w = A.row, A.col, np.abs(A.data)
+    strong = (i != j) & (w >= strength * np.sqrt(diag[i] * diag[j]))
+    i, j = i[strong], j[strong]
+    w = w[strong] * _tie_break(i, j)
+    aggregate = np.full(n, -1, dtype=np.int64)
+    count = 0
+    for _ in range(rounds):
+        free = (aggregate[i] < 0) & (aggregate[j] < 0)
+        if not np.any(free):
+            break
+        best = _strongest_neighbor(n, i[free], j[free], w[free])
+        nodes = np.flatnonzero(best >= 0)
+        mutual = nodes[(best[best[nodes]] == nodes) & (nodes < best[nodes])]
+        aggregate[mutual] = count + np.arange(len(mutual))
+        aggregate[best[mutual]] = aggregate[mutual]
+        count += len(mutual)
+    # Noeuds restés seuls
+    alone = aggregate < 0
+    if np.any(alone):
+        join = alone[i] & (aggregate[j] >= 0)
+        best = _strongest_neighbor(n, i[join], j[join], w[join])
+        attached = alone & (best >= 0)
+        aggregate[attached] = aggregate[best[attached]]
+        single = np.flatnonzero(aggregate < 0)
+        aggregate[single] = count + np.arange(len(single))
+        count += len(single)
+    return aggregate, count
+
+
+def _strongest_neighbor(n, i, j, w):
+    # Voisin de plus fort poids de chaque noeud (-1 si aucun)
+    best = np.full(n, -1, dtype=np.int64)
+    if len(i):
+        order = np.lexsort((-w, i))
+        first = np.flatnonzero(np.r_[True, i[order][1:] != i[order][:-1]])
+        best[i[order][first]] = j[order][first]
+    return best
+
+
+class AggregationAMG:
+    """
+    Préconditionneur multigrille algébrique par agrégation lissée, pour des
+    matrices de conductance (symétriques définies positives).
+
+    À chaque niveau, deux passes d'appariement (pairwise_aggregates)
+    regroupent les noeuds par quatre environ ; le prolongement constant par
+    agrégat est lissé par un pas de Jacobi. Un cycle en V avec lissage de
+    Jacobi amorti symétrique (même nombre de balayages avant et après)
+    reste un opérateur symétrique, utilisable par le gradient conjugué.
+    Mémoire de l'ordre de quelques fois celle de la matrice, contre un
+    remplissage LU qui croît bien plus vite sur les grands maillages.
+    """
+
+    def __init__(self, A, coarse_size=COARSE_SIZE, sweeps=SWEEPS):
+        sp, spla = scipy_sparse()
+        self.sweeps = sweeps
+        self.levels = []
+        A = sp.csr_matrix(A)
+        while A.shape[0] > coarse_size:
+            n = A.shape[0]
+            first, count = pairwise_aggregates(A)
+            P1 = sp.csr_matrix((np.ones(n), (np.arange(n), first)), shape=(n, count))
+            second, count = pairwise_aggregates(P1.T @ A @ P1)
+            if count >= 0.9 * n:
+                # Plus de couplage fort à regrouper
+                break
+            tentative = sp.csr_matrix((np.ones(n), (np.arange(n), second[first])), shape=(n, count))
+            dinv = 1.0 / A.diagonal()
+            # Lissage du prolongement : (I - w D^-1 A) P0, w = 4/3 / rho(D^-1 A) avec rho <= 2
+            P = (tentative - sp.diags(JACOBI_WEIGHT * dinv) @ (A @ tentative)).tocsr()
+            coarse = (P.T @ A @ P).tocsr()
+            if coarse.nnz > A.nnz:
+                # Graphe peu local (aléatoire) : le lissage densifierait les
+                # niveaux grossiers, le prolongement reste constant par agrégat
+                P = tentative
+                coarse = (P.T @ A @ P).tocsr()
+            self.levels.append((A, P, P.T.tocsr(), dinv))
+            A = coarse
+        self.coarse = spla.splu(A.tocsc(), permc_spec=PERMC_SPEC).solve
+
+    @property
+    def complexity(self):
+        """Complexité d'opérateur : somme des nnz des niveaux / nnz de la matrice"""
+        if not self.levels:
+            return 1.0
+        total = sum(level[0].nnz for level in self.levels)
+        return total / self.levels[0][0].nnz
+
+    def __call__(self, B):
+        return self._cycle(0, B)
+
+    def _cycle(self, level, B):
+        if level == len(self.levels):
+            return self.coarse(B)
+        A, P, R, dinv = self.levels[level]
+        dinv = JACOBI_WEIGHT * dinv[:, None]
+        X = dinv * B
+        for _ in range(self.sweeps - 1):
+            X += dinv * (B - A @ X)
+        X += P @ self._cycle(level + 1, R @ (B - A @ X))
+        for _ in range(self.sweeps):
+            X += dinv * (B - A @ X)
+        return X
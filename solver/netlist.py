@@ -0,0 +1,335 @@
+import numpy as np
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC
+
+# Codes de type des composants dans les tableaux compilés
+KIND_OTHER = -1
+KIND_RESISTOR = 0
+KIND_CAPACITOR = 1
+KIND_INDUCTOR = 2
+KIND_VOLTAGE_DC = 3
+KIND_VOLTAGE_AC = 4
+# Composants non linéaires (Dipole.NONLINEAR), linéarisés par Newton-Raphson
+KIND_NONLINEAR = 5
+
+KIND_BY_CLASS = {
+    Resistor: KIND_RESISTOR,
+    Capacitor: KIND_CAPACITOR,
+    Inductor: KIND_INDUCTOR,
+    VoltageSourceDC: KIND_VOLTAGE_DC,
+    VoltageSourceAC: KIND_VOLTAGE_AC,
+}
+
+# Attribut portant la valeur principale de chaque type
+VALUE_ATTR = {
+    KIND_RESISTOR: "resistance",
+    KIND_CAPACITOR: "capacitance",
+    KIND_INDUCTOR: "inductance",
+    KIND_VOLTAGE_DC: "dc_voltage",
+    KIND_VOLTAGE_AC: "amplitude",
+}
+
+
+def kind_of(dipole):
+    kind = KIND_BY_CLASS.get(type(dipole))
+    if kind is not None:
+        return kind
+    for cls, code in KIND_BY_CLASS.items():
+        if isinstance(dipole, cls):
+            return code
+    if dipole.NONLINEAR:
+        return KIND_NONLINEAR
+    return KIND_OTHER
+
+
+def group_connected_nodes(circuit):
+    """
+    Fusionne les noeuds reliés par des fils (union-find).
+    Retourne un dict {node_id: id du noeud représentant du groupe}.
+    """
+    parent = {node_id: node_id for node_id in circuit.nodes}
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for wire in circuit.wires.values():
+        if wire.node_a and wire.node_b:
+            root_a = find(wire.node_a.id)
+            root_b = find(wire.node_b.id)
+            if root_a != root_b:
+                parent[root_a] = root_b
+
+    return {node_id: find(node_id) for node_id in circuit.nodes}
+
+
+def connected_components(count, a, b):
+    """
+    Composantes connexes d'un graphe de count sommets et d'arêtes (a[k], b[k]),
+    par accrochage et raccourcissement de pointeurs vectorisés (quelques
+    passes, même pour un graphe en chaîne). Retourne le représentant
+    (plus petit sommet) de la composante de chaque sommet.
+    """
+    parent = np.arange(count)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    while True:
+        pa, pb = parent[a], parent[b]
+        differ = pa != pb
+        if not np.any(differ):
+            return parent
+        # Accroche la racine la plus grande de chaque arête à la plus petite
+        lo = np.minimum(pa[differ], pb[differ])
+        hi = np.maximum(pa[differ], pb[differ])
+        np.minimum.at(parent, hi, lo)
+        # Raccourcit jusqu'à ce que chaque sommet pointe sur sa racine
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def lookup_index(node_ids, index, query):
+    """Index (index[j] pour node_ids[j]) des ids de query ; -1 si absent ou négatif"""
+    query = np.asarray(query, dtype=np.int64)
+    order = np.argsort(node_ids)
+    sorted_ids = node_ids[order]
+    pos = np.searchsorted(sorted_ids, query)
+    pos = np.clip(pos, 0, max(len(sorted_ids) - 1, 0))
+    found = (query >= 0) & (len(sorted_ids) > 0)
+    if len(sorted_ids):
+        found &= sorted_ids[pos] == query
+    result = np.full(query.shape, -1, dtype=np.int64)
+    result[found] = index[order[pos[found]]]
+    return result
+
+
+def conductance_pattern(idx_a, idx_b):
+    """
+    Positions des termes d'estampillage de conductances entre idx_a et idx_b
+    (index -1 = masse). Retourne (rows, cols, owner, sign) : le terme k vaut
+    sign[k] * g[owner[k]].
+    """
+    in_a = idx_a >= 0
+    in_b = idx_b >= 0
+    both = in_a & in_b
+    elems = np.arange(len(idx_a))
+    a, b = idx_a[both], idx_b[both]
+    rows = np.concatenate((idx_a[in_a], idx_b[in_b], a, b))
+    cols = np.concatenate((idx_a[in_a], idx_b[in_b], b, a))
+    owner = np.concatenate((elems[in_a], elems[in_b], elems[both], elems[both]))
+    sign = np.concatenate((np.ones(np.count_nonzero(in_a) + np.count_nonzero(in_b)),
+                           -np.ones(2 * np.count_nonzero(both))))
+    return rows, cols, owner, sign
+
+
+def stamp_conductances(idx_a, idx_b, g):
+    """
+    Estampille des conductances entre idx_a et idx_b (index -1 = masse).
+    Retourne les triplets (rows, cols, vals) correspondants.
+    """
+    rows, cols, owner, sign = conductance_pattern(idx_a, idx_b)
+    return rows, cols, sign * g[owner]
+
+
+def stamp_voltage_sources(idx_a, idx_b, branch):
+    """
+    Estampille l'incidence des sources de tension (lignes/colonnes de courant).
+    Retourne les triplets (rows, cols, vals) correspondants.
+    """
+    in_a = idx_a >= 0
+    in_b = idx_b >= 0
+    ones_a = np.ones(np.count_nonzero(in_a))
+    ones_b = np.ones(np.count_nonzero(in_b))
+    rows = np.concatenate((branch[in_a], idx_a[in_a], branch[in_b], idx_b[in_b]))
+    cols = np.concatenate((idx_a[in_a], branch[in_a], idx_b[in_b], branch[in_b]))
+    vals = np.concatenate((ones_a, ones_a, -ones_b, -ones_b))
+    return rows, cols, vals
+
+
+class NetlistView:
+    """
+    Vue compilée d'un Circuit : tableaux NumPy indexés par composant.
+
+    Chaque dipôle est décrit par l'index matriciel de ses deux noeuds
+    (-1 pour la masse ou un noeud absent), un code de type (KIND_*) et
+    sa valeur principale (résistance, capacité, inductance, tension).
+
+    islands[i] identifie le réseau isolé (composante connexe par les fils,
+    dipôles et sous-circuits) de l'inconnue de potentiel i : chaque réseau
+    sans masse a sa propre référence, un de ses noeuds fixé à 0 V.
+    """
+
+    def __init__(self, node_ids, node_index, num_v_vars, dipole_ids, kind, idx_a, idx_b, value, ac_params=None,
+                 islands=None):
+        self.node_ids = node_ids
+        self.node_index = node_index
+        self.num_v_vars = num_v_vars
+        self.dipole_ids = dipole_ids
+        self.kind = kind
+        self.idx_a = idx_a
+        self.idx_b = idx_b
+        self.value = value
+        self.voltage_sources = np.flatnonzero(kind == KIND_VOLTAGE_DC)
+        # Colonnes [fréquence, phase (degrés), offset] des sources AC, dans
+        # l'ordre de of_kind(KIND_VOLTAGE_AC)
+        if ac_params is None:
+            ac_params = np.zeros((np.count_nonzero(kind == KIND_VOLTAGE_AC), 3))
+        self.ac_params = ac_params
+        if islands is None:
+            islands = np.zeros(num_v_vars, dtype=np.int64)
+        self.islands = islands
+
+    @classmethod
+    def from_circuit(cls, circuit, node_groups=None, ground_node=None, floating=False):
+        """
+        Compile un circuit.
+
+        Args:
+            circuit (Circuit): Circuit à compiler
+            node_groups (dict): Groupes de noeuds déjà calculés (optionnel)
+            ground_node (Node): Référence de potentiel de son réseau ; par
+                défaut la masse du circuit. Les réseaux isolés qui ne la
+                contiennent pas prennent leur premier noeud comme référence
+            floating (bool): Seule la masse sert de référence : les groupes de
+                noeuds des réseaux sans masse sont tous des inconnues
+        """
+        if node_groups is None:
+            node_groups = group_connected_nodes(circuit)
+        if ground_node is None:
+            ground_node = circuit.get_ground_node()
+
+        # Table des dipôles
+        count = len(circuit.dipoles)
+        dipole_ids = np.empty(count, dtype=np.int64)
+        kind = np.empty(count, dtype=np.int8)
+        node_a = np.empty(count, dtype=np.int64)
+        node_b = np.empty(count, dtype=np.int64)
+        value = np.zeros(count)
+        ac_params = []
+        for i, dipole in enumerate(circuit.dipoles.values()):
+            code = kind_of(dipole)
+            dipole_ids[i] = dipole.id
+            kind[i] = code
+            node_a[i] = dipole.node_a.id if dipole.node_a else -1
+            node_b[i] = dipole.node_b.id if dipole.node_b else -1
+            if code in VALUE_ATTR:
+                value[i] = getattr(dipole, VALUE_ATTR[code])
+            if code == KIND_VOLTAGE_AC:
+                ac_params.append((dipole.frequency, dipole.phase, dipole.offset))
+
+        # Mapping Noeud -> Groupe -> Index Matrice
+        node_ids = np.fromiter(circuit.nodes.keys(), dtype=np.int64, count=len(circuit.nodes))
+        roots = np.fromiter((node_groups[node_id] for node_id in circuit.nodes),
+                            dtype=np.int64, count=len(circuit.nodes))
+        groups, group_of_node = np.unique(roots, return_inverse=True)
+        group_of_node = group_of_node.astype(np.int64)
+
+        # Réseaux isolés : groupes reliés par un dipôle ou par les ports d'un sous-circuit
+        edges_a = [lookup_index(node_ids, group_of_node, node_a)]
+        edges_b = [lookup_index(node_ids, group_of_node, node_b)]
+        grounded_ports = []
+        for instance in circuit.subcircuits.values():
+            ports = lookup_index(node_ids, group_of_node, [node.id for node in instance.nodes])
+            edges_a.append(ports[:-1])
+            edges_b.append(ports[1:])
+            if instance.definition.circuit.get_ground_node() is not None:
+                grounded_ports.append(ports[0])
+        edges_a = np.concatenate(edges_a)
+        edges_b = np.concatenate(edges_b)
+        connected = (edges_a >= 0) & (edges_b >= 0)
+        island_of_group = connected_components(len(groups), edges_a[connected], edges_b[connected])
+
+        # Une référence par réseau : son noeud de masse, ou à défaut son premier noeud
+        is_reference = np.zeros(len(groups), dtype=bool)
+        if not floating and len(groups):
+            is_ground = np.fromiter((node.is_ground for node in circuit.nodes.values()),
+                                    dtype=bool, count=len(circuit.nodes))
+            # Noeuds de masse en tête : np.unique retient le premier de chaque réseau
+            order = np.argsort(~is_ground, kind="stable")
+            _, first_node = np.unique(island_of_group[group_of_node[order]], return_index=True)
+            is_reference[group_of_node[order[first_node]]] = True
+        # Un sous-circuit référencé à sa masse interne relie son réseau à la masse
+        if grounded_ports:
+            is_reference &= ~np.isin(island_of_group, island_of_group[np.array(grounded_ports)])
+        if ground_node is not None:
+            ground_group = int(np.searchsorted(groups, node_groups[ground_node.id]))
+            is_reference[island_of_group == island_of_group[ground_group]] = False
+            is_reference[ground_group] = True
+        unknown_of_group = np.cumsum(~is_reference) - 1
+        node_index = np.where(is_reference[group_of_node], -1, unknown_of_group[group_of_node])
+
+        view = cls(node_ids, node_index, int(np.count_nonzero(~is_reference)), dipole_ids, kind,
+                   None, None, value, np.array(ac_params, dtype=float).reshape(-1, 3),
+                   islands=island_of_group[~is_reference])
+        view.idx_a = view.matrix_index_of(node_a)
+        view.idx_b = view.matrix_index_of(node_b)
+        return view
+
+    def matrix_index_of(self, node_ids):
+        """Convertit des ids de noeuds en index matriciels (-1 = masse/absent)"""
+        return lookup_index(self.node_ids, self.node_index, node_ids)
+
+    def unknown_islands(self):
+        """
+        Réseau isolé de chaque inconnue du système DC : potentiels, puis
+        courants des sources (rattachés au réseau de leurs bornes)
+        """
+        src = self.voltage_sources
+        ends = np.where(self.idx_a[src] >= 0, self.idx_a[src], self.idx_b[src])
+        # Une source dont les deux bornes sont des références est seule dans son bloc
+        branch_islands = np.where(ends >= 0, self.islands[np.maximum(ends, 0)], -1 - np.arange(len(src)))
+        return np.concatenate((self.islands, branch_islands))
+
+    def of_kind(self, kind):
+        """Positions (dans la table des dipôles) des composants d'un type"""
+        return np.flatnonzero(self.kind == kind)
+
+    @property
+    def size(self):
+        return self.num_v_vars + len(self.voltage_sources)
+
+    def assemble_dc(self, value=None):
+        """
+        Assemble le système MNA du point de fonctionnement continu.
+
+        Args:
+            value (ndarray): Valeurs des composants à utiliser à la place de
+                self.value (même ordre que la table des dipôles)
+
+        Returns:
+            tuple: (rows, cols, vals, rhs) triplets COO et second membre
+        """
+        if value is None:
+            value = self.value
+        res = self.of_kind(KIND_RESISTOR)
+        src = self.voltage_sources
+        branch = self.num_v_vars + np.arange(len(src))
+
+        g_rows, g_cols, g_vals = stamp_conductances(self.idx_a[res], self.idx_b[res], 1.0 / value[res])
+        v_rows, v_cols, v_vals = stamp_voltage_sources(self.idx_a[src], self.idx_b[src], branch)
+
+        rhs = np.zeros(self.size)
+        rhs[branch] = value[src]
+        rows = np.concatenate((g_rows, v_rows))
+        cols = np.concatenate((g_cols, v_cols))
+        vals = np.concatenate((g_vals, v_vals))
+        return rows, cols, vals, rhs
+
+    def _with_ground(self, x):
+        # Ajoute une ligne nulle (masse) adressée par l'index -1 ; x peut
+        # contenir une solution par colonne
+        x = np.asarray(x)[:self.num_v_vars]
+        return np.concatenate((x, np.zeros((1,) + x.shape[1:], dtype=x.dtype)))
+
+    def node_potentials(self, x):
+        """Potentiel de chaque noeud (ordre de node_ids) à partir de la solution"""
+        return self._with_ground(x)[self.node_index]
+
+    def dipole_voltages(self, x):
+        """Tension aux bornes de chaque dipôle à partir de la solution"""
+        x_ext = self._with_ground(x)
+        return x_ext[self.idx_a] - x_ext[self.idx_b]
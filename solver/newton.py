@@ -0,0 +1,78 @@
+import numpy as np
+from .netlist import KIND_NONLINEAR, conductance_pattern
+
+# Critères de convergence de Newton-Raphson : deux itérés successifs
+# diffèrent de moins de VNTOL + RELTOL * |x| sur chaque inconnue
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_RELTOL = 1e-6
+DEFAULT_VNTOL = 1e-9
+
+
+class NonlinearStamps:
+    """
+    Composants non linéaires d'un circuit compilé, regroupés par classe pour
+    évaluer leurs modèles compagnons (Dipole.companion_model) en une fois.
+
+    Chaque composant est estampillé comme une conductance g entre ses bornes
+    (positions rows/cols fixes, comme conductance_pattern) et une source de
+    courant i_eq de a vers b.
+    """
+
+    def __init__(self, circuit, view):
+        self.positions = view.of_kind(KIND_NONLINEAR)
+        self.idx_a = view.idx_a[self.positions]
+        self.idx_b = view.idx_b[self.positions]
+        self.dipoles = [circuit.dipoles[i] for i in view.dipole_ids[self.positions].tolist()]
+        # Une entrée par classe : (classe, index dans self.dipoles, paramètres)
+        by_class = {}
+        for k, dipole in enumerate(self.dipoles):
+            by_class.setdefault(type(dipole), []).append(k)
+        self.groups = []
+        for cls, members in by_class.items():
+            params = np.array([[getattr(self.dipoles[k], attr) for attr in cls.PARAM_ATTRS] for k in members],
+                              dtype=float).reshape(len(members), len(cls.PARAM_ATTRS))
+            self.groups.append((cls, np.array(members), params))
+        self.rows, self.cols, self.owner, self.sign = conductance_pattern(self.idx_a, self.idx_b)
+
+    def __len__(self):
+        return len(self.dipoles)
+
+    def initial_voltages(self):
+        """Tensions actuelles des composants (point de départ de Newton)"""
+        return np.fromiter((dipole.voltage for dipole in self.dipoles), dtype=float, count=len(self.dipoles))
+
+    def voltages(self, view, x):
+        x_ext = view._with_ground(x)
+        return x_ext[self.idx_a] - x_ext[self.idx_b]
+
+    def companion(self, voltage):
+        """Conductances g et courants i_eq des modèles compagnons autour de voltage"""
+        g = np.empty(len(self.dipoles))
+        i_eq = np.empty(len(self.dipoles))
+        for cls, members, params in self.groups:
+            g[members], i_eq[members] = cls.companion_model(params, voltage[members])
+        return g, i_eq
+
+    def limit(self, voltage, previous):
+        limited = voltage.copy()
+        for cls, members, params in self.groups:
+            limited[members] = cls.limit_voltage(params, voltage[members], previous[members])
+        return limited
+
+    def stamp_values(self, g):
+        """Valeurs des termes de conductance (dans l'ordre de rows/cols)"""
+        return self.sign * g[self.owner]
+
+    def injection(self, i_eq, size):
+        """Second membre des sources i_eq (sortant de a, entrant en b)"""
+        rhs = np.zeros(size)
+        in_a = self.idx_a >= 0
+        in_b = self.idx_b >= 0
+        np.subtract.at(rhs, self.idx_a[in_a], i_eq[in_a])
+        np.add.at(rhs, self.idx_b[in_b], i_eq[in_b])
+        return rhs
+
+    def distribute(self, voltage):
+        g, i_eq = self.companion(voltage)
+        for dipole, current in zip(self.dipoles, (g * voltage + i_eq).tolist()):
+            dipole.current = current
@@ -0,0 +1,199 @@
+import json
+import sys
+import time
+import tracemalloc
+import numpy as np
+from .utils import PERMC_SPEC, is_sparse, scipy_linalg, scipy_sparse
+
+
+class SolverObserver:
+    """
+    Interface des observateurs d'un solveur (voir BaseSolver.add_observer).
+    Toutes les méthodes sont facultatives.
+    """
+
+    def phase_started(self, solver, phase):
+        pass
+
+    def phase_finished(self, solver, phase, elapsed):
+        pass
+
+    def matrix_built(self, solver, A, name):
+        pass
+
+
+class _Phase:
+    """Chronomètre d'une phase, notifié aux observateurs du solveur"""
+
+    __slots__ = ("solver", "name", "start")
+
+    def __init__(self, solver, name):
+        self.solver = solver
+        self.name = name
+
+    def __enter__(self):
+        for observer in self.solver.observers:
+            observer.phase_started(self.solver, self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        for observer in self.solver.observers:
+            observer.phase_finished(self.solver, self.name, elapsed)
+        return False
+
+
+class _NoPhase:
+    """Contexte vide, partagé, utilisé quand le solveur n'a pas d'observateur"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_PHASE = _NoPhase()
+
+
+def matrix_nnz(A):
+    if is_sparse(A):
+        return int(A.nnz)
+    return int(np.count_nonzero(A))
+
+
+def condition_estimate(A):
+    """
+    Estimation du conditionnement en norme 1, sans inverser la matrice :
+    gecon (LAPACK) sur la factorisation LU en dense, estimateur de Higham
+    (onenormest) sur A et sur A^-1 via SuperLU en creux.
+    Retourne inf pour une matrice singulière.
+    """
+    size = A.shape[0]
+    if size == 0:
+        return 1.0
+    try:
+        if is_sparse(A):
+            _, spla = scipy_sparse()
+            A = A.tocsc()
+            lu = spla.splu(A, permc_spec=PERMC_SPEC)
+            inverse = spla.LinearOperator((size, size), matvec=lu.solve,
+                                          rmatvec=lambda b: lu.solve(b, trans="T"), dtype=A.dtype)
+            return float(spla.onenormest(A) * spla.onenormest(inverse))
+        sla = scipy_linalg()
+        if sla is not None:
+            lu, _ = sla.lu_factor(A, check_finite=False)
+            if not np.all(np.diag(lu)):
+                return float("inf")
+            gecon, = sla.get_lapack_funcs(("gecon",), (lu,))
+            rcond, _ = gecon(lu, np.linalg.norm(A, 1), norm="1")
+            return 1.0 / rcond if rcond > 0 else float("inf")
+        return float(np.linalg.cond(A, 1))
+    except (RuntimeError, np.linalg.LinAlgError):
+        return float("inf")
+
+
+class SolverProfile(SolverObserver):
+    """
+    Observateur qui cumule le temps de chaque phase et décrit les matrices
+    assemblées.
+
+    Exemple :
+        profile = SolverProfile(condition=True)
+        solver.add_observer(profile)
+        solver.solve(circuit)
+        print(profile.format())
+    """
+
+    def __init__(self, condition=False, allocations=False):
+        """
+        Args:
+            condition (bool): Estime le conditionnement de chaque matrice
+                (coûte environ une factorisation de plus)
+            allocations (bool): Compte les allocations de chaque phase
+                (tracemalloc, ralentit nettement l'exécution)
+        """
+        self.condition = condition
+        self.allocations = allocations
+        self.phases = {}
+        self.matrices = []
+        self._started_tracing = False
+        self._memory = {}
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def phase_started(self, solver, phase):
+        if self.allocations:
+            tracemalloc.reset_peak()
+            self._memory[phase] = (tracemalloc.get_traced_memory()[0], sys.getallocatedblocks())
+
+    def phase_finished(self, solver, phase, elapsed):
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = {"calls": 0, "time": 0.0}
+            if self.allocations:
+                entry.update(blocks=0, peak_bytes=0)
+        entry["calls"] += 1
+        entry["time"] += elapsed
+        if self.allocations and phase in self._memory:
+            start_bytes, start_blocks = self._memory.pop(phase)
+            current, peak = tracemalloc.get_traced_memory()
+            entry["blocks"] += sys.getallocatedblocks() - start_blocks
+            entry["peak_bytes"] = max(entry["peak_bytes"], peak - start_bytes)
+
+    def matrix_built(self, solver, A, name):
+        size = A.shape[0]
+        nnz = matrix_nnz(A)
+        info = {
+            "solver": type(solver).__name__,
+            "name": name,
+            "size": int(size),
+            "nnz": nnz,
+            "density": nnz / size ** 2 if size else 0.0,
+            "backend": "sparse" if is_sparse(A) else "dense",
+        }
+        if self.condition:
+            info["condition"] = condition_estimate(A)
+        self.matrices.append(info)
+
+    def close(self):
+        """Arrête tracemalloc s'il a été démarré par ce profil"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self):
+        self.phases = {}
+        self.matrices = []
+
+    @property
+    def total_time(self):
+        return sum(entry["time"] for entry in self.phases.values())
+
+    def to_dict(self):
+        return {"phases": self.phases, "matrices": self.matrices, "total_time": self.total_time}
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format(self):
+        """Tableau texte des phases et des matrices"""
+        total = self.total_time or 1.0
+        lines = [f"{'phase':>12} {'appels':>7} {'temps (s)':>11} {'part':>6}"
+                 + (f" {'blocs':>9} {'pic (o)':>11}" if self.allocations else "")]
+        for phase, entry in self.phases.items():
+            line = f"{phase:>12} {entry['calls']:7d} {entry['time']:11.6f} {entry['time'] / total:6.1%}"
+            if self.allocations:
+                line += f" {entry['blocks']:9d} {entry['peak_bytes']:11d}"
+            lines.append(line)
+        for info in self.matrices:
+            line = f"matrice {info['name']} ({info['backend']}) : {info['size']} inconnues, {info['nnz']} non nuls"
+            if "condition" in info:
+                line += f", conditionnement ~ {info['condition']:.3g}"
+            lines.append(line)
+        return "\n".join(lines)
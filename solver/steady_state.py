@@ -0,0 +1,130 @@
+import math
+from fractions import Fraction
+import numpy as np
+from .ac_solver import _PointSolver
+from .base_solver import BaseSolver
+from .netlist import KIND_INDUCTOR, KIND_RESISTOR, KIND_VOLTAGE_AC
+from .transient_solver import TransientResult, dc_operating_point
+from .utils import use_sparse
+
+# Dénominateur maximal pour trouver la fréquence fondamentale commune
+FREQUENCY_RESOLUTION = 10 ** 6
+
+# Au-delà de ce rapport entre la période commune et la plus longue période
+# des sources, les fréquences sont considérées comme non commensurables
+MAX_PERIOD_RATIO = 1000
+
+
+class PeriodicSteadyState(BaseSolver):
+    """
+    Régime permanent périodique d'un circuit linéaire, par superposition de
+    phaseurs.
+
+    Chaque fréquence distincte des sources AC est résolue en MNA complexe
+    (A(ω) = G + jωC + Γ/(jω), voir ac_solver), avec seulement les sources
+    de cette fréquence actives ; la composante continue (sources DC et
+    offsets des sources AC) est résolue condensateurs ouverts et bobines
+    court-circuitées. Une période de la somme est ensuite échantillonnée :
+    aucun transitoire n'est intégré, quel que soit le rapport entre la
+    période et les constantes de temps du circuit.
+
+    Les circuits non linéaires demanderont une méthode de tir ou d'équilibre
+    harmonique ; ces résultats en sont le point de départ naturel.
+    """
+
+    def __init__(self, points_per_period=256, periods=1, **kwargs):
+        """
+        Args:
+            points_per_period (int): Échantillons par période
+            periods (int): Nombre de périodes restituées
+        """
+        super().__init__(**kwargs)
+        self.points_per_period = max(2, int(points_per_period))
+        self.periods = max(1, int(periods))
+
+    def solve(self, circuit):
+        """
+        Returns:
+            TransientResult: Formes d'onde sur [0, periods * T] ; stats
+            contient la période T et les fréquences des harmoniques
+        """
+        view = self._compile(circuit)
+        if view is None:
+            return None
+        ac = view.of_kind(KIND_VOLTAGE_AC)
+        frequencies = np.unique(view.ac_params[:, 0][view.value[ac] != 0])
+        if np.any(frequencies <= 0):
+            raise ValueError("Fréquence de source AC nulle ou négative : utiliser une source DC.")
+        period = self._common_period(frequencies)
+        times = np.linspace(0.0, self.periods * period, self.periods * self.points_per_period + 1)
+
+        with self._phase("dc"):
+            potentials, currents = self._dc_component(view)
+        potentials = np.tile(potentials, (len(times), 1))
+        currents = np.tile(currents, (len(times), 1))
+        if len(frequencies):
+            with self._phase("harmonics"):
+                node_phasors, dipole_phasors = self._harmonics(view, frequencies)
+            with self._phase("synthesis"):
+                # Phaseur V pour une source A sin(ωt + φ) : v(t) = Im(V e^{jωt})
+                rotation = np.exp(2j * math.pi * times[:, None] * frequencies[None, :])
+                potentials += (rotation @ node_phasors).imag
+                currents += (rotation @ dipole_phasors).imag
+
+        result = TransientResult.from_arrays(times, view.node_ids, view.dipole_ids, potentials, currents)
+        result.stats = {"period": period, "harmonics": frequencies.tolist()}
+        with self._phase("distribute"):
+            self._distribute_state(circuit, view, potentials[0], currents[0])
+        return result
+
+    def _common_period(self, frequencies):
+        if not len(frequencies):
+            return 1.0
+        fundamental = Fraction(float(frequencies[0])).limit_denominator(FREQUENCY_RESOLUTION)
+        for f in frequencies[1:]:
+            f = Fraction(float(f)).limit_denominator(FREQUENCY_RESOLUTION)
+            # pgcd de deux rationnels
+            fundamental = Fraction(math.gcd(fundamental.numerator * f.denominator, f.numerator * fundamental.denominator),
+                                   fundamental.denominator * f.denominator)
+        period = 1.0 / float(fundamental)
+        if period > MAX_PERIOD_RATIO / float(frequencies.min()):
+            raise ValueError("Fréquences des sources non commensurables : pas de régime périodique.")
+        return period
+
+    def _dc_component(self, view):
+        """Potentiels et courants continus (condensateurs ouverts, bobines en court-circuit)"""
+        res = view.of_kind(KIND_RESISTOR)
+        sources = np.concatenate((view.voltage_sources, view.of_kind(KIND_VOLTAGE_AC)))
+        size = view.num_v_vars + len(sources) + len(view.of_kind(KIND_INDUCTOR))
+        x, inductor_currents = dc_operating_point(
+            view, np.concatenate((view.value[view.voltage_sources], view.ac_params[:, 2])),
+            use_sparse(size, self.backend, self.sparse_threshold))
+        currents = np.zeros(len(view.dipole_ids))
+        currents[res] = view.dipole_voltages(x)[res] / view.value[res]
+        currents[sources] = -x[view.num_v_vars:]
+        currents[view.of_kind(KIND_INDUCTOR)] = inductor_currents
+        return view.node_potentials(x), currents
+
+    def _harmonics(self, view, frequencies):
+        """Phaseurs des noeuds et des dipôles (fréquences x éléments)"""
+        size = view.num_v_vars + len(view.voltage_sources) + len(view.of_kind(KIND_VOLTAGE_AC))
+        point_solver = _PointSolver(view, use_sparse(size, self.backend, self.sparse_threshold))
+        ac = view.of_kind(KIND_VOLTAGE_AC)
+        ac_branch = view.num_v_vars + len(view.voltage_sources) + np.arange(len(ac))
+        excitation = view.value[ac] * np.exp(1j * np.radians(view.ac_params[:, 1]))
+
+        # Une excitation par fréquence : seules les sources de cette fréquence
+        rhs = np.zeros((len(frequencies), point_solver.size), dtype=complex)
+        for k, f in enumerate(frequencies):
+            active = view.ac_params[:, 0] == f
+            rhs[k, ac_branch[active]] = excitation[active]
+        X = point_solver.run(frequencies, rhs)
+        return view.node_potentials(X.T).T, point_solver.dipole_currents(X, frequencies)
+
+    def _distribute_state(self, circuit, view, potentials, currents):
+        # Valeurs au début de la période, comme l'état final de TransientSolver
+        for node, potential in zip(circuit.nodes.values(), potentials.tolist()):
+            node.potential = potential
+        dipoles = circuit.dipoles
+        for dipole_id, current in zip(view.dipole_ids.tolist(), currents.tolist()):
+            dipoles[dipole_id].current = current
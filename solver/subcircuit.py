@@ -0,0 +1,155 @@
+import weakref
+import numpy as np
+from .netlist import KIND_NONLINEAR, NetlistView
+from .utils import build_matrix
+
+# Réductions déjà calculées : {définition: (version du circuit interne, bloc)}
+_REDUCTIONS = weakref.WeakKeyDictionary()
+# Définitions en cours de réduction (détection des blocs qui se contiennent)
+_REDUCING = set()
+
+
+class ReducedSubcircuit:
+    """
+    Équivalent vu des ports d'un sous-circuit linéaire (complément de Schur).
+
+    Le système MNA interne est partitionné entre les potentiels des ports (p)
+    et les autres inconnues (i : potentiels internes, courants des sources) :
+        [A_pp A_pi] [v_p]   [0  ]
+        [A_ip A_ii] [x_i] = [b_i]
+    Le bloc se réduit alors à
+        i_p = Y v_p - J,  Y = A_pp - A_pi A_ii^-1 A_ip,  J = -A_pi A_ii^-1 b_i
+    (i_p : courants entrant dans le bloc par les ports) et les inconnues
+    internes se déduisent des ports : x_i = k0 - K v_p.
+
+    Les instances placées dans le circuit interne sont réduites d'abord, et
+    leur contribution (Y, J) ajoutée à A avant l'élimination.
+    """
+
+    def __init__(self, definition):
+        inner = definition.circuit
+        view = NetlistView.from_circuit(inner, floating=True)
+        if np.any(view.kind == KIND_NONLINEAR):
+            raise ValueError(f"Sous-circuit '{definition.name}' : composant non linéaire, réduction impossible.")
+        rows, cols, vals, rhs = view.assemble_dc()
+        self.nested = []
+        if inner.subcircuits:
+            stamps = SubcircuitStamps(inner, view)
+            b_rows, b_cols, b_vals, b_rhs = stamps.assemble(view.size)
+            rows = np.concatenate((rows, b_rows))
+            cols = np.concatenate((cols, b_cols))
+            vals = np.concatenate((vals, b_vals))
+            rhs = rhs + b_rhs
+            self.nested = [(instances[0].definition, block) for block, instances, _ in stamps.groups]
+        A = build_matrix(rows, cols, vals, view.size, sparse=False)
+
+        ports = view.matrix_index_of([port.id for port in definition.ports])
+        if len(np.unique(ports)) != len(ports):
+            raise ValueError(f"Sous-circuit '{definition.name}' : ports reliés entre eux par des fils.")
+        internal = np.setdiff1d(np.arange(view.size), ports)
+        A_ii = A[np.ix_(internal, internal)]
+        A_ip = A[np.ix_(internal, ports)]
+        A_pi = A[np.ix_(ports, internal)]
+        try:
+            # Une seule résolution pour K = A_ii^-1 A_ip et k0 = A_ii^-1 b_i
+            solved = np.linalg.solve(A_ii, np.column_stack((A_ip, rhs[internal])))
+        except np.linalg.LinAlgError as e:
+            raise ValueError(f"Sous-circuit '{definition.name}' : noeuds internes sans chemin "
+                             "vers les ports, réduction impossible.") from e
+        self.name = definition.name
+        self.view = view
+        self.ports = ports
+        self.internal = internal
+        self.K = solved[:, :-1]
+        self.k0 = solved[:, -1]
+        self.Y = A[np.ix_(ports, ports)] - A_pi @ self.K
+        self.J = -A_pi @ self.k0
+
+    @property
+    def num_ports(self):
+        return len(self.ports)
+
+    def solution(self, port_potentials):
+        """
+        Solution MNA interne complète, une colonne par jeu de potentiels de
+        ports (port_potentials : tableau (instances, ports))
+        """
+        port_potentials = np.atleast_2d(port_potentials)
+        x = np.empty((self.view.size, len(port_potentials)))
+        x[self.ports] = port_potentials.T
+        x[self.internal] = self.k0[:, None] - self.K @ port_potentials.T
+        return x
+
+
+def reduce_subcircuit(definition):
+    """
+    Bloc réduit d'une définition, recalculé seulement si son circuit ou
+    celui d'un bloc qu'il contient a changé
+    """
+    if id(definition) in _REDUCING:
+        raise ValueError(f"Sous-circuit '{definition.name}' : le bloc se contient lui-même.")
+    cached = _REDUCTIONS.get(definition)
+    version = definition.circuit.version
+    _REDUCING.add(id(definition))
+    try:
+        if (cached is not None and cached[0] == version
+                and all(reduce_subcircuit(nested) is block for nested, block in cached[1].nested)):
+            return cached[1]
+        block = ReducedSubcircuit(definition)
+    finally:
+        _REDUCING.discard(id(definition))
+    _REDUCTIONS[definition] = (version, block)
+    return block
+
+
+class SubcircuitStamps:
+    """
+    Contribution des instances de sous-circuits au système global : une
+    matrice Y (ports x ports) et un vecteur J par instance, partagés par
+    toutes les instances d'une même définition.
+    """
+
+    def __init__(self, circuit, view):
+        by_definition = {}
+        for instance in circuit.subcircuits.values():
+            by_definition.setdefault(instance.definition, []).append(instance)
+        self.groups = []
+        for definition, instances in by_definition.items():
+            block = reduce_subcircuit(definition)
+            ports = view.matrix_index_of([[node.id for node in inst.nodes] for inst in instances])
+            self.groups.append((block, instances, ports.reshape(len(instances), block.num_ports)))
+
+    @property
+    def eliminated(self):
+        """Nombre d'inconnues internes éliminées du système global"""
+        return sum(len(block.internal) * len(instances) for block, instances, _ in self.groups)
+
+    def assemble(self, size):
+        """Triplets COO et second membre à ajouter au système global"""
+        rows, cols, vals = [], [], []
+        rhs = np.zeros(size)
+        for block, instances, ports in self.groups:
+            count, n = ports.shape
+            r = np.broadcast_to(ports[:, :, None], (count, n, n))
+            c = np.broadcast_to(ports[:, None, :], (count, n, n))
+            keep = (r >= 0) & (c >= 0)
+            rows.append(r[keep])
+            cols.append(c[keep])
+            vals.append(np.broadcast_to(block.Y, (count, n, n))[keep])
+            connected = ports >= 0
+            np.add.at(rhs, ports[connected], np.broadcast_to(block.J, (count, n))[connected])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), rhs
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals), rhs
+
+    def distribute(self, view, x):
+        """Courants des ports et potentiels internes de chaque instance"""
+        x_ext = view._with_ground(x)
+        for block, instances, ports in self.groups:
+            port_potentials = x_ext[ports]
+            currents = port_potentials @ block.Y.T - block.J
+            potentials = block.view.node_potentials(block.solution(port_potentials))
+            node_ids = block.view.node_ids.tolist()
+            for k, instance in enumerate(instances):
+                instance.port_currents = currents[k].tolist()
+                instance.internal_potentials = dict(zip(node_ids, potentials[:, k].tolist()))
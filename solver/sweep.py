@@ -0,0 +1,144 @@
+import itertools
+import numpy as np
+from .base_solver import BaseSolver
+from .netlist import KIND_RESISTOR, KIND_VOLTAGE_DC, VALUE_ATTR, conductance_pattern, stamp_voltage_sources
+from .utils import MatrixPattern, use_sparse
+
+# Paramètres dont dépend le point de fonctionnement continu
+SWEEPABLE_KINDS = (KIND_RESISTOR, KIND_VOLTAGE_DC)
+
+
+class SweepResult:
+    """
+    Résultats d'un balayage : une ligne par point.
+
+    parameters[(dipole_id, param)] donne les valeurs balayées,
+    potentials[k, j] le potentiel du noeud node_ids[j] au point k et
+    currents[k, j] le courant du dipôle dipole_ids[j].
+    """
+
+    def __init__(self, parameters, node_ids, dipole_ids, potentials, currents):
+        self.parameters = parameters
+        self.node_ids = node_ids
+        self.dipole_ids = dipole_ids
+        self.potentials = potentials
+        self.currents = currents
+
+    def __len__(self):
+        return len(self.potentials)
+
+    def node(self, node_id):
+        j = int(np.flatnonzero(self.node_ids == int(node_id))[0])
+        return self.potentials[:, j]
+
+    def dipole(self, dipole_id):
+        j = int(np.flatnonzero(self.dipole_ids == int(dipole_id))[0])
+        return self.currents[:, j]
+
+
+class DCSweep(BaseSolver):
+    """
+    Balayage de paramètres du point de fonctionnement continu.
+
+    Le circuit n'est compilé (groupement des noeuds, index matriciels,
+    structure de la matrice) qu'une fois pour tout le balayage :
+    - si seules des tensions de sources varient, la matrice est factorisée
+      une fois et tous les seconds membres sont résolus en un seul appel ;
+    - si des résistances varient, seules les valeurs numériques de la
+      matrice sont reconstruites à chaque point.
+    Le circuit lui-même n'est pas modifié.
+    """
+
+    def solve(self, circuit, grid, cartesian=False):
+        """
+        Args:
+            circuit (Circuit): Circuit à balayer
+            grid (dict): {dipole_id: valeurs} ou {(dipole_id, param): valeurs}.
+                Le paramètre par défaut est la valeur principale du dipôle
+                (resistance, dc_voltage)
+            cartesian (bool): Produit cartésien des listes de valeurs ; sinon
+                elles sont parcourues en parallèle et doivent avoir la même longueur
+
+        Returns:
+            SweepResult
+        """
+        view = self._compile(circuit)
+        if view is None:
+            return None
+        parameters, positions, values = self._parse_grid(view, grid, cartesian)
+        num_points = values.shape[0]
+
+        res = view.of_kind(KIND_RESISTOR)
+        src = view.voltage_sources
+        branch = view.num_v_vars + np.arange(len(src))
+        branch_of = np.full(len(view.kind), -1, dtype=np.int64)
+        branch_of[src] = branch
+        changes_matrix = bool(np.any(view.kind[positions] == KIND_RESISTOR))
+
+        # Second membre de chaque point (une colonne par point)
+        B = np.zeros((view.size, num_points))
+        B[branch, :] = view.value[src][:, None]
+        is_source = view.kind[positions] == KIND_VOLTAGE_DC
+        B[branch_of[positions[is_source]], :] = values[:, is_source].T
+
+        sparse = use_sparse(view.size, self.backend, self.sparse_threshold)
+        g_rows, g_cols, owner, sign = conductance_pattern(view.idx_a[res], view.idx_b[res])
+        v_rows, v_cols, v_vals = stamp_voltage_sources(view.idx_a[src], view.idx_b[src], branch)
+        pattern = MatrixPattern(np.concatenate((g_rows, v_rows)), np.concatenate((g_cols, v_cols)),
+                                view.size, sparse)
+
+        # Résistances de chaque point (n_resistances x n_points)
+        resistances = np.repeat(view.value[res][:, None], num_points, axis=1)
+        res_of = np.full(len(view.kind), -1, dtype=np.int64)
+        res_of[res] = np.arange(len(res))
+        is_res = view.kind[positions] == KIND_RESISTOR
+        resistances[res_of[positions[is_res]], :] = values[:, is_res].T
+
+        if not changes_matrix:
+            # Une factorisation, tous les seconds membres d'un coup
+            g = 1.0 / view.value[res]
+            solve = pattern.factorize(pattern.matrix(np.concatenate((sign * g[owner], v_vals))))
+            X = solve(B) if num_points else B
+        else:
+            # Structure réutilisée, seules les valeurs numériques changent
+            X = np.empty_like(B)
+            for k in range(num_points):
+                g = 1.0 / resistances[:, k]
+                A = pattern.matrix(np.concatenate((sign * g[owner], v_vals)))
+                X[:, k] = pattern.factorize(A)(B[:, k])
+
+        potentials = view.node_potentials(X).T
+        currents = np.zeros((num_points, len(view.dipole_ids)))
+        currents[:, res] = (view.dipole_voltages(X)[res] / resistances).T
+        currents[:, src] = -X[branch].T
+        return SweepResult(parameters, view.node_ids, view.dipole_ids, potentials, currents)
+
+    def _parse_grid(self, view, grid, cartesian):
+        keys = []
+        positions = []
+        columns = []
+        for key, vals in grid.items():
+            dipole_id, param = key if isinstance(key, tuple) else (key, None)
+            found = np.flatnonzero(view.dipole_ids == int(dipole_id))
+            if not len(found):
+                raise ValueError(f"Dipôle inconnu dans le balayage : {dipole_id}")
+            pos = int(found[0])
+            kind = int(view.kind[pos])
+            if kind not in SWEEPABLE_KINDS or param not in (None, VALUE_ATTR[kind]):
+                raise ValueError(f"Paramètre sans effet sur le point de fonctionnement DC : "
+                                 f"{dipole_id}.{param}")
+            keys.append((int(dipole_id), VALUE_ATTR[kind]))
+            positions.append(pos)
+            columns.append(np.asarray(vals, dtype=float).ravel())
+
+        if cartesian and columns:
+            values = np.array(list(itertools.product(*columns)), dtype=float)
+        elif columns:
+            lengths = {len(c) for c in columns}
+            if len(lengths) != 1:
+                raise ValueError("Les listes de valeurs balayées doivent avoir la même longueur.")
+            values = np.column_stack(columns)
+        else:
+            values = np.zeros((1, 0))
+        parameters = {key: values[:, k] for k, key in enumerate(keys)}
+        return parameters, np.array(positions, dtype=np.int64), values
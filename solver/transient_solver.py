@@ -0,0 +1,440 @@
+import math
+import numpy as np
+from .base_solver import BaseSolver
+from .diagnostics import SingularCircuitError
+from .netlist import (KIND_CAPACITOR, KIND_INDUCTOR, KIND_RESISTOR, KIND_VOLTAGE_AC,
+                      KIND_VOLTAGE_DC, conductance_pattern, stamp_conductances,
+                      stamp_voltage_sources)
+from .utils import MatrixPattern, build_matrix, incidence_matrix, solve_matrix, use_sparse
+from .waveform_store import WaveformStore
+
+METHODS = ("be", "trap")
+INITIAL_STATES = ("dc", "zero")
+
+# Conductance de fuite vers la masse du point de fonctionnement continu : fixe
+# le potentiel des noeuds reliés au reste du circuit par des condensateurs seuls
+DC_GMIN = 1e-12
+
+
+def dc_operating_point(view, source_values, sparse):
+    """
+    Point de fonctionnement continu : condensateurs ouverts, bobines en
+    court-circuit (sources de tension nulles).
+
+    Args:
+        view (NetlistView): Circuit compilé
+        source_values (ndarray): Tensions des sources DC puis AC
+        sparse (bool): Matrice creuse
+
+    Returns:
+        tuple: Solution MNA (potentiels puis courants de branche des sources,
+        comme TransientEngine.x) et courants des bobines, orientés de a vers b
+    """
+    res = view.of_kind(KIND_RESISTOR)
+    ind = view.of_kind(KIND_INDUCTOR)
+    branches = np.concatenate((view.voltage_sources, view.of_kind(KIND_VOLTAGE_AC), ind))
+    size = view.num_v_vars + len(branches)
+    branch = view.num_v_vars + np.arange(len(branches))
+
+    g_rows, g_cols, g_vals = stamp_conductances(view.idx_a[res], view.idx_b[res], 1.0 / view.value[res])
+    v_rows, v_cols, v_vals = stamp_voltage_sources(view.idx_a[branches], view.idx_b[branches], branch)
+    nodes = np.arange(view.num_v_vars)
+    rows = np.concatenate((g_rows, v_rows, nodes))
+    cols = np.concatenate((g_cols, v_cols, nodes))
+    vals = np.concatenate((g_vals, v_vals, np.full(view.num_v_vars, DC_GMIN)))
+    rhs = np.zeros(size)
+    rhs[branch[:len(branches) - len(ind)]] = source_values
+
+    x = np.zeros(size)
+    if size:
+        x = solve_matrix(build_matrix(rows, cols, vals, size, sparse), rhs)
+    return x[:size - len(ind)], x[size - len(ind):]
+
+
+class TransientResult:
+    """
+    Formes d'onde d'une simulation temporelle.
+
+    potentials[k, j] est le potentiel du noeud node_ids[j] à l'instant
+    times[k], currents[k, j] le courant du dipôle dipole_ids[j].
+    """
+
+    def __init__(self, node_ids, dipole_ids, capacity=1024):
+        self.node_ids = np.asarray(node_ids)
+        self.dipole_ids = np.asarray(dipole_ids)
+        self.stats = {}
+        self._count = 0
+        self._times = np.empty(capacity)
+        self._potentials = np.empty((capacity, len(self.node_ids)))
+        self._currents = np.empty((capacity, len(self.dipole_ids)))
+
+    @classmethod
+    def from_arrays(cls, times, node_ids, dipole_ids, potentials, currents):
+        """Résultat construit directement à partir de tableaux complets"""
+        result = cls(node_ids, dipole_ids, capacity=0)
+        result._times = np.asarray(times, dtype=float)
+        result._potentials = np.asarray(potentials, dtype=float)
+        result._currents = np.asarray(currents, dtype=float)
+        result._count = len(result._times)
+        return result
+
+    def append(self, t, potentials, currents):
+        if self._count == len(self._times):
+            self._grow(max(2 * self._count, 16))
+        k = self._count
+        self._times[k] = t
+        self._potentials[k] = potentials
+        self._currents[k] = currents
+        self._count += 1
+
+    def _grow(self, capacity):
+        self._times = np.resize(self._times, capacity)
+        self._potentials = np.resize(self._potentials, (capacity, len(self.node_ids)))
+        self._currents = np.resize(self._currents, (capacity, len(self.dipole_ids)))
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def times(self):
+        return self._times[:self._count]
+
+    @property
+    def potentials(self):
+        return self._potentials[:self._count]
+
+    @property
+    def currents(self):
+        return self._currents[:self._count]
+
+    def node(self, node_id):
+        """Forme d'onde du potentiel d'un noeud"""
+        j = int(np.flatnonzero(self.node_ids == int(node_id))[0])
+        return self.potentials[:, j]
+
+    def dipole(self, dipole_id):
+        """Forme d'onde du courant d'un dipôle"""
+        j = int(np.flatnonzero(self.dipole_ids == int(dipole_id))[0])
+        return self.currents[:, j]
+
+
+class TransientEngine:
+    """
+    Moteur d'intégration temporelle sur le système MNA d'une NetlistView.
+
+    Condensateurs et bobines sont remplacés par leur modèle compagnon : une
+    conductance g en parallèle avec une source de courant d'historique J,
+    de sorte que le courant de l'élément vaut i = g*v + J. Pour un pas dt et
+    une méthode donnés la matrice est constante : elle est factorisée une
+    seule fois puis seul le second membre est mis à jour à chaque pas.
+    """
+
+    def __init__(self, view, sparse):
+        self.view = view
+        self.sparse = sparse
+        self.res = view.of_kind(KIND_RESISTOR)
+        self.sources = np.concatenate((view.of_kind(KIND_VOLTAGE_DC), view.of_kind(KIND_VOLTAGE_AC)))
+        self.num_dc = len(view.voltage_sources)
+        self.size = view.num_v_vars + len(self.sources)
+        self.branch = view.num_v_vars + np.arange(len(self.sources))
+
+        # Éléments dynamiques : condensateurs puis bobines
+        self.dyn = np.concatenate((view.of_kind(KIND_CAPACITOR), view.of_kind(KIND_INDUCTOR)))
+        self.is_cap = view.kind[self.dyn] == KIND_CAPACITOR
+        self.dyn_value = view.value[self.dyn]
+        self.P = incidence_matrix(view.idx_a[self.dyn], view.idx_b[self.dyn], self.size, sparse)
+
+        # Partie constante de la matrice (résistances + incidence des sources)
+        g_rows, g_cols, g_vals = stamp_conductances(view.idx_a[self.res], view.idx_b[self.res],
+                                                    1.0 / view.value[self.res])
+        v_rows, v_cols, v_vals = stamp_voltage_sources(view.idx_a[self.sources], view.idx_b[self.sources],
+                                                       self.branch)
+        self._static = (np.concatenate((g_rows, v_rows)),
+                        np.concatenate((g_cols, v_cols)),
+                        np.concatenate((g_vals, v_vals)))
+
+        ac = view.ac_params
+        self.ac_amplitude = view.value[view.of_kind(KIND_VOLTAGE_AC)]
+        self.ac_omega = 2 * math.pi * ac[:, 0]
+        self.ac_phi = np.radians(ac[:, 1])
+        self.ac_offset = ac[:, 2]
+        self._source_buffer = np.zeros(len(self.sources))
+        self._source_buffer[:self.num_dc] = view.value[view.voltage_sources]
+
+        # Structure commune à tous les pas : les termes des éléments dynamiques
+        # suivent ceux de la partie constante
+        dyn_rows, dyn_cols, _, _ = conductance_pattern(view.idx_a[self.dyn], view.idx_b[self.dyn])
+        self.pattern = MatrixPattern(np.concatenate((self._static[0], dyn_rows)),
+                                     np.concatenate((self._static[1], dyn_cols)), self.size, sparse)
+
+        self._factors = {}
+        self.x = np.zeros(self.size)
+        self.v = np.zeros(len(self.dyn))
+        self.i = np.zeros(len(self.dyn))
+
+    def initialize_dc(self, t=0.0):
+        """État initial : point de fonctionnement continu des sources à l'instant t"""
+        try:
+            x, inductor_currents = dc_operating_point(self.view, self.source_values(t), self.sparse)
+        except (np.linalg.LinAlgError, RuntimeError):
+            raise SingularCircuitError("Point de fonctionnement initial singulier (boucle de bobines ou "
+                                       "de sources ?) : utiliser initial=\"zero\"")
+        self.x = x
+        self.v = self.P.T @ x
+        self.i = np.zeros(len(self.dyn))
+        self.i[~self.is_cap] = inductor_currents
+
+    def conductances(self, dt, method):
+        k = 2.0 if method == "trap" else 1.0
+        return np.where(self.is_cap, k * self.dyn_value / dt, dt / (k * self.dyn_value))
+
+    def factor(self, dt, method):
+        """Factorisation (mise en cache) de la matrice pour un pas et une méthode"""
+        key = (dt, method)
+        entry = self._factors.get(key)
+        if entry is None:
+            g = self.conductances(dt, method)
+            _, _, vals = stamp_conductances(self.view.idx_a[self.dyn], self.view.idx_b[self.dyn], g)
+            A = self.pattern.matrix(np.concatenate((self._static[2], vals)))
+            # Coefficients de l'historique : J = hv*v + hi*i
+            if method == "trap":
+                hv = np.where(self.is_cap, -g, g)
+                hi = np.where(self.is_cap, -1.0, 1.0)
+            else:
+                hv = np.where(self.is_cap, -g, 0.0)
+                hi = np.where(self.is_cap, 0.0, 1.0)
+            entry = (self.pattern.factorize(A), g, hv, hi)
+            self._factors[key] = entry
+        return entry
+
+    def source_values(self, t):
+        values = self._source_buffer
+        if len(self.ac_omega):
+            values[self.num_dc:] = self.ac_offset + self.ac_amplitude * np.sin(self.ac_omega * t + self.ac_phi)
+        return values
+
+    def step(self, t_next, dt, method):
+        """Avance l'état d'un pas ; retourne la nouvelle solution x"""
+        solve, g, hv, hi = self.factor(dt, method)
+        J = hv * self.v + hi * self.i
+        rhs = -(self.P @ J)
+        rhs[self.branch] += self.source_values(t_next)
+        x = solve(rhs)
+        v = self.P.T @ x
+        self.i = g * v + J
+        self.v = v
+        self.x = x
+        return x
+
+    def state(self):
+        """Variables d'état : tension des condensateurs, courant des bobines"""
+        return np.where(self.is_cap, self.v, self.i)
+
+    def save(self):
+        return self.x, self.v, self.i
+
+    def restore(self, saved):
+        self.x, self.v, self.i = saved
+
+    def potentials(self, x=None):
+        return self.view.node_potentials(self.x if x is None else x)
+
+    def currents(self, x=None):
+        x = self.x if x is None else x
+        view = self.view
+        currents = np.zeros(len(view.dipole_ids))
+        voltages = view.dipole_voltages(x)
+        currents[self.res] = voltages[self.res] / view.value[self.res]
+        currents[self.dyn] = self.i
+        currents[self.sources] = -x[self.branch]
+        return currents
+
+
+class TransientSolver(BaseSolver):
+    """
+    Simulation temporelle à pas fixe ou adaptatif.
+
+    Par défaut, l'état initial est le point de fonctionnement continu des
+    sources à t = 0 (condensateurs ouverts, bobines en court-circuit) ;
+    initial="zero" part d'un état nul (condensateurs déchargés, bobines sans
+    courant), comme l'option UIC de SPICE. Avec la méthode des trapèzes, le
+    premier pas est fait en Euler implicite pour amortir une éventuelle
+    inconsistance de l'état initial : au plus deux factorisations sont donc
+    calculées pour toute la simulation à pas fixe.
+
+    En mode adaptatif, l'erreur de troncature locale (LTE) des variables
+    d'état est estimée par différences divisées sur les derniers pas
+    acceptés ; un pas est rejeté si elle dépasse reltol*|x| + abstol. Les pas
+    sont arrondis à dt_max / 2^k pour que chaque taille de pas ne soit
+    factorisée qu'une fois.
+    """
+
+    def __init__(self, dt=1e-5, t_stop=1e-3, method="trap", record_every=1,
+                 adaptive=False, reltol=1e-3, abstol=1e-6, dt_min=None, dt_max=None,
+                 store_path=None, chunk_size=4096, initial="dc", **kwargs):
+        """
+        Args:
+            dt (float): Pas de temps (s) ; en mode adaptatif, pas initial (non
+                contrôlé faute d'historique : le choisir petit devant la plus
+                petite constante de temps)
+            t_stop (float): Durée simulée (s)
+            method (str): "be" (Euler implicite) ou "trap" (trapèzes)
+            record_every (int): N'enregistre qu'un pas sur record_every
+            adaptive (bool): Active le contrôle du pas par estimation de la LTE
+            reltol (float): Tolérance relative sur les variables d'état
+            abstol (float): Tolérance absolue sur les variables d'état
+            dt_min (float): Pas minimal (défaut : dt / 1e6)
+            dt_max (float): Pas maximal (défaut : t_stop / 50)
+            store_path (str): Si fourni, les résultats sont écrits au fil de
+                l'eau dans un WaveformStore sur disque (mémoire constante)
+                au lieu d'un TransientResult en mémoire
+            chunk_size (int): Taille des blocs d'écriture du WaveformStore
+            initial (str): "dc" (point de fonctionnement continu à t = 0)
+                ou "zero" (condensateurs déchargés, bobines sans courant)
+        """
+        super().__init__(**kwargs)
+        if method not in METHODS:
+            raise ValueError(f"Méthode d'intégration inconnue : '{method}'")
+        if initial not in INITIAL_STATES:
+            raise ValueError(f"État initial inconnu : '{initial}'")
+        self.dt = float(dt)
+        self.t_stop = float(t_stop)
+        self.method = method
+        self.record_every = max(1, int(record_every))
+        self.adaptive = adaptive
+        self.reltol = float(reltol)
+        self.abstol = float(abstol)
+        self.dt_min = float(dt_min) if dt_min is not None else self.dt * 1e-6
+        self.dt_max = float(dt_max) if dt_max is not None else self.t_stop / 50
+        self.store_path = store_path
+        self.chunk_size = chunk_size
+        self.initial = initial
+
+    def solve(self, circuit):
+        view = self._compile(circuit)
+        if view is None:
+            return None
+        with self._phase("assemble"):
+            engine = self._create_engine(view)
+        if self.initial == "dc":
+            with self._phase("initial"):
+                engine.initialize_dc()
+        num_steps = int(round(self.t_stop / self.dt)) if engine.size else 0
+        result = self._create_result(view, 1024 if self.adaptive else num_steps // self.record_every + 1)
+        try:
+            with self._phase("integrate"):
+                if self.adaptive:
+                    self._run_adaptive(engine, result)
+                else:
+                    self._run_fixed(engine, result, num_steps)
+            with self._phase("distribute"):
+                self._distribute_state(circuit, view, engine)
+        except BaseException:
+            # Pas de stockage partiel : fichier fermé puis supprimé
+            if isinstance(result, WaveformStore):
+                result.discard()
+            raise
+        if isinstance(result, WaveformStore):
+            result.close()
+        return result
+
+    def _create_result(self, view, capacity=1024):
+        if self.store_path is not None:
+            return WaveformStore.for_view(self.store_path, view, self.chunk_size)
+        return TransientResult(view.node_ids, view.dipole_ids, capacity=capacity)
+
+    def _run_fixed(self, engine, result, num_steps):
+        result.append(0.0, engine.potentials(), engine.currents())
+
+        for k in range(1, num_steps + 1):
+            method = "be" if k == 1 else self.method
+            engine.step(k * self.dt, self.dt, method)
+            if k % self.record_every == 0:
+                result.append(k * self.dt, engine.potentials(), engine.currents())
+        result.stats = {"steps": num_steps, "rejected": 0, "factorizations": len(engine._factors)}
+
+    def _run_adaptive(self, engine, result):
+        result.append(0.0, engine.potentials(), engine.currents())
+        if not engine.size:
+            return
+
+        order = 2 if self.method == "trap" else 1
+        # dt_max ramené à un diviseur de t_stop : la fin de la simulation tombe
+        # sur la grille dt_max / 2^k, dernier pas compris
+        dt_max = self.t_stop / math.ceil(self.t_stop / self.dt_max * (1 - 1e-12))
+        dt = self._quantize(min(self.dt, dt_max), dt_max)
+        # Derniers points acceptés (t, état) pour les différences divisées
+        history = [(0.0, engine.state())]
+        t = 0.0
+        steps = rejected = 0
+
+        t_end = self.t_stop * (1 - 1e-12)
+        while t < t_end:
+            h = min(dt, self._quantize(self.t_stop - t, dt_max))
+            # Arrondis de la somme des pas : le dernier instant est exactement t_stop
+            t_next = t + h if t + h < t_end else self.t_stop
+            method = self.method if len(history) > 1 else "be"
+            saved = engine.save()
+            engine.step(t_next, h, method)
+            state = engine.state()
+
+            # Ordre réduit tant que l'historique est trop court
+            p = min(order, len(history) - 1)
+            ratio = 0.0
+            if p >= 1:
+                lte = self._local_error(history[-(p + 1):] + [(t_next, state)], h, p)
+                scale = self.reltol * np.maximum(np.abs(state), np.abs(history[-1][1])) + self.abstol
+                ratio = float(np.max(lte / scale)) if len(lte) else 0.0
+
+            if ratio > 1.0 and h > self.dt_min:
+                # Pas rejeté : on revient à l'état précédent avec un pas réduit
+                engine.restore(saved)
+                rejected += 1
+                factor = max(0.1, 0.9 * ratio ** (-1.0 / (p + 1)))
+                dt = self._quantize(max(h * factor, self.dt_min), dt_max)
+                continue
+
+            t = t_next
+            steps += 1
+            history = history[-order:] + [(t, state)]
+            if steps % self.record_every == 0 or t >= t_end:
+                result.append(t, engine.potentials(), engine.currents())
+            if p >= 1:
+                factor = 2.0 if ratio == 0.0 else min(2.0, max(0.1, 0.9 * ratio ** (-1.0 / (p + 1))))
+                dt = self._quantize(max(h * factor, self.dt_min), dt_max)
+
+        result.stats = {"steps": steps, "rejected": rejected, "factorizations": len(engine._factors)}
+
+    @staticmethod
+    def _local_error(points, h, order):
+        """
+        LTE estimée par différences divisées des variables d'état :
+        Euler implicite : h²/2 * x'' ; trapèzes : h³/12 * x'''
+        """
+        times = [p[0] for p in points]
+        diffs = [p[1] for p in points]
+        for level in range(1, order + 2):
+            diffs = [(diffs[k + 1] - diffs[k]) / (times[k + level] - times[k])
+                     for k in range(len(diffs) - 1)]
+        derivative = math.factorial(order + 1) * diffs[0]
+        coeff = 0.5 if order == 1 else 1.0 / 12.0
+        return np.abs(coeff * h ** (order + 1) * derivative)
+
+    @staticmethod
+    def _quantize(dt, dt_max):
+        # Arrondi à dt_max / 2^k : un nombre borné de pas distincts à factoriser
+        k = max(0, math.ceil(math.log2(dt_max / dt) - 1e-9))
+        return dt_max / 2 ** k
+
+    def _create_engine(self, view):
+        size = view.size + len(view.of_kind(KIND_VOLTAGE_AC))
+        sparse = use_sparse(size, self.backend, self.sparse_threshold)
+        return TransientEngine(view, sparse)
+
+    def _distribute_state(self, circuit, view, engine):
+        # État final dans le modèle, comme pour DCSolver
+        for node, potential in zip(circuit.nodes.values(), engine.potentials().tolist()):
+            node.potential = potential
+        dipoles = circuit.dipoles
+        for dipole_id, current in zip(view.dipole_ids.tolist(), engine.currents().tolist()):
+            dipoles[dipole_id].current = current
@@ -0,0 +1,239 @@
+import sys
+import warnings
+import numpy as np
+
+# SciPy (plusieurs centaines de ms d'import) n'est chargé qu'au premier
+# besoin : scipy.linalg pour la première factorisation dense, scipy.sparse
+# pour le premier système creux. Un circuit résolu par np.linalg.solve
+# n'importe que NumPy.
+_scipy_modules = {}
+
+
+def scipy_linalg():
+    """Module scipy.linalg, importé au premier appel ; None si SciPy est absent"""
+    if "linalg" not in _scipy_modules:
+        try:
+            import scipy.linalg as sla
+        except ImportError:
+            sla = None
+        _scipy_modules["linalg"] = sla
+    return _scipy_modules["linalg"]
+
+
+def scipy_sparse():
+    """
+    Modules (scipy.sparse, scipy.sparse.linalg), importés au premier appel ;
+    (None, None) si SciPy est absent (seul le backend dense est disponible)
+    """
+    if "sparse" not in _scipy_modules:
+        try:
+            import scipy.sparse as sp
+            import scipy.sparse.linalg as spla
+        except ImportError:
+            sp = spla = None
+        _scipy_modules["sparse"] = (sp, spla)
+    return _scipy_modules["sparse"]
+
+
+def is_sparse(A):
+    # Une matrice creuse n'existe que si scipy.sparse a déjà été importé
+    sp = sys.modules.get("scipy.sparse")
+    return sp is not None and sp.issparse(A)
+
+# Nombre d'inconnues MNA (noeuds hors masse + courants de sources) à partir
+# duquel le backend creux devient plus rapide que np.linalg.solve.
+# Mesuré avec benchmarks/bench_dc_scaling.py sur des maillages 2D de
+# résistances : le dense reste plus rapide en dessous d'environ 200 inconnues
+# (surcoût de conversion COO -> CSC et de SuperLU), le creux gagne nettement
+# au-delà et reste le seul utilisable à partir de quelques milliers de noeuds.
+SPARSE_THRESHOLD = 200
+
+# Ordonnancement des colonnes demandé à SuperLU. Les matrices MNA ont une
+# structure symétrique : le degré minimum sur A^T + A remplit bien moins que
+# COLAMD, l'ordonnancement par défaut de SciPy (benchmarks/bench_suite.py :
+# factorisation d'un graphe aléatoire de 20 000 noeuds 61 s -> 5.6 s, maillage
+# 2D de 100 000 noeuds 0.77 s -> 0.55 s ; Cuthill-McKee inversé fait pire que
+# COLAMD sur ces deux cas)
+PERMC_SPEC = "MMD_AT_PLUS_A"
+
+
+def sparse_available():
+    return scipy_sparse()[0] is not None
+
+
+def use_sparse(size, backend="auto", threshold=SPARSE_THRESHOLD):
+    """
+    Choisit le backend de résolution
+
+    Args:
+        size (int): Nombre d'inconnues du système
+        backend (str): "auto", "dense" ou "sparse"
+        threshold (int): Taille de bascule pour le mode "auto"
+    """
+    if backend == "dense":
+        return False
+    if backend == "sparse":
+        if not sparse_available():
+            raise RuntimeError("Le backend creux nécessite SciPy.")
+        return True
+    if backend != "auto":
+        raise ValueError(f"Backend de résolution inconnu : '{backend}'")
+    return size >= threshold and sparse_available()
+
+
+def build_matrix(rows, cols, vals, size, sparse):
+    """
+    Construit la matrice du système à partir de triplets (COO).
+    Les doublons sont additionnés, comme lors d'un estampillage classique.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    vals = np.asarray(vals)
+    if sparse:
+        sp, _ = scipy_sparse()
+        return sp.csc_matrix((vals, (rows, cols)), shape=(size, size))
+    A = np.zeros((size, size), dtype=vals.dtype if vals.size else float)
+    np.add.at(A, (rows, cols), vals)
+    return A
+
+
+def solve_matrix(A, Z):
+    if is_sparse(A):
+        _, spla = scipy_sparse()
+        return spla.splu(A.tocsc(), permc_spec=PERMC_SPEC).solve(np.asarray(Z, dtype=A.dtype))
+    return np.linalg.solve(A, Z)
+
+
+def least_squares(A, Z):
+    """
+    Solution aux moindres carrés (norme minimale pour un système singulier) :
+    lstsq (SVD) en dense, LSMR itératif en creux
+    """
+    if is_sparse(A):
+        _, spla = scipy_sparse()
+        Z = np.asarray(Z, dtype=A.dtype)
+        return spla.lsmr(A, Z, atol=1e-14, btol=1e-14, maxiter=10 * A.shape[0])[0]
+    return np.linalg.lstsq(A, Z, rcond=None)[0]
+
+
+def factorize(A):
+    """
+    Factorise la matrice une seule fois (LU).
+    Retourne une fonction solve(b) réutilisable pour chaque second membre.
+    """
+    if is_sparse(A):
+        _, spla = scipy_sparse()
+        return spla.splu(A.tocsc(), permc_spec=PERMC_SPEC).solve
+    sla = scipy_linalg()
+    if sla is not None:
+        # Appel direct à LAPACK (getrs) : évite le coût des vérifications de
+        # lu_solve, dominant pour les petits systèmes résolus des millions de fois
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", sla.LinAlgWarning)
+            lu, piv = sla.lu_factor(A, check_finite=False)
+        if not np.all(np.diag(lu)):
+            raise np.linalg.LinAlgError("Singular matrix")
+        getrs, = sla.get_lapack_funcs(("getrs",), (lu,))
+        return lambda b: getrs(lu, piv, b)[0]
+    inverse = np.linalg.inv(A)
+    return inverse.dot
+
+
+def incidence_matrix(idx_a, idx_b, size, sparse):
+    """
+    Matrice d'incidence (size x n) : +1 sur le noeud a, -1 sur le noeud b de
+    chaque élément (les index -1 de la masse sont ignorés).
+    P.T @ x donne les tensions des éléments, P @ i les injections de courant.
+    """
+    count = len(idx_a)
+    elems = np.arange(count)
+    in_a = idx_a >= 0
+    in_b = idx_b >= 0
+    rows = np.concatenate((idx_a[in_a], idx_b[in_b]))
+    cols = np.concatenate((elems[in_a], elems[in_b]))
+    vals = np.concatenate((np.ones(np.count_nonzero(in_a)), -np.ones(np.count_nonzero(in_b))))
+    if sparse:
+        sp, _ = scipy_sparse()
+        return sp.csr_matrix((vals, (rows, cols)), shape=(size, count))
+    P = np.zeros((size, count))
+    np.add.at(P, (rows, cols), vals)
+    return P
+
+
+class MatrixPattern:
+    """
+    Structure (symbolique) d'une matrice assemblée à partir de triplets.
+
+    Les positions (rows, cols) sont analysées une seule fois : les doublons
+    sont associés à leur case de stockage CSC, de sorte qu'un nouveau jeu de
+    valeurs ne coûte qu'un np.bincount pour reconstruire la matrice.
+
+    En creux, l'ordonnancement réducteur de remplissage est lui aussi
+    calculé une seule fois, à la première factorisation (voir factorize).
+    """
+
+    def __init__(self, rows, cols, size, sparse):
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        self.size = size
+        self.sparse = sparse
+        keys = cols * size + rows
+        unique_keys, self.slot = np.unique(keys, return_inverse=True)
+        self.nnz = len(unique_keys)
+        self.rows = unique_keys % size
+        self.cols = unique_keys // size
+        if sparse:
+            self.indptr = np.searchsorted(self.cols, np.arange(size + 1)).astype(np.int32)
+            self.indices = self.rows.astype(np.int32)
+        # ordering[i] : position de l'inconnue i dans le système permuté
+        self.ordering = None
+
+    def data(self, vals):
+        """Valeurs cumulées par case de stockage"""
+        return np.bincount(self.slot, weights=vals, minlength=self.nnz)
+
+    def matrix(self, vals):
+        return self.from_data(self.data(vals))
+
+    def from_data(self, data):
+        """Matrice à partir des valeurs déjà cumulées par case (voir data)"""
+        if self.sparse:
+            sp, _ = scipy_sparse()
+            return sp.csc_matrix((data, self.indices, self.indptr), shape=(self.size, self.size))
+        A = np.zeros((self.size, self.size), dtype=data.dtype)
+        A[self.rows, self.cols] = data
+        return A
+
+    def factorize(self, A):
+        """
+        Factorise une matrice construite par matrix() ; retourne solve(b).
+
+        En creux, la première factorisation laisse SuperLU calculer
+        l'ordonnancement (PERMC_SPEC) et le mémorise. Les suivantes appliquent
+        cette permutation symétrique à la structure (permutée une fois pour
+        toutes) et demandent l'ordre naturel : seule la factorisation
+        numérique est refaite.
+        """
+        if not self.sparse:
+            return factorize(A)
+        sp, spla = scipy_sparse()
+        if self.ordering is None:
+            lu = spla.splu(A, permc_spec=PERMC_SPEC)
+            self._set_ordering(lu.perm_c)
+            return lu.solve
+        B = sp.csc_matrix((A.data[self._permuted], self._permuted_indices, self._permuted_indptr),
+                          shape=(self.size, self.size))
+        lu = spla.splu(B, permc_spec="NATURAL")
+        ordering, inverse = self.ordering, self._inverse
+        return lambda b: lu.solve(np.asarray(b)[inverse])[ordering]
+
+    def _set_ordering(self, ordering):
+        # Structure CSC de P A P^T : la case (r, c) passe en (ordering[r], ordering[c])
+        size = self.size
+        self.ordering = np.asarray(ordering, dtype=np.int64)
+        self._inverse = np.argsort(self.ordering)
+        keys = self.ordering[self.cols] * size + self.ordering[self.rows]
+        self._permuted = np.argsort(keys)
+        keys = keys[self._permuted]
+        self._permuted_indices = (keys % size).astype(np.int32)
+        self._permuted_indptr = np.searchsorted(keys // size, np.arange(size + 1)).astype(np.int32)
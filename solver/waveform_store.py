@@ -0,0 +1,190 @@
+import json
+import os
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+class WaveformStore:
+    """
+    Formes d'onde stockées sur disque, par blocs de taille fixe.
+
+    Les échantillons forment une matrice (temps x signal) enregistrée en
+    binaire brut dans <path>.dat (colonne 0 = temps) ; <path>.json décrit
+    les signaux. Pendant l'écriture, seul un bloc de
+    chunk_size lignes est gardé en mémoire ; la lecture passe par np.memmap
+    et ne charge que les lignes et colonnes demandées.
+    """
+
+    def __init__(self, path, signals, chunk_size=4096, node_ids=(), dipole_ids=(), mode="w"):
+        """
+        Args:
+            path (str): Chemin de base (sans extension) des fichiers du stockage
+            signals (list): Noms des signaux (colonnes hors temps)
+            chunk_size (int): Nombre de lignes bufferisées avant écriture
+            node_ids (list): Ids des noeuds dont les potentiels sont stockés
+            dipole_ids (list): Ids des dipôles dont les courants sont stockés
+            mode (str): "w" pour créer le stockage, "r" pour le relire
+        """
+        self.path = str(path)
+        self.signals = list(signals)
+        self.chunk_size = max(1, int(chunk_size))
+        self.node_ids = [int(i) for i in node_ids]
+        self.dipole_ids = [int(i) for i in dipole_ids]
+        self.stats = {}
+        self._columns = {name: k + 1 for k, name in enumerate(self.signals)}
+        self._count = 0
+        self._buffered = 0
+        self._buffer = None
+        self._file = None
+        self._map = None
+        if mode == "w":
+            self._buffer = np.empty((self.chunk_size, len(self.signals) + 1))
+            self._file = open(self.data_path, "wb")
+            self._write_header()
+
+    @classmethod
+    def for_view(cls, path, view, chunk_size=4096):
+        """Stockage des potentiels de noeuds et courants de dipôles d'une NetlistView"""
+        node_ids = view.node_ids.tolist()
+        dipole_ids = view.dipole_ids.tolist()
+        signals = [f"V({i})" for i in node_ids] + [f"I({i})" for i in dipole_ids]
+        return cls(path, signals, chunk_size, node_ids, dipole_ids)
+
+    @classmethod
+    def open(cls, path):
+        """Ouvre en lecture un stockage existant"""
+        with open(str(path) + ".json", "r") as f:
+            header = json.load(f)
+        store = cls(path, header["signals"], header["chunk_size"],
+                    header.get("node_ids", ()), header.get("dipole_ids", ()), mode="r")
+        # Le nombre de lignes se déduit de la taille du fichier : un
+        # stockage en cours d'écriture est lisible jusqu'au dernier bloc
+        row_bytes = 8 * (len(header["signals"]) + 1)
+        store._count = os.path.getsize(store.data_path) // row_bytes
+        store.stats = header.get("stats", {})
+        return store
+
+    @property
+    def data_path(self):
+        return self.path + ".dat"
+
+    @property
+    def header_path(self):
+        return self.path + ".json"
+
+    def __len__(self):
+        return self._count + self._buffered
+
+    # Écriture
+
+    def append(self, t, *values):
+        """Ajoute une ligne ; les tableaux de values sont mis bout à bout"""
+        row = self._buffer[self._buffered]
+        row[0] = t
+        start = 1
+        for block in values:
+            block = np.asarray(block, dtype=float).ravel()
+            row[start:start + len(block)] = block
+            start += len(block)
+        self._buffered += 1
+        if self._buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._file is None or not self._buffered:
+            return
+        self._file.write(self._buffer[:self._buffered].tobytes())
+        self._file.flush()
+        self._count += self._buffered
+        self._buffered = 0
+
+    def close(self):
+        """Termine l'écriture ; le stockage reste lisible"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+            self._buffer = None
+            self._write_header()
+        return self
+
+    def discard(self):
+        """Abandonne l'écriture : ferme puis supprime les fichiers du stockage"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._buffer = None
+        self._map = None
+        for path in (self.data_path, self.header_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write_header(self):
+        header = {
+            "version": FORMAT_VERSION,
+            "dtype": "float64",
+            "count": self._count,
+            "chunk_size": self.chunk_size,
+            "signals": self.signals,
+            "node_ids": self.node_ids,
+            "dipole_ids": self.dipole_ids,
+            "stats": self.stats,
+        }
+        tmp_path = self.header_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(header, f)
+        os.replace(tmp_path, self.header_path)
+
+    # Lecture
+
+    def _data(self):
+        if self._file is not None:
+            self.flush()
+        if self._map is None or self._map.shape[0] != self._count:
+            if self._count == 0:
+                return np.empty((0, len(self.signals) + 1))
+            self._map = np.memmap(self.data_path, dtype=np.float64, mode="r",
+                                  shape=(self._count, len(self.signals) + 1))
+        return self._map
+
+    @property
+    def times(self):
+        return np.asarray(self._data()[:, 0])
+
+    def read(self, signals=None, t_start=None, t_stop=None):
+        """
+        Lit une fenêtre temporelle d'une sélection de signaux.
+
+        Args:
+            signals (list): Noms ("V(3)", "I(7)") ou index de colonnes ; tous
+                les signaux si None
+            t_start (float): Début de la fenêtre (incluse)
+            t_stop (float): Fin de la fenêtre (incluse)
+
+        Returns:
+            tuple: (times, data) avec data de forme (len(times), len(signals))
+        """
+        data = self._data()
+        time_column = data[:, 0]
+        first = 0 if t_start is None else int(np.searchsorted(time_column, t_start, side="left"))
+        last = len(time_column) if t_stop is None else int(np.searchsorted(time_column, t_stop, side="right"))
+        if signals is None:
+            columns = slice(1, None)
+        else:
+            columns = [self._columns[s] if isinstance(s, str) else int(s) + 1 for s in signals]
+        return np.array(time_column[first:last]), np.array(data[first:last, columns])
+
+    def node(self, node_id, t_start=None, t_stop=None):
+        """Forme d'onde du potentiel d'un noeud"""
+        return self.read([f"V({int(node_id)})"], t_start, t_stop)[1][:, 0]
+
+    def dipole(self, dipole_id, t_start=None, t_stop=None):
+        """Forme d'onde du courant d'un dipôle"""
+        return self.read([f"I({int(dipole_id)})"], t_start, t_stop)[1][:, 0]
@@ -0,0 +1,196 @@
+import unittest
+import math
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import model.circuit
+from model.circuit import Circuit
+from model.components import Resistor, VoltageSourceDC
+from model.subcircuit import SubcircuitDefinition, SubcircuitInstance
+
+class TestCircuitVersioning(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+        self.n1 = self.circuit.create_node(0, 0, is_ground=True)
+        self.n2 = self.circuit.create_node(0, 100)
+        self.r1 = Resistor(self.circuit.get_next_dipole_id(), self.n2, self.n1, resistance=100.0)
+        self.circuit.add_dipole(self.r1)
+
+    def test_topology_version(self):
+        """Noeuds, fils et dipôles incrémentent la version de topologie"""
+        version = self.circuit.topology_version
+        n3 = self.circuit.create_node(50, 50)
+        wire = self.circuit.create_wire(self.n2, n3)
+        self.circuit.remove_wire(wire.id)
+        self.circuit.remove_node(n3.id)
+        self.assertEqual(self.circuit.topology_version, version + 4)
+        self.assertEqual(self.circuit.parameter_version, 0)
+
+    def test_parameter_version(self):
+        """set_params et l'affectation directe d'un paramètre sont suivis"""
+        topology = self.circuit.topology_version
+        self.r1.set_params({"resistance": 220.0})
+        self.r1.resistance = 330.0
+        self.assertEqual(self.circuit.parameter_version, 2)
+        self.assertEqual(self.circuit.topology_version, topology)
+        self.assertEqual(self.r1.resistance, 330.0)
+        # Pas de __setattr__ surchargé : seul le paramètre est une propriété
+        self.assertIs(type(self.r1).__setattr__, object.__setattr__)
+
+        # Les grandeurs de simulation ne sont pas des paramètres
+        self.r1.current = 1.0
+        self.n2.potential = 5.0
+        self.assertEqual(self.circuit.parameter_version, 2)
+
+    def test_changes_since(self):
+        """Le journal donne les noeuds et dipôles modifiés depuis une version"""
+        version = self.circuit.version
+        self.r1.resistance = 47.0
+        changes = self.circuit.changes_since(version)
+        self.assertFalse(changes["topology"])
+        self.assertEqual(changes["dipoles"], {self.r1.id})
+        self.assertEqual(changes["nodes"], set())
+
+        version = self.circuit.version
+        n3 = self.circuit.create_node(50, 50)
+        src = VoltageSourceDC(self.circuit.get_next_dipole_id(), n3, self.n1, dc_voltage=5.0)
+        self.circuit.add_dipole(src)
+        changes = self.circuit.changes_since(version)
+        self.assertTrue(changes["topology"])
+        self.assertEqual(changes["dipoles"], {src.id})
+        self.assertEqual(changes["nodes"], {n3.id, self.n1.id})
+
+        self.assertEqual(self.circuit.changes_since(self.circuit.version)["dipoles"], set())
+
+    def test_removed_dipole_is_detached(self):
+        self.circuit.remove_dipole(self.r1.id)
+        version = self.circuit.parameter_version
+        self.r1.resistance = 1.0
+        self.assertEqual(self.circuit.parameter_version, version)
+
+    def test_cleared_or_truncated_log(self):
+        """Un journal vidé ou tronqué impose une reconstruction complète"""
+        version = self.circuit.version
+        self.circuit.clear()
+        self.assertIsNone(self.circuit.changes_since(version))
+
+        old_limit = model.circuit.MAX_CHANGE_LOG
+        model.circuit.MAX_CHANGE_LOG = 10
+        try:
+            version = self.circuit.version
+            for _ in range(20):
+                self.circuit.create_node(0, 0)
+            self.assertIsNone(self.circuit.changes_since(version))
+            recent = self.circuit.version - 2
+            self.assertEqual(len(self.circuit.changes_since(recent)["nodes"]), 2)
+        finally:
+            model.circuit.MAX_CHANGE_LOG = old_limit
+
+class TestSubcircuitModel(unittest.TestCase):
+
+    def setUp(self):
+        inner = Circuit()
+        a = inner.create_node(0, 0)
+        b = inner.create_node(0, 0)
+        inner.add_dipole(Resistor(inner.get_next_dipole_id(), a, b, resistance=470.0))
+        self.definition = SubcircuitDefinition("res", inner, [a, b])
+        self.circuit = Circuit()
+        self.n1 = self.circuit.create_node(0, 0, is_ground=True)
+        self.n2 = self.circuit.create_node(0, 100)
+
+    def test_add_remove(self):
+        version = self.circuit.version
+        instance = SubcircuitInstance(self.circuit.get_next_subcircuit_id(), self.definition, [self.n2, self.n1])
+        self.circuit.add_subcircuit(instance)
+        self.assertEqual(self.circuit.changes_since(version)["subcircuits"], {instance.id})
+        self.circuit.remove_subcircuit(instance.id)
+        self.assertEqual(self.circuit.subcircuits, {})
+
+        with self.assertRaises(ValueError):
+            SubcircuitInstance(1, self.definition, [self.n2])
+
+    def test_json_round_trip(self):
+        for _ in range(3):
+            self.circuit.add_subcircuit(SubcircuitInstance(self.circuit.get_next_subcircuit_id(),
+                                                           self.definition, [self.n2, self.n1]))
+        loaded = Circuit()
+        loaded.load_from_json(self.circuit.to_json(), {"Resistor": Resistor})
+        self.assertEqual(loaded.to_json(), self.circuit.to_json())
+        definitions = {id(i.definition) for i in loaded.subcircuits.values()}
+        self.assertEqual(len(definitions), 1)
+
+class TestCircuitHitTesting(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+
+    def test_get_node_at(self):
+        """Le noeud le plus proche dans la tolérance est renvoyé"""
+        n1 = self.circuit.create_node(0, 0)
+        n2 = self.circuit.create_node(15, 0)
+        self.assertIs(self.circuit.get_node_at(3, 1), n1)
+        self.assertIs(self.circuit.get_node_at(9, 0), n2)
+        self.assertIsNone(self.circuit.get_node_at(100, 100))
+
+        # Index tenu à jour par create/remove/move
+        n3 = self.circuit.create_node(200, 200)
+        self.assertIs(self.circuit.get_node_at(201, 199), n3)
+        self.circuit.move_node(n3.id, -300, 40)
+        self.assertIsNone(self.circuit.get_node_at(201, 199))
+        self.assertIs(self.circuit.get_node_at(-302, 41), n3)
+        self.circuit.remove_node(n1.id)
+        self.assertIsNone(self.circuit.get_node_at(0, 0, tolerance=5.0))
+
+    def test_get_node_at_large_grid(self):
+        nodes = {}
+        for i in range(100):
+            for j in range(100):
+                nodes[(i, j)] = self.circuit.create_node(40 * i, 40 * j)
+        self.assertIs(self.circuit.get_node_at(40 * 57 + 3, 40 * 12 - 2), nodes[(57, 12)])
+        self.assertIsNone(self.circuit.get_node_at(40 * 57 + 20, 40 * 12 + 20))
+
+    def test_get_wire_and_dipole_at(self):
+        n1 = self.circuit.create_node(0, 0)
+        n2 = self.circuit.create_node(100, 0)
+        n3 = self.circuit.create_node(100, 100)
+        wire = self.circuit.create_wire(n1, n2)
+        res = Resistor(self.circuit.get_next_dipole_id(), n2, n3, x=100, y=50)
+        self.circuit.add_dipole(res)
+
+        self.assertIs(self.circuit.get_wire_at(50, 3), wire)
+        self.assertIsNone(self.circuit.get_wire_at(50, 30))
+        self.assertIs(self.circuit.get_dipole_at(95, 55), res)
+        self.assertIsNone(self.circuit.get_dipole_at(0, 50))
+
+        # Déplacer un noeud déplace le segment du fil
+        self.circuit.move_node(n2.id, 0, 100)
+        self.assertIsNone(self.circuit.get_wire_at(50, 3))
+        self.assertIs(self.circuit.get_wire_at(2, 50), wire)
+
+        self.circuit.move_dipole(res.id, 300, 300)
+        self.assertIs(self.circuit.get_dipole_at(300, 305), res)
+        self.circuit.remove_wire(wire.id)
+        self.circuit.remove_dipole(res.id)
+        self.assertIsNone(self.circuit.get_wire_at(2, 50))
+        self.assertIsNone(self.circuit.get_dipole_at(300, 305))
+
+    def test_diagonal_wire_indexed_along_segment(self):
+        """Un long fil en diagonale n'occupe que les cellules qu'il traverse"""
+        n1 = self.circuit.create_node(3, 7)
+        n2 = self.circuit.create_node(4003, 3007)
+        wire = self.circuit.create_wire(n1, n2)
+        self.assertIs(self.circuit.get_wire_at(2003, 1507), wire)
+        self.assertIsNone(self.circuit.get_wire_at(2003, 1600))
+        self.assertIsNone(self.circuit.get_wire_at(3000, 200))
+        cells = self.circuit._wire_grid._item_cells[wire.id]
+        size = self.circuit._wire_grid.cell_size
+        self.assertLessEqual(len(cells), (4000 + 3000) / size + 2)
+        for t in (0.0, 0.123, 0.5, 0.77, 1.0):
+            x, y = 3 + 4000 * t, 7 + 3000 * t
+            self.assertIn((math.floor(x / size), math.floor(y / size)), cells)
+
+if __name__ == '__main__':
+    unittest.main()
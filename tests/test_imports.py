@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import json
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Temps d'import maximal (s) de chaque point d'entrée, mesuré dans un
+# processus neuf ; larges par rapport aux mesures (~0.03 s sans NumPy,
+# ~0.1 s avec) pour rester stables sur une machine chargée
+IMPORT_BUDGETS = {
+    "model.circuit": 0.2,
+    "controller.simulation_controller": 0.2,
+    "main": 0.3,
+    "solver.dc_solver": 0.8,
+}
+
+HEAVY_MODULES = ("numpy", "scipy", "PyQt5", "PyQt6", "PySide2", "PySide6", "tkinter")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(statement):
+    """Durée d'exécution de statement et modules lourds chargés, dans un processus neuf"""
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+class TestImportTime(unittest.TestCase):
+
+    def test_budgets(self):
+        for module, budget in IMPORT_BUDGETS.items():
+            with self.subTest(module=module):
+                result = probe(f"import {module}")
+                self.assertLess(result["time"], budget)
+
+    def test_model_without_numpy(self):
+        self.assertEqual(probe("import model.circuit, model.components, model.subcircuit")["loaded"], [])
+
+    def test_entry_points_without_heavy_modules(self):
+        self.assertEqual(probe("import main")["loaded"], [])
+        self.assertEqual(probe("import controller.simulation_controller")["loaded"], [])
+
+    def test_small_dc_solve_without_scipy(self):
+        """SciPy n'est chargé que pour les systèmes creux ou les factorisations"""
+        statement = (
+            "from model.circuit import Circuit\n"
+            "from model.components import Resistor, VoltageSourceDC\n"
+            "from solver.dc_solver import DCSolver\n"
+            "c = Circuit()\n"
+            "g = c.create_node(0, 0, is_ground=True)\n"
+            "n = c.create_node(0, 0)\n"
+            "c.add_dipole(VoltageSourceDC(1, n, g, dc_voltage=1.0))\n"
+            "c.add_dipole(Resistor(2, n, g, resistance=1.0))\n"
+            "DCSolver().solve(c)\n"
+        )
+        self.assertEqual(probe(statement)["loaded"], ["numpy"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+import unittest
+import importlib.util
+import json
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.circuit import Circuit
+from model.components import Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC
+from model.subcircuit import SubcircuitDefinition, SubcircuitInstance
+from solver.dc_solver import DCSolver
+
+# Le paquet io du projet est masqué par le module io de la bibliothèque
+# standard : les modules sont chargés par leur chemin
+IO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'io'))
+
+def load_io_module(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(IO_DIR, name + ".py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+serializer = load_io_module("serializer")
+importer = load_io_module("importer")
+exporter = load_io_module("exporter")
+
+COMPONENT_CLASSES = {cls.__name__: cls for cls in (Resistor, Capacitor, Inductor, VoltageSourceDC, VoltageSourceAC)}
+
+class TestBinarySerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+        gnd = self.circuit.create_node(0, 0, is_ground=True)
+        n1 = self.circuit.create_node(100, 0)
+        n2 = self.circuit.create_node(100, 100)
+        n3 = self.circuit.create_node(0, 100)
+        n1.potential = 4.5
+        self.circuit.create_wire(n2, n3)
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), n1, gnd, dc_voltage=9.0))
+        self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), n1, n2, resistance=220.0, x=100, y=50))
+        self.circuit.add_dipole(Capacitor(self.circuit.get_next_dipole_id(), n3, gnd, capacitance=1e-6, rotation=90))
+        self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), n2, gnd, resistance=1e3))
+        self.circuit.add_dipole(VoltageSourceAC(self.circuit.get_next_dipole_id(), n3, gnd, amplitude=2.0, frequency=60.0))
+        self.circuit.dipoles[2].name = "R_charge"
+        fd, self.path = tempfile.mkstemp(suffix=".eslb")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_json_round_trip(self):
+        """JSON -> binaire -> JSON sans perte"""
+        serializer.save_binary(self.circuit, self.path)
+        loaded = serializer.load_binary(self.path, COMPONENT_CLASSES)
+        self.assertEqual(json.loads(loaded.to_json()), json.loads(self.circuit.to_json()))
+        self.assertEqual(loaded.dipoles[2].name, "R_charge")
+        self.assertEqual(loaded._next_wire_id, self.circuit._next_wire_id)
+        self.assertIs(loaded.get_node_at(100, 100), loaded.nodes[3])
+
+        # binaire -> JSON -> chargement : un nouveau fil n'écrase pas l'existant
+        reloaded = Circuit()
+        reloaded.load_from_json(loaded.to_json(), COMPONENT_CLASSES)
+        self.assertEqual(reloaded._next_wire_id, self.circuit._next_wire_id)
+        wire = reloaded.create_wire(reloaded.nodes[1], reloaded.nodes[4])
+        self.assertEqual(len(reloaded.wires), len(self.circuit.wires) + 1)
+        self.assertNotIn(wire.id, self.circuit.wires)
+
+        # Le circuit chargé est suivi comme un circuit construit à la main
+        version = loaded.parameter_version
+        loaded.dipoles[2].resistance = 330.0
+        self.assertEqual(loaded.parameter_version, version + 1)
+
+    def test_lazy_columns(self):
+        """Les colonnes sont lues sans construire d'objets"""
+        serializer.save_binary(self.circuit, self.path)
+        with serializer.BinaryCircuitFile(self.path) as reader:
+            self.assertEqual(reader.node_count, 4)
+            self.assertEqual(reader.dipole_count, 5)
+            self.assertEqual(reader.dipole_types,
+                             ["VoltageSourceDC", "Resistor", "Capacitor", "VoltageSourceAC"])
+            self.assertEqual(reader.column("dipoles/Resistor/param/resistance").tolist(), [220.0, 1e3])
+            self.assertEqual(reader.node(1).potential, 4.5)
+            self.assertTrue(reader.node(0).is_ground)
+            nodes = {node.id: node for node in (reader.node(i) for i in range(reader.node_count))}
+            wire = reader.wire(0, nodes)
+            self.assertEqual((wire.node_a.id, wire.node_b.id), (3, 4))
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"{\"nodes\": []}")
+        with self.assertRaises(ValueError):
+            serializer.BinaryCircuitFile(self.path)
+
+SUBCKT_LIBRARY = """* Bibliothèque
+.subckt div top bot mid
+R1 top mid 1k
+R2 mid bot 1k
+.ends
+"""
+
+DECK = """Pont diviseur
+.include lib.inc
+V1 in 0 DC 10
+X1 in 0 a div
+X2 a GND b half   ; sous-circuit défini plus loin
+C1 b 0 1u
+V2 s 0 SIN(0.5 2 1k
++ 0 0 90)
+Rload S 0 50
+.subckt half p n o
+Xd p n o div
+.ends
+.tran 1u 1m
+.end
+"""
+
+class TestSpice(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "main.cir")
+        with open(os.path.join(self.tmpdir.name, "lib.inc"), "w") as f:
+            f.write(SUBCKT_LIBRARY)
+        with open(self.path, "w") as f:
+            f.write(DECK)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_value(self):
+        self.assertEqual(importer.parse_value("4.7k"), 4700.0)
+        self.assertEqual(importer.parse_value("1MEG"), 1e6)
+        self.assertAlmostEqual(importer.parse_value("10uF"), 1e-5)
+        self.assertAlmostEqual(importer.parse_value("3m"), 3e-3)
+        with self.assertRaises(ValueError):
+            importer.parse_value("abc")
+
+    def test_import(self):
+        """Include, sous-circuits imbriqués et définis après leur usage"""
+        spice = importer.SpiceImporter()
+        circuit = spice.load(self.path)
+        self.assertEqual(spice.title, "Pont diviseur")
+        names = sorted(d.name for d in circuit.dipoles.values())
+        self.assertEqual(names, ["C1", "Rload", "V1", "V2", "X1.R1", "X1.R2", "X2.Xd.R1", "X2.Xd.R2"])
+        self.assertEqual(len(circuit.nodes), 5)
+
+        source = next(d for d in circuit.dipoles.values() if d.name == "V2")
+        self.assertIsInstance(source, VoltageSourceAC)
+        self.assertEqual(source.get_params(), {"amplitude": 2.0, "frequency": 1000.0, "phase": 90.0, "offset": 0.5})
+
+        DCSolver().solve(circuit)
+        nodes = spice.node_names
+        self.assertTrue(nodes["0"].is_ground)
+        self.assertAlmostEqual(nodes["a"].potential, 4.0)
+        self.assertAlmostEqual(nodes["b"].potential, 2.0)
+
+    def test_include_inside_subcircuit(self):
+        """Un .include dans un .subckt complète ce sous-circuit"""
+        with open(os.path.join(self.tmpdir.name, "load.inc"), "w") as f:
+            f.write("R2 mid bot 3k\n.end\n")
+        with open(self.path, "w") as f:
+            f.write("Titre\n.subckt att top bot mid\nR1 top mid 1k\n.include load.inc\n.ends\n"
+                    "V1 in 0 DC 8\nX1 in 0 out att\n.end\n")
+        spice = importer.SpiceImporter()
+        circuit = spice.load(self.path)
+        self.assertEqual(sorted(d.name for d in circuit.dipoles.values()), ["V1", "X1.R1", "X1.R2"])
+        DCSolver().solve(circuit)
+        self.assertAlmostEqual(spice.node_names["out"].potential, 6.0)
+
+    def test_include_cycle(self):
+        with open(os.path.join(self.tmpdir.name, "a.inc"), "w") as f:
+            f.write("R1 a 0 1k\n.include main.cir\n")
+        with open(self.path, "w") as f:
+            f.write("Titre\n.include a.inc\n")
+        with self.assertRaisesRegex(ValueError, "inclusion circulaire"):
+            importer.import_spice(self.path)
+
+    def test_undefined_subcircuit(self):
+        with open(self.path, "w") as f:
+            f.write("Titre\nX1 a 0 inconnu\n")
+        with self.assertRaises(ValueError):
+            importer.import_spice(self.path)
+
+    def test_export_round_trip(self):
+        circuit = importer.import_spice(self.path)
+        out = os.path.join(self.tmpdir.name, "out.cir")
+        exporter.export_spice(circuit, out, title="Export")
+        reloaded = importer.import_spice(out)
+
+        def summary(c):
+            return sorted((type(d).__name__, sorted(d.get_params().items())) for d in c.dipoles.values())
+        self.assertEqual(summary(reloaded), summary(circuit))
+        self.assertEqual(len(reloaded.nodes), len(circuit.nodes))
+
+    def test_export_subcircuits(self):
+        """Instances de sous-circuits exportées en .subckt + cartes X"""
+        inner = Circuit()
+        inner_gnd = inner.create_node(0, 0, is_ground=True)
+        top, mid = inner.create_node(0, 0), inner.create_node(0, 0)
+        inner.add_dipole(Resistor(1, top, mid, resistance=1000.0))
+        inner.add_dipole(Resistor(2, mid, inner_gnd, resistance=3000.0))
+        definition = SubcircuitDefinition("atténuateur 3/4", inner, [top, mid])
+
+        circuit = Circuit()
+        gnd = circuit.create_node(0, 0, is_ground=True)
+        nodes = [circuit.create_node(0, 0) for _ in range(3)]
+        circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), nodes[0], gnd, dc_voltage=16.0))
+        for a, b in zip(nodes, nodes[1:]):
+            circuit.add_subcircuit(SubcircuitInstance(circuit.get_next_subcircuit_id(), definition, [a, b]))
+
+        out = os.path.join(self.tmpdir.name, "blocs.cir")
+        exporter.export_spice(circuit, out)
+        with open(out) as f:
+            text = f.read()
+        self.assertEqual(text.count(".subckt"), 1)
+        reloaded = importer.SpiceImporter()
+        flat = reloaded.load(out)
+        self.assertEqual(len(flat.dipoles), 5)
+
+        DCSolver().solve(circuit)
+        DCSolver().solve(flat)
+        names = {node.id: name for name, node in reloaded.node_names.items()}
+        ids = exporter.SpiceExporter()._node_names(circuit)
+        for node in nodes:
+            loaded = next(n for n in flat.nodes.values() if names.get(n.id) == ids[node.id])
+            self.assertAlmostEqual(loaded.potential, node.potential)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from model.circuit import Circuit
+from model.components import Resistor, Capacitor, VoltageSourceDC
+import main
+
+class TestBatchCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, voltage in (("a", 10.0), ("sub/b", 4.0)):
+            circuit = Circuit()
+            gnd = circuit.create_node(0, 0, is_ground=True)
+            n1 = circuit.create_node(0, 0)
+            n2 = circuit.create_node(0, 0)
+            circuit.add_dipole(VoltageSourceDC(1, n1, gnd, dc_voltage=voltage))
+            circuit.add_dipole(Resistor(2, n1, n2, resistance=1000.0))
+            circuit.add_dipole(Resistor(3, n2, gnd, resistance=1000.0))
+            path = os.path.join(self.tmp.name, "in", name + ".json")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(circuit.to_json())
+
+    def test_parse_sweep(self):
+        grid = main.parse_sweep(["2=100:300:3", "1.dc_voltage=1,2,3"])
+        np.testing.assert_allclose(grid[2], [100.0, 200.0, 300.0])
+        self.assertEqual(grid[(1, "dc_voltage")], [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            main.parse_sweep(["2=abc"])
+
+    def test_dc_batch(self):
+        """Motif glob récursif, arborescence conservée, échec isolé"""
+        with open(os.path.join(self.tmp.name, "in", "bad.json"), "w") as f:
+            f.write("{")
+        out = os.path.join(self.tmp.name, "out")
+        report = os.path.join(self.tmp.name, "report.json")
+        code = main.main([os.path.join(self.tmp.name, "in", "**", "*.json"), "--output-dir", out,
+                          "--workers", "1", "--report", report])
+        self.assertEqual(code, 1)
+        with open(os.path.join(out, "sub", "b.dc.json")) as f:
+            self.assertAlmostEqual(json.load(f)["potentials"]["3"], 2.0)
+        with open(report) as f:
+            statuses = {os.path.basename(r["input"]): r["status"] for r in json.load(f)["circuits"]}
+        self.assertEqual(statuses, {"a.json": "ok", "b.json": "ok", "bad.json": "erreur"})
+
+    def test_sweep_batch(self):
+        out = os.path.join(self.tmp.name, "out")
+        code = main.main([os.path.join(self.tmp.name, "in", "a.json"), "--analysis", "sweep",
+                          "--sweep", "1=0:10:3", "--output-dir", out])
+        self.assertEqual(code, 0)
+        data = np.load(os.path.join(out, "a.sweep.npz"))
+        j = list(data["node_ids"]).index(3)
+        np.testing.assert_allclose(data["potentials"][:, j], [0.0, 2.5, 5.0])
+
+    def test_singular_circuit_reported(self):
+        """Noeud flottant : échec signalé avec le noeud en cause, ou gmin"""
+        circuit = Circuit()
+        gnd = circuit.create_node(0, 0, is_ground=True)
+        n1 = circuit.create_node(0, 0)
+        n2 = circuit.create_node(0, 0)
+        circuit.add_dipole(VoltageSourceDC(1, n1, gnd, dc_voltage=1.0))
+        circuit.add_dipole(Capacitor(2, n1, n2))
+        path = os.path.join(self.tmp.name, "floating.json")
+        with open(path, "w") as f:
+            f.write(circuit.to_json())
+
+        report = main.run_file(path)
+        self.assertEqual(report["status"], "erreur")
+        self.assertEqual(report["nodes"], [n2.id])
+        self.assertEqual(main.main([path, "--gmin", "1e-12"]), 0)
+
+    def test_options_checked_against_analysis(self):
+        path = os.path.join(self.tmp.name, "in", "a.json")
+        for argv in ([path, "--dt", "1e-6"], [path, "--analysis", "ac", "--t-stop", "1e-3"],
+                     [path, "--analysis", "transient", "--gmin", "1e-12"]):
+            with self.subTest(argv=argv), self.assertRaises(SystemExit):
+                main.main(argv)
+
+    def test_io_module_loaded_once(self):
+        self.assertIs(main._io_module("importer"), main._io_module("importer"))
+
+if __name__ == '__main__':
+    unittest.main()
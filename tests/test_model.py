@@ -1,12 +1,14 @@
 import unittest
+from unittest import mock
 import json
+import math
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from model.circuit import Circuit
-from model.components import Resistor, VoltageSourceDC, Capacitor
+from model.components import Resistor, VoltageSourceDC, Capacitor, Diode
 from model.node import Node, Wire
 
 class TestCircuitModel(unittest.TestCase):
@@ -45,6 +47,55 @@ class TestCircuitModel(unittest.TestCase):
         self.assertIn(resistor, n1.connected_dipoles)
         self.assertIn(resistor, n2.connected_dipoles)
 
+    def test_high_degree_connections(self):
+        """Connexions indexées au-delà de CONNECTION_INDEX_DEGREE, ordre conservé"""
+        ground = self.circuit.create_node(0, 0, is_ground=True)
+        nodes = [self.circuit.create_node(10 * i, 10) for i in range(40)]
+        resistors = [Resistor(i + 1, node, ground) for i, node in enumerate(nodes)]
+        ground.add_connection(resistors[0])
+        # Toujours une liste, quel que soit le degré
+        self.assertIsInstance(ground.connected_dipoles, list)
+        self.assertEqual(ground.connected_dipoles, resistors)
+        # Retrait sans parcours : aucune comparaison avec les autres dipôles
+        with mock.patch.object(Resistor, "__eq__", side_effect=AssertionError("parcours de la liste")):
+            ground.remove_connection(resistors[5])
+            ground.remove_connection(resistors[5])
+        self.assertNotIn(resistors[5], ground.connected_dipoles)
+        self.assertEqual(len(ground.connected_dipoles), 39)
+        self.assertIs(ground.connected_dipoles[5], resistors[6])
+        ground.add_connection(resistors[5])
+        self.assertIs(ground.connected_dipoles[-1], resistors[5])
+        self.assertEqual(nodes[0].connected_dipoles, [resistors[0]])
+
+    def test_slots(self):
+        """Pas de __dict__ par instance pour les objets du modèle"""
+        n1 = self.circuit.create_node(0, 0)
+        n2 = self.circuit.create_node(10, 0)
+        for obj in (n1, Wire(1, n1, n2), Resistor(1, n1, n2)):
+            self.assertFalse(hasattr(obj, "__dict__"))
+
+    def test_diode_companion(self):
+        """Modèle compagnon tangent à la caractéristique, paramètres sérialisés"""
+        n1 = self.circuit.create_node(0, 0)
+        n2 = self.circuit.create_node(100, 0)
+        diode = Diode(self.circuit.get_next_dipole_id(), n1, n2, saturation_current=1e-12)
+        self.circuit.add_dipole(diode)
+        self.assertTrue(diode.NONLINEAR)
+        self.assertFalse(Resistor.NONLINEAR)
+
+        n_vt = Diode.THERMAL_VOLTAGE
+        g, i_eq = diode.companion(0.6)
+        self.assertAlmostEqual(g * 0.6 + i_eq, 1e-12 * (math.exp(0.6 / n_vt) - 1.0), delta=1e-15)
+        self.assertAlmostEqual(g, 1e-12 * math.exp(0.6 / n_vt) / n_vt, delta=1e-12)
+        # Au-delà de MAX_EXPONENT : prolongement par la tangente, sans dépassement
+        g, i_eq = diode.companion(10.0)
+        self.assertTrue(math.isfinite(g) and math.isfinite(i_eq))
+
+        data = diode.to_dict()
+        self.assertEqual(data["params"], {"saturation_current": 1e-12, "emission_coefficient": 1.0})
+        loaded = Diode.from_dict(data, {n1.id: n1, n2.id: n2})
+        self.assertEqual(loaded.saturation_current, 1e-12)
+
     def test_wire_creation(self):
         """Test la création de fils"""
         n1 = self.circuit.create_node(0, 0)
@@ -1,13 +1,30 @@
 import unittest
 import sys
 import os
+import tempfile
+from unittest import mock
+import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from model.circuit import Circuit
-from model.components import Resistor, VoltageSourceDC
+from model.components import Resistor, VoltageSourceDC, VoltageSourceAC, Capacitor, Inductor, Diode
 from model.node import Node, Wire
 from solver.dc_solver import DCSolver
+from solver.diagnostics import SingularCircuitError
+from solver.netlist import NetlistView, KIND_RESISTOR, KIND_VOLTAGE_DC
+from solver.transient_solver import TransientEngine, TransientSolver
+from solver.waveform_store import WaveformStore
+from solver.sweep import DCSweep
+from solver.monte_carlo import MonteCarloAnalysis
+from solver.incremental_solver import IncrementalDCSolver
+from solver.iterative_solver import IterativeDCSolver
+from solver.subcircuit import reduce_subcircuit
+from solver.ac_solver import ACAnalysis
+from solver.steady_state import PeriodicSteadyState
+from solver.profiling import SolverProfile, condition_estimate
+from solver.utils import MatrixPattern, build_matrix
+from model.subcircuit import SubcircuitDefinition, SubcircuitInstance
 
 class TestDCSolver(unittest.TestCase):
     
@@ -92,5 +109,869 @@ class TestDCSolver(unittest.TestCase):
         diff = abs(n1.potential - n2.potential)
         self.assertAlmostEqual(diff, 10.0, places=5)
 
+    def test_sparse_backend_matches_dense(self):
+        """
+        Échelle de résistances : les backends dense et creux donnent le même résultat
+        """
+        n_gnd = self.circuit.create_node(0, 0, is_ground=True)
+        nodes = [self.circuit.create_node(10 * i, 10) for i in range(50)]
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), nodes[0], n_gnd, dc_voltage=9.0))
+        for a, b in zip(nodes, nodes[1:]):
+            self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), a, b, resistance=100.0))
+            self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), b, n_gnd, resistance=1000.0))
+
+        DCSolver(backend="dense").solve(self.circuit)
+        dense = [n.potential for n in nodes]
+        self.circuit.reset_simulation()
+        DCSolver(backend="sparse").solve(self.circuit)
+        sparse = [n.potential for n in nodes]
+
+        self.assertAlmostEqual(nodes[0].potential, 9.0, places=9)
+        for v_dense, v_sparse in zip(dense, sparse):
+            self.assertAlmostEqual(v_dense, v_sparse, places=9)
+
+    def test_sparse_ordering_reused(self):
+        """
+        Nouvelles valeurs sur la même structure : l'ordonnancement mémorisé
+        donne la même solution qu'une factorisation complète
+        """
+        rng = np.random.default_rng(1)
+        size = 60
+        a = rng.integers(0, size, 200)
+        b = (a + rng.integers(1, size, 200)) % size
+        rows = np.concatenate((a, b, a, b, np.arange(size)))
+        cols = np.concatenate((a, b, b, a, np.arange(size)))
+        pattern = MatrixPattern(rows, cols, size, sparse=True)
+        rhs = rng.standard_normal(size)
+        for _ in range(3):
+            g = rng.uniform(0.5, 2.0, 200)
+            vals = np.concatenate((g, g, -g, -g, np.full(size, 0.1)))
+            x = pattern.factorize(pattern.matrix(vals))(rhs)
+            self.assertIsNotNone(pattern.ordering)
+            np.testing.assert_allclose(x, np.linalg.solve(build_matrix(rows, cols, vals, size, False), rhs))
+
+class TestIterativeDCSolver(unittest.TestCase):
+
+    def setUp(self):
+        # Grille 30 x 30 de résistances, une source à la masse et une source flottante
+        self.circuit = Circuit()
+        gnd = self.circuit.create_node(0, 0, is_ground=True)
+        grid = [[self.circuit.create_node(10 * i, 10 * j) for j in range(30)] for i in range(30)]
+        rng = np.random.default_rng(0)
+        for i in range(30):
+            for j in range(30):
+                for di, dj in ((1, 0), (0, 1)):
+                    if i + di < 30 and j + dj < 30:
+                        self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), grid[i][j],
+                                                         grid[i + di][j + dj], resistance=rng.uniform(1.0, 10.0)))
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), grid[0][0], gnd, dc_voltage=1.0))
+        self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), grid[29][29], gnd, resistance=5.0))
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), grid[15][3], grid[2][20],
+                                                dc_voltage=0.25))
+        DCSolver().solve(self.circuit)
+        self.potentials = [n.potential for n in self.circuit.nodes.values()]
+        self.currents = [d.current for d in self.circuit.dipoles.values()]
+        self.circuit.reset_simulation()
+
+    def assert_matches_direct(self):
+        np.testing.assert_allclose([n.potential for n in self.circuit.nodes.values()], self.potentials, atol=1e-8)
+        np.testing.assert_allclose([d.current for d in self.circuit.dipoles.values()], self.currents, atol=1e-8)
+
+    def test_matches_direct_solver(self):
+        for preconditioner in ("amg", "jacobi"):
+            with self.subTest(preconditioner=preconditioner):
+                self.circuit.reset_simulation()
+                solver = IterativeDCSolver(preconditioner=preconditioner)
+                solver.solve(self.circuit)
+                self.assertLessEqual(solver.last_residual, solver.tol)
+                self.assert_matches_direct()
+
+    def test_warm_start(self):
+        """Nouvelle résolution partant des potentiels actuels : préconditionneur et Schur réutilisés"""
+        solver = IterativeDCSolver()
+        solver.solve(self.circuit)
+        cold = solver.last_iterations
+        solver.solve(self.circuit)
+        self.assertEqual(solver.last_iterations, 0)
+        self.assert_matches_direct()
+
+        resistor = self.circuit.dipoles[1]
+        resistor.resistance *= 1.01
+        solver.solve(self.circuit)
+        self.assertLess(solver.last_iterations, cold)
+        resistor.resistance /= 1.01
+        solver.solve(self.circuit)
+        self.assert_matches_direct()
+
+class TestIslands(unittest.TestCase):
+
+    def build_fixture(self, circuit, voltage, grounded):
+        """Diviseur de tension isolé : source + 2 résistances"""
+        ref = circuit.create_node(0, 0, is_ground=grounded)
+        top = circuit.create_node(0, 0)
+        mid = circuit.create_node(0, 0)
+        circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), top, ref, dc_voltage=voltage))
+        circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), top, mid, resistance=1000.0))
+        circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), mid, ref, resistance=1000.0))
+        return ref, top, mid
+
+    def test_floating_islands_have_own_reference(self):
+        circuit = Circuit()
+        grounded = self.build_fixture(circuit, 10.0, True)
+        floating = self.build_fixture(circuit, 4.0, False)
+        lonely = circuit.create_node(0, 0)
+        DCSolver().solve(circuit)
+        self.assertAlmostEqual(grounded[2].potential, 5.0)
+        self.assertAlmostEqual(floating[0].potential, 0.0)
+        self.assertAlmostEqual(floating[2].potential - floating[0].potential, 2.0)
+        self.assertAlmostEqual(lonely.potential, 0.0)
+
+        view = NetlistView.from_circuit(circuit)
+        self.assertEqual(view.num_v_vars, 4)
+        self.assertEqual(len(np.unique(view.islands)), 2)
+
+    def test_island_grounded_at_later_node(self):
+        """Réseau isolé dont la masse n'est pas le premier noeud créé"""
+        circuit = Circuit()
+        for voltage in (5.0, 3.0):
+            top = circuit.create_node(0, 0)
+            gnd = circuit.create_node(0, 0, is_ground=True)
+            source = VoltageSourceDC(circuit.get_next_dipole_id(), top, gnd, dc_voltage=voltage)
+            circuit.add_dipole(source)
+            circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), top, gnd, resistance=100.0))
+            DCSolver().solve(circuit)
+            self.assertAlmostEqual(gnd.potential, 0.0)
+            self.assertAlmostEqual(top.potential, voltage)
+            self.assertAlmostEqual(source.voltage, voltage)
+
+    def test_split_matches_single_system(self):
+        """Réseaux résolus séparément (en parallèle) ou en un seul système"""
+        circuit = Circuit()
+        fixtures = [self.build_fixture(circuit, float(k + 1), k == 0) for k in range(5)]
+        for workers in (1, 2):
+            profile = SolverProfile()
+            solver = DCSolver(workers=workers, island_min_size=3)
+            solver.add_observer(profile)
+            solver.solve(circuit)
+            self.assertEqual(len(profile.matrices), 5)
+            for k, (ref, top, mid) in enumerate(fixtures):
+                self.assertAlmostEqual(mid.potential - ref.potential, (k + 1) / 2.0)
+                self.assertAlmostEqual(top.potential - ref.potential, k + 1.0)
+
+class TestDiagnostics(unittest.TestCase):
+
+    def setUp(self):
+        # GND --(Src)-- N1 --(R)-- N2 --(C)-- N3 --(R)-- N4
+        self.circuit = Circuit()
+        self.gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.nodes = [self.circuit.create_node(10 * i, 0) for i in range(1, 5)]
+        n1, n2, n3, n4 = self.nodes
+        self.circuit.add_dipole(VoltageSourceDC(1, n1, self.gnd, dc_voltage=5.0))
+        self.circuit.add_dipole(Resistor(2, n1, n2, resistance=100.0))
+        self.circuit.add_dipole(Capacitor(3, n2, n3, capacitance=1e-6))
+        self.circuit.add_dipole(Resistor(4, n3, n4, resistance=100.0))
+
+    def test_floating_nodes_reported(self):
+        """Noeuds reliés seulement par un condensateur : signalés avant factorisation"""
+        with self.assertRaises(SingularCircuitError) as ctx:
+            DCSolver().solve(self.circuit)
+        self.assertEqual(sorted(ctx.exception.nodes), [self.nodes[2].id, self.nodes[3].id])
+
+    def test_gmin_shunts(self):
+        DCSolver(gmin=1e-12).solve(self.circuit)
+        self.assertAlmostEqual(self.nodes[1].potential, 5.0, places=9)
+        self.assertAlmostEqual(self.nodes[3].potential, 0.0, places=9)
+
+    def test_source_loop_and_zero_resistor(self):
+        self.circuit.add_dipole(Resistor(5, self.nodes[2], self.gnd, resistance=0.0))
+        self.circuit.add_dipole(VoltageSourceDC(6, self.nodes[0], self.gnd, dc_voltage=5.0))
+        with self.assertRaises(SingularCircuitError) as ctx:
+            DCSolver().solve(self.circuit)
+        self.assertEqual(sorted(ctx.exception.dipoles), [1, 5, 6])
+
+        # Système dégradé : résistance nulle remplacée, boucle aux moindres carrés
+        solver = DCSolver(fallback=True)
+        solver.solve(self.circuit)
+        self.assertEqual(solver.last_diagnostics.source_loops, [1, 6])
+        self.assertAlmostEqual(self.nodes[1].potential, 5.0, places=6)
+        self.assertAlmostEqual(self.nodes[3].potential, 0.0, places=6)
+        for dipole_id in (1, 6):
+            self.assertTrue(np.isfinite(self.circuit.dipoles[dipole_id].current))
+
+class TestNonlinear(unittest.TestCase):
+
+    def setUp(self):
+        # GND --(Src)-- N1 --(R)-- N2 --(Diode)-- GND
+        self.circuit = Circuit()
+        self.gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.n1 = self.circuit.create_node(0, 10)
+        self.n2 = self.circuit.create_node(0, 20)
+        self.src = VoltageSourceDC(1, self.n1, self.gnd, dc_voltage=5.0)
+        self.circuit.add_dipole(self.src)
+        self.circuit.add_dipole(Resistor(2, self.n1, self.n2, resistance=1000.0))
+        self.diode = Diode(3, self.n2, self.gnd)
+        self.circuit.add_dipole(self.diode)
+
+    def shockley(self, v):
+        return self.diode.saturation_current * (np.exp(v / Diode.THERMAL_VOLTAGE) - 1.0)
+
+    def test_forward_and_reverse_bias(self):
+        for voltage in (5.0, 100.0, -5.0):
+            with self.subTest(voltage=voltage):
+                self.src.dc_voltage = voltage
+                solver = DCSolver()
+                solver.solve(self.circuit)
+                v = self.n2.potential
+                current = (self.n1.potential - v) / 1000.0
+                self.assertAlmostEqual(self.diode.current, current, delta=1e-9 * max(abs(current), 1e-9))
+                self.assertAlmostEqual(current, self.shockley(v), delta=1e-6 * max(abs(current), 1e-12))
+                self.assertTrue(solver.last_newton["converged"])
+                self.assertLess(solver.last_newton["iterations"], 20)
+
+    def test_sparse_pattern_and_phases(self):
+        """Échelle de diodes en creux : une itération = un estampillage et une résolution"""
+        nodes = [self.n2]
+        for k in range(120):
+            node = self.circuit.create_node(10 * k, 30)
+            self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), nodes[-1], node, resistance=10.0))
+            self.circuit.add_dipole(Diode(self.circuit.get_next_dipole_id(), node, self.gnd))
+            nodes.append(node)
+        DCSolver(backend="dense").solve(self.circuit)
+        dense = [node.potential for node in nodes]
+
+        self.circuit.reset_simulation()
+        solver = DCSolver(backend="sparse")
+        profile = SolverProfile()
+        solver.add_observer(profile)
+        solver.solve(self.circuit)
+        np.testing.assert_allclose([node.potential for node in nodes], dense, rtol=1e-6)
+        iterations = solver.last_newton["iterations"]
+        self.assertEqual(profile.phases["stamp"]["calls"], iterations)
+        self.assertEqual(profile.phases["solve"]["calls"], iterations)
+
+    def test_damping(self):
+        solver = DCSolver(max_step=0.5)
+        solver.solve(self.circuit)
+        self.assertAlmostEqual(self.diode.current, (5.0 - self.n2.potential) / 1000.0, places=9)
+
+    def test_linear_solvers_reject_nonlinear(self):
+        with self.assertRaises(ValueError):
+            TransientSolver(dt=1e-6, t_stop=1e-5).solve(self.circuit)
+        with self.assertRaises(ValueError):
+            DCSolver(max_iterations=1).solve(self.circuit)
+
+class TestNetlistView(unittest.TestCase):
+
+    def test_compiled_tables(self):
+        """Les tableaux compilés reflètent les noeuds fusionnés et les types"""
+        circuit = Circuit()
+        n_gnd = circuit.create_node(0, 0, is_ground=True)
+        n1 = circuit.create_node(0, 10)
+        n2 = circuit.create_node(10, 10)
+        circuit.create_wire(n1, n2)
+        src = VoltageSourceDC(circuit.get_next_dipole_id(), n1, n_gnd, dc_voltage=3.0)
+        circuit.add_dipole(src)
+        res = Resistor(circuit.get_next_dipole_id(), n2, n_gnd, resistance=50.0)
+        circuit.add_dipole(res)
+
+        view = NetlistView.from_circuit(circuit)
+
+        self.assertEqual(view.num_v_vars, 1)
+        self.assertEqual(view.size, 2)
+        self.assertEqual(list(view.kind), [KIND_VOLTAGE_DC, KIND_RESISTOR])
+        self.assertEqual(list(view.idx_a), [0, 0])
+        self.assertEqual(list(view.idx_b), [-1, -1])
+        self.assertEqual(list(view.value), [3.0, 50.0])
+
+        rows, cols, vals, rhs = view.assemble_dc()
+        A = np.zeros((view.size, view.size))
+        np.add.at(A, (rows, cols), vals)
+        np.testing.assert_allclose(A, [[1 / 50.0, 1.0], [1.0, 0.0]])
+        np.testing.assert_allclose(rhs, [0.0, 3.0])
+
+class TestTransientSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+        self.n_gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.n_src = self.circuit.create_node(0, 10)
+        self.n_mid = self.circuit.create_node(10, 10)
+
+    def add(self, cls, node_a, node_b, **params):
+        dipole = cls(self.circuit.get_next_dipole_id(), node_a, node_b, **params)
+        self.circuit.add_dipole(dipole)
+        return dipole
+
+    def test_rc_charge(self):
+        """
+        Charge d'un condensateur 1µF à travers 1kOhm sous 1V (tau = 1ms)
+        Attendu : v(t) = 1 - exp(-t/tau)
+        """
+        self.add(VoltageSourceDC, self.n_src, self.n_gnd, dc_voltage=1.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        cap = self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-6)
+
+        result = TransientSolver(dt=1e-5, t_stop=5e-3, method="trap", initial="zero").solve(self.circuit)
+
+        expected = 1.0 - np.exp(-result.times / 1e-3)
+        np.testing.assert_allclose(result.node(self.n_mid.id), expected, atol=1e-4)
+        self.assertAlmostEqual(self.n_mid.potential, 1.0 - np.exp(-5.0), places=4)
+        self.assertAlmostEqual(cap.current, np.exp(-5.0) / 1000.0, places=6)
+
+    def test_rl_current_rise(self):
+        """
+        Bobine 1mH en série avec 1 Ohm sous 1V (tau = 1ms)
+        Attendu : i(t) = 1 - exp(-t/tau)
+        """
+        self.add(VoltageSourceDC, self.n_src, self.n_gnd, dc_voltage=1.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1.0)
+        ind = self.add(Inductor, self.n_mid, self.n_gnd, inductance=1e-3)
+
+        result = TransientSolver(dt=1e-5, t_stop=5e-3, method="be", initial="zero").solve(self.circuit)
+
+        expected = 1.0 - np.exp(-result.times / 1e-3)
+        np.testing.assert_allclose(result.dipole(ind.id), expected, atol=5e-3)
+
+    def test_ac_source_single_factorization(self):
+        """Une source AC sur une résistance suit get_value_at_time, matrice factorisée une fois"""
+        self.add(Resistor, self.n_mid, self.n_gnd, resistance=10.0)
+        src = self.add(VoltageSourceAC, self.n_src, self.n_gnd, amplitude=2.0, frequency=50.0, phase=30.0)
+        self.add(Resistor, self.n_src, self.n_gnd, resistance=10.0)
+        solver = TransientSolver(dt=1e-4, t_stop=0.04, method="be", record_every=10)
+        view = solver._compile(self.circuit)
+        engine = solver._create_engine(view)
+        for k in range(1, 401):
+            engine.step(k * 1e-4, 1e-4, "be")
+            self.assertAlmostEqual(engine.potentials()[1], src.get_value_at_time(k * 1e-4), places=9)
+        self.assertEqual(len(engine._factors), 1)
+
+        result = solver.solve(self.circuit)
+        self.assertEqual(len(result), 41)
+
+    def test_waveform_store_streaming(self):
+        """Les résultats écrits par blocs sur disque sont identiques à ceux en mémoire"""
+        self.add(VoltageSourceAC, self.n_src, self.n_gnd, amplitude=1.0, frequency=50.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        cap = self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-6)
+        in_memory = TransientSolver(dt=1e-4, t_stop=0.1).solve(self.circuit)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run")
+            TransientSolver(dt=1e-4, t_stop=0.1, store_path=path, chunk_size=64).solve(self.circuit)
+            store = WaveformStore.open(path)
+
+            self.assertEqual(len(store), len(in_memory))
+            self.assertEqual(store.stats["steps"], 1000)
+            np.testing.assert_allclose(store.node(self.n_mid.id), in_memory.node(self.n_mid.id))
+            np.testing.assert_allclose(store.dipole(cap.id), in_memory.dipole(cap.id))
+
+            times, data = store.read([f"V({self.n_mid.id})", f"I({cap.id})"], t_start=0.04995, t_stop=0.06005)
+            window = (in_memory.times >= 0.04995) & (in_memory.times <= 0.06005)
+            self.assertEqual(data.shape, (101, 2))
+            self.assertEqual(np.count_nonzero(window), 101)
+            np.testing.assert_allclose(times, in_memory.times[window])
+            np.testing.assert_allclose(data[:, 1], in_memory.dipole(cap.id)[window])
+
+    def test_waveform_store_discarded_on_error(self):
+        """Une erreur en cours de simulation ne laisse ni fichier ouvert ni stockage partiel"""
+        self.add(VoltageSourceDC, self.n_src, self.n_gnd, dc_voltage=1.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-6)
+        step = TransientEngine.step
+
+        def failing_step(engine, t_next, dt, method):
+            if t_next > 5e-3:
+                raise FloatingPointError("pas impossible")
+            return step(engine, t_next, dt, method)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "run")
+            solver = TransientSolver(dt=1e-5, t_stop=1e-2, store_path=path, chunk_size=64)
+            with mock.patch.object(TransientEngine, "step", failing_step):
+                with self.assertRaises(FloatingPointError):
+                    solver.solve(self.circuit)
+            self.assertEqual(os.listdir(tmp), [])
+
+    def test_adaptive_step_separated_time_constants(self):
+        """
+        RC (tau = 1ms) en parallèle avec RL (tau = 1µs) : le pas adaptatif
+        atteint la précision visée avec bien moins de pas qu'une grille uniforme
+        """
+        n_ind = self.circuit.create_node(20, 10)
+        self.add(VoltageSourceDC, self.n_src, self.n_gnd, dc_voltage=1.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-6)
+        self.add(Resistor, self.n_src, n_ind, resistance=1.0)
+        ind = self.add(Inductor, n_ind, self.n_gnd, inductance=1e-6)
+
+        solver = TransientSolver(dt=1e-9, t_stop=1e-2, method="trap", adaptive=True,
+                                 reltol=1e-4, abstol=1e-6, initial="zero")
+        result = solver.solve(self.circuit)
+
+        t = result.times
+        np.testing.assert_allclose(result.node(self.n_mid.id), 1.0 - np.exp(-t / 1e-3), atol=1e-3)
+        np.testing.assert_allclose(result.dipole(ind.id), 1.0 - np.exp(-t / 1e-6), atol=1e-3)
+        self.assertAlmostEqual(t[-1], 1e-2)
+        self.assertLess(result.stats["steps"] + result.stats["rejected"], 500)
+        self.assertLessEqual(np.max(np.diff(t)), solver.dt_max * (1 + 1e-12))
+
+    def test_initial_dc_operating_point(self):
+        """
+        Par défaut, la simulation part du point de fonctionnement continu :
+        condensateur chargé, courant établi dans la bobine, rien ne bouge
+        """
+        n_ind = self.circuit.create_node(20, 10)
+        self.add(VoltageSourceDC, self.n_src, self.n_gnd, dc_voltage=2.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        cap = self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-6)
+        self.add(Resistor, self.n_src, n_ind, resistance=4.0)
+        ind = self.add(Inductor, n_ind, self.n_gnd, inductance=1e-3)
+
+        for adaptive in (False, True):
+            result = TransientSolver(dt=1e-5, t_stop=1e-3, adaptive=adaptive).solve(self.circuit)
+            np.testing.assert_allclose(result.node(self.n_mid.id), 2.0, atol=1e-9)
+            np.testing.assert_allclose(result.node(n_ind.id), 0.0, atol=1e-9)
+            np.testing.assert_allclose(result.dipole(ind.id), 0.5, atol=1e-9)
+            np.testing.assert_allclose(result.dipole(cap.id), 0.0, atol=1e-9)
+
+        with self.assertRaises(ValueError):
+            TransientSolver(initial="uic")
+
+    def test_adaptive_steps_on_grid(self):
+        """Tous les pas, dernier compris, valent dt_max / 2^k, même si dt_max ne divise pas t_stop"""
+        self.add(VoltageSourceAC, self.n_src, self.n_gnd, amplitude=1.0, frequency=1000.0)
+        self.add(Resistor, self.n_src, self.n_mid, resistance=1000.0)
+        self.add(Capacitor, self.n_mid, self.n_gnd, capacitance=1e-7)
+
+        solver = TransientSolver(dt=1e-6, t_stop=3.3e-3, adaptive=True, dt_max=1e-4)
+        result = solver.solve(self.circuit)
+
+        self.assertEqual(result.times[-1], 3.3e-3)
+        dt_max = 3.3e-3 / 33
+        levels = np.log2(dt_max / np.diff(result.times))
+        np.testing.assert_allclose(levels, np.round(levels), atol=1e-6)
+        # Au plus une factorisation par niveau k, plus le premier pas en Euler implicite
+        self.assertLessEqual(result.stats["factorizations"], int(round(levels.max())) + 2)
+
+
+class TestDCSweep(unittest.TestCase):
+
+    def setUp(self):
+        # GND --(Src)-- N_Top --(R1)-- N_Mid --(R2)-- GND
+        self.circuit = Circuit()
+        n_gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.n_top = self.circuit.create_node(0, 10)
+        self.n_mid = self.circuit.create_node(0, 20)
+        self.src = VoltageSourceDC(self.circuit.get_next_dipole_id(), self.n_top, n_gnd, dc_voltage=12.0)
+        self.circuit.add_dipole(self.src)
+        self.r1 = Resistor(self.circuit.get_next_dipole_id(), self.n_top, self.n_mid, resistance=1000.0)
+        self.circuit.add_dipole(self.r1)
+        self.r2 = Resistor(self.circuit.get_next_dipole_id(), self.n_mid, n_gnd, resistance=1000.0)
+        self.circuit.add_dipole(self.r2)
+
+    def test_source_sweep(self):
+        """Balayage de la tension de source : V_mid = V/2"""
+        voltages = np.linspace(0.0, 10.0, 11)
+        result = DCSweep().solve(self.circuit, {self.src.id: voltages})
+
+        self.assertEqual(len(result), 11)
+        np.testing.assert_allclose(result.node(self.n_mid.id), voltages / 2)
+        np.testing.assert_allclose(np.abs(result.dipole(self.r1.id)), voltages / 2000.0)
+        np.testing.assert_allclose(result.parameters[(self.src.id, "dc_voltage")], voltages)
+        # Le circuit n'est pas modifié
+        self.assertEqual(self.src.dc_voltage, 12.0)
+
+    def test_resistance_sweep_matches_dc_solver(self):
+        """Balayage croisé source x résistance identique à des résolutions successives"""
+        grid = {self.src.id: [5.0, 12.0], (self.r2.id, "resistance"): [500.0, 1000.0, 3000.0]}
+        result = DCSweep().solve(self.circuit, grid, cartesian=True)
+
+        self.assertEqual(len(result), 6)
+        solver = DCSolver()
+        for k in range(6):
+            self.src.dc_voltage = result.parameters[(self.src.id, "dc_voltage")][k]
+            self.r2.resistance = result.parameters[(self.r2.id, "resistance")][k]
+            solver.solve(self.circuit)
+            self.assertAlmostEqual(result.node(self.n_mid.id)[k], self.n_mid.potential, places=9)
+            self.assertAlmostEqual(result.dipole(self.r2.id)[k], self.r2.current, places=12)
+
+    def test_monte_carlo_divider(self):
+        """
+        Diviseur 12V, résistances à ±5% : moyenne ~6V, dispersion non nulle,
+        résultats identiques en série et sur un pool de processus
+        """
+        serial = MonteCarloAnalysis(workers=1, batch_size=500).solve(self.circuit, 2000, seed=42)
+        pooled = MonteCarloAnalysis(workers=2, batch_size=500).solve(self.circuit, 2000, seed=42)
+
+        stats = serial.node(self.n_mid.id)
+        self.assertEqual(serial.count, 2000)
+        self.assertAlmostEqual(stats["mean"], 6.0, places=1)
+        self.assertGreater(stats["std"], 0.05)
+        self.assertLess(stats["max"], 6.0 * 1.05 / 0.975)
+        self.assertEqual(int(stats["counts"].sum()), 2000)
+        # Lots fusionnés dans l'ordre : mêmes résultats, histogrammes compris
+        np.testing.assert_array_equal(pooled.mean, serial.mean)
+        np.testing.assert_array_equal(pooled.std, serial.std)
+        np.testing.assert_array_equal(pooled.hist_edges, serial.hist_edges)
+        np.testing.assert_array_equal(pooled.hist_counts, serial.hist_counts)
+
+    def test_monte_carlo_small_stays_serial(self):
+        """Par défaut, pas de pool de processus pour une petite analyse"""
+        with mock.patch("solver.monte_carlo.ProcessPoolExecutor", side_effect=AssertionError):
+            result = MonteCarloAnalysis(batch_size=100).solve(self.circuit, 1000, seed=1)
+        self.assertEqual(result.count, 1000)
+
+    def test_invalid_parameter(self):
+        with self.assertRaises(ValueError):
+            DCSweep().solve(self.circuit, {(self.r1.id, "capacitance"): [1.0]})
+
+class TestIncrementalDCSolver(unittest.TestCase):
+
+    def setUp(self):
+        # Échelle de résistances alimentée en 10V
+        self.circuit = Circuit()
+        self.n_gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.nodes = [self.circuit.create_node(10 * i, 10) for i in range(10)]
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), self.nodes[0], self.n_gnd, dc_voltage=10.0))
+        self.resistors = []
+        for a, b in zip(self.nodes, self.nodes[1:]):
+            for node_a, node_b in ((a, b), (b, self.n_gnd)):
+                r = Resistor(self.circuit.get_next_dipole_id(), node_a, node_b, resistance=100.0)
+                self.circuit.add_dipole(r)
+                self.resistors.append(r)
+
+    def reference(self):
+        DCSolver().solve(self.circuit)
+        return [n.potential for n in self.nodes], [r.current for r in self.resistors]
+
+    def assert_matches_reference(self, solver):
+        solver.solve(self.circuit)
+        potentials = [n.potential for n in self.nodes]
+        currents = [r.current for r in self.resistors]
+        ref_potentials, ref_currents = self.reference()
+        np.testing.assert_allclose(potentials, ref_potentials, atol=1e-12)
+        np.testing.assert_allclose(currents, ref_currents, atol=1e-12)
+
+    def test_parameter_change_uses_low_rank_update(self):
+        """Modifier des résistances et la source ne refactorise pas"""
+        solver = IncrementalDCSolver()
+        solver.solve(self.circuit)
+        self.assertEqual(solver.last_mode, "full")
+
+        self.resistors[3].resistance = 470.0
+        self.resistors[8].set_params({"resistance": 22.0})
+        self.circuit.dipoles[1].dc_voltage = 5.0
+        self.assert_matches_reference(solver)
+        self.assertEqual(solver.last_mode, "update")
+
+    def test_many_changes_trigger_refactorization(self):
+        solver = IncrementalDCSolver(max_rank=2)
+        solver.solve(self.circuit)
+        for r in self.resistors[:5]:
+            r.resistance = 50.0
+        self.assert_matches_reference(solver)
+        self.assertEqual(solver.last_mode, "refactor")
+
+    def test_topology_change_invalidates_cache(self):
+        solver = IncrementalDCSolver()
+        solver.solve(self.circuit)
+        self.circuit.create_wire(self.nodes[4], self.nodes[6])
+        self.assert_matches_reference(solver)
+        self.assertEqual(solver.last_mode, "full")
+
+    def test_other_circuit_rebuilds(self):
+        """Un second circuit de même version n'hérite pas de la factorisation du premier"""
+        def divider(voltage, r_top, r_bottom):
+            circuit = Circuit()
+            n_gnd = circuit.create_node(0, 0, is_ground=True)
+            n_top = circuit.create_node(0, 10)
+            n_mid = circuit.create_node(0, 20)
+            circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), n_top, n_gnd, dc_voltage=voltage))
+            circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), n_top, n_mid, resistance=r_top))
+            circuit.add_dipole(Resistor(circuit.get_next_dipole_id(), n_mid, n_gnd, resistance=r_bottom))
+            return circuit, n_mid
+
+        first, first_mid = divider(10.0, 1000.0, 1000.0)
+        second, second_mid = divider(12.0, 1000.0, 3000.0)
+        self.assertEqual(first.topology_version, second.topology_version)
+
+        solver = IncrementalDCSolver()
+        solver.solve(first)
+        self.assertAlmostEqual(first_mid.potential, 5.0)
+        solver.solve(second)
+        self.assertEqual(solver.last_mode, "full")
+        self.assertAlmostEqual(second_mid.potential, 9.0)
+
+    def test_singular_update(self):
+        """Noeud isolé par une modification : SingularCircuitError, puis reprise"""
+        solver = IncrementalDCSolver()
+        solver.solve(self.circuit)
+        for r in self.resistors[-2:]:
+            r.resistance = float("inf")
+        with self.assertRaises(SingularCircuitError):
+            solver.solve(self.circuit)
+        for r in self.resistors[-2:]:
+            r.resistance = 100.0
+        self.assert_matches_reference(solver)
+
+    def test_ground_change_invalidates_cache(self):
+        solver = IncrementalDCSolver()
+        solver.solve(self.circuit)
+        version = self.circuit.topology_version
+        self.n_gnd.is_ground = False
+        self.nodes[5].is_ground = True
+        self.assertEqual(self.circuit.topology_version, version + 2)
+        self.assert_matches_reference(solver)
+        self.assertEqual(solver.last_mode, "full")
+        self.assertEqual(self.nodes[5].potential, 0.0)
+
+class TestSubcircuits(unittest.TestCase):
+
+    def setUp(self):
+        # Bloc : pont diviseur avec source interne référencée à la masse
+        inner = Circuit()
+        gnd = inner.create_node(0, 0, is_ground=True)
+        top = inner.create_node(0, 0)
+        mid = inner.create_node(0, 0)
+        out = inner.create_node(0, 0)
+        self.r_top = Resistor(inner.get_next_dipole_id(), top, mid, resistance=1e3)
+        inner.add_dipole(self.r_top)
+        inner.add_dipole(Resistor(inner.get_next_dipole_id(), mid, gnd, resistance=2e3))
+        inner.add_dipole(VoltageSourceDC(inner.get_next_dipole_id(), out, mid, dc_voltage=1.0))
+        self.mid = mid
+        self.definition = SubcircuitDefinition("cell", inner, [top, out])
+
+        self.circuit = Circuit()
+        gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.nodes = [self.circuit.create_node(0, 0) for _ in range(6)]
+        self.circuit.add_dipole(VoltageSourceDC(self.circuit.get_next_dipole_id(), self.nodes[0], gnd, dc_voltage=10.0))
+        for a, b in zip(self.nodes, self.nodes[1:]):
+            self.circuit.add_subcircuit(SubcircuitInstance(self.circuit.get_next_subcircuit_id(), self.definition, [a, b]))
+        self.circuit.add_dipole(Resistor(self.circuit.get_next_dipole_id(), self.nodes[-1], gnd, resistance=500.0))
+
+    def test_matches_flattened(self):
+        """Le système réduit donne les mêmes potentiels que le circuit à plat"""
+        flat = self.circuit.flattened()
+        self.assertEqual(len(flat.dipoles), 2 + 3 * 5)
+        DCSolver().solve(self.circuit)
+        DCSolver().solve(flat)
+        for node in self.nodes:
+            self.assertAlmostEqual(node.potential, flat.nodes[node.id].potential)
+
+        # Courant entrant par le port "top" = courant de la résistance interne
+        instance = self.circuit.subcircuits[2]
+        v_top = instance.nodes[0].potential
+        v_mid = instance.internal_potentials[self.mid.id]
+        self.assertAlmostEqual(instance.port_currents[0], (v_top - v_mid) / 1e3)
+        self.assertAlmostEqual(instance.internal_potentials[instance.definition.ports[1].id] - v_mid, 1.0)
+
+    def test_block_reused(self):
+        """Une seule réduction par définition, refaite si le bloc change"""
+        block = reduce_subcircuit(self.definition)
+        DCSolver().solve(self.circuit)
+        self.assertIs(reduce_subcircuit(self.definition), block)
+        potential = self.nodes[3].potential
+
+        self.r_top.resistance = 2e3
+        self.assertIsNot(reduce_subcircuit(self.definition), block)
+        DCSolver().solve(self.circuit)
+        self.assertNotAlmostEqual(self.nodes[3].potential, potential)
+
+    def test_unsupported_solver(self):
+        with self.assertRaises(ValueError):
+            TransientSolver(dt=1e-5, t_stop=1e-4).solve(self.circuit)
+
+    def test_nested_instance(self):
+        """Bloc contenant une instance : réduit puis aplati récursivement"""
+        leaf = Circuit()
+        a, b = leaf.create_node(0, 0), leaf.create_node(0, 0)
+        r_leaf = Resistor(leaf.get_next_dipole_id(), a, b, resistance=1e3)
+        leaf.add_dipole(r_leaf)
+        res = SubcircuitDefinition("res", leaf, [a, b])
+
+        # Diviseur dont la résistance du haut est une instance de "res"
+        inner = Circuit()
+        gnd = inner.create_node(0, 0, is_ground=True)
+        top, out = inner.create_node(0, 0), inner.create_node(0, 0)
+        inner.add_subcircuit(SubcircuitInstance(inner.get_next_subcircuit_id(), res, [top, out]))
+        inner.add_dipole(Resistor(inner.get_next_dipole_id(), out, gnd, resistance=1e3))
+        divider = SubcircuitDefinition("div", inner, [top, out])
+
+        circuit = Circuit()
+        n_gnd = circuit.create_node(0, 0, is_ground=True)
+        n_in, n_out = circuit.create_node(0, 0), circuit.create_node(0, 0)
+        circuit.add_dipole(VoltageSourceDC(circuit.get_next_dipole_id(), n_in, n_gnd, dc_voltage=10.0))
+        circuit.add_subcircuit(SubcircuitInstance(circuit.get_next_subcircuit_id(), divider, [n_in, n_out]))
+
+        DCSolver().solve(circuit)
+        self.assertAlmostEqual(n_out.potential, 5.0)
+        flat = circuit.flattened()
+        self.assertIn("div.res.Resistor", [d.name for d in flat.dipoles.values()])
+        DCSolver().solve(flat)
+        self.assertAlmostEqual(flat.nodes[n_out.id].potential, 5.0)
+
+        # Modifier le bloc le plus interne refait la réduction du bloc parent
+        r_leaf.resistance = 3e3
+        DCSolver().solve(circuit)
+        self.assertAlmostEqual(n_out.potential, 2.5)
+
+        inner.add_subcircuit(SubcircuitInstance(inner.get_next_subcircuit_id(), divider, [top, out]))
+        with self.assertRaises(ValueError):
+            DCSolver().solve(circuit)
+        with self.assertRaises(ValueError):
+            circuit.flattened()
+
+class TestACAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        # Filtre RC passe-bas (fc = 1/(2πRC) ≈ 159 Hz) et bobine vers une source DC
+        self.circuit = Circuit()
+        gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.n_in = self.circuit.create_node(0, 0)
+        self.n_out = self.circuit.create_node(0, 0)
+        n_dc = self.circuit.create_node(0, 0)
+        self.circuit.add_dipole(VoltageSourceAC(1, self.n_in, gnd, amplitude=2.0, phase=30.0))
+        self.circuit.add_dipole(Resistor(2, self.n_in, self.n_out, resistance=1e3))
+        self.circuit.add_dipole(Capacitor(3, self.n_out, gnd, capacitance=1e-6))
+        self.circuit.add_dipole(Inductor(4, self.n_out, n_dc, inductance=0.5))
+        self.circuit.add_dipole(VoltageSourceDC(5, n_dc, gnd, dc_voltage=5.0))
+
+    def expected(self, f):
+        jw = 2j * np.pi * f
+        z = 1.0 / (jw * 1e-6 + 1.0 / (jw * 0.5))
+        return 2.0 * np.exp(1j * np.radians(30.0)) * z / (1e3 + z)
+
+    def test_frequency_response(self):
+        result = ACAnalysis(f_start=10, f_stop=1e5, points_per_decade=10, workers=1).solve(self.circuit)
+        self.assertEqual(len(result), 41)
+        self.assertTrue(np.allclose(result.node(self.n_out.id), self.expected(result.frequencies)))
+        # Courant du condensateur : jωC V
+        jw = 2j * np.pi * result.frequencies
+        self.assertTrue(np.allclose(result.dipole(3), jw * 1e-6 * result.node(self.n_out.id)))
+
+        freqs, gain, phase = result.bode(self.n_out.id, self.n_in.id)
+        h = self.expected(freqs) / (2.0 * np.exp(1j * np.radians(30.0)))
+        self.assertTrue(np.allclose(gain, 20 * np.log10(np.abs(h))))
+        self.assertEqual(result.magnitude.shape, (41, 4))
+
+    def test_backends_and_pool(self):
+        """Mêmes résultats en dense, en creux et répartis sur un pool"""
+        freqs = np.logspace(0, 5, 30)
+        dense = ACAnalysis(workers=1, backend="dense").solve(self.circuit, freqs)
+        sparse = ACAnalysis(workers=1, backend="sparse").solve(self.circuit, freqs)
+        pooled = ACAnalysis(workers=2, batch_size=8).solve(self.circuit, freqs)
+        self.assertTrue(np.allclose(dense.node_phasors, sparse.node_phasors))
+        self.assertTrue(np.allclose(dense.node_phasors, pooled.node_phasors))
+
+    def test_sparse_ordering_reused(self):
+        """En creux, l'ordonnancement est calculé une fois pour tout le balayage"""
+        freqs = np.logspace(0, 5, 12)
+        dense = ACAnalysis(workers=1, backend="dense").solve(self.circuit, freqs)
+        with mock.patch.object(MatrixPattern, "_set_ordering", autospec=True,
+                               side_effect=MatrixPattern._set_ordering) as set_ordering:
+            sparse = ACAnalysis(workers=1, backend="sparse").solve(self.circuit, freqs)
+        self.assertEqual(set_ordering.call_count, 1)
+        self.assertTrue(np.allclose(dense.node_phasors, sparse.node_phasors))
+
+    def test_small_sweep_stays_serial(self):
+        """Par défaut, pas de pool de processus pour un petit circuit"""
+        with mock.patch("solver.ac_solver.ProcessPoolExecutor", side_effect=AssertionError):
+            result = ACAnalysis().solve(self.circuit)
+        self.assertEqual(len(result), 121)
+
+    def test_invalid_frequency(self):
+        with self.assertRaises(ValueError):
+            ACAnalysis(workers=1).solve(self.circuit, [0.0, 10.0])
+
+class TestPeriodicSteadyState(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+        self.gnd = self.circuit.create_node(0, 0, is_ground=True)
+        self.n_src = self.circuit.create_node(0, 0)
+        self.n_out = self.circuit.create_node(0, 0)
+
+    def test_rc_steady_state(self):
+        """RC (tau = 10 ms) attaqué en 50 Hz avec offset : période établie directement"""
+        self.circuit.add_dipole(VoltageSourceAC(1, self.n_src, self.gnd, amplitude=10.0, frequency=50.0,
+                                                phase=30.0, offset=2.0))
+        self.circuit.add_dipole(Resistor(2, self.n_src, self.n_out, resistance=100.0))
+        self.circuit.add_dipole(Capacitor(3, self.n_out, self.gnd, capacitance=100e-6))
+
+        result = PeriodicSteadyState(points_per_period=64).solve(self.circuit)
+        self.assertAlmostEqual(result.stats["period"], 0.02)
+        self.assertEqual(len(result), 65)
+        t = result.times
+        h = 1.0 / (1.0 + 2j * np.pi * 50.0 * 1e-2)
+        expected = 2.0 + 10.0 * np.abs(h) * np.sin(2 * np.pi * 50.0 * t + np.radians(30.0) + np.angle(h))
+        self.assertTrue(np.allclose(result.node(self.n_out.id), expected, atol=1e-9))
+        self.assertAlmostEqual(self.n_out.potential, expected[0], places=9)
+
+    def test_inductor_dc_and_harmonics(self):
+        """Courant continu des bobines (court-circuit) et période commune de 50 et 150 Hz"""
+        self.circuit.add_dipole(VoltageSourceAC(1, self.n_src, self.gnd, amplitude=1.0, frequency=50.0, offset=5.0))
+        self.circuit.add_dipole(Inductor(2, self.n_src, self.n_out, inductance=0.1))
+        self.circuit.add_dipole(Resistor(3, self.n_out, self.gnd, resistance=10.0))
+        n3 = self.circuit.create_node(0, 0)
+        self.circuit.add_dipole(VoltageSourceAC(4, n3, self.gnd, amplitude=1.0, frequency=150.0))
+        self.circuit.add_dipole(Resistor(5, n3, self.n_out, resistance=10.0))
+
+        result = PeriodicSteadyState(points_per_period=300).solve(self.circuit)
+        self.assertAlmostEqual(result.stats["period"], 0.02)
+        self.assertEqual(result.stats["harmonics"], [50.0, 150.0])
+        # Moyenne sur une période : composante continue seule (5 V sur 10 Ohm // 10 Ohm)
+        self.assertAlmostEqual(np.mean(result.dipole(2)[:-1]), 5.0 / 10.0 + 5.0 / 10.0, places=9)
+
+    def test_incommensurate_frequencies(self):
+        self.circuit.add_dipole(VoltageSourceAC(1, self.n_src, self.gnd, frequency=50.0))
+        self.circuit.add_dipole(VoltageSourceAC(2, self.n_out, self.gnd, frequency=50.0 * np.sqrt(2)))
+        self.circuit.add_dipole(Resistor(3, self.n_src, self.n_out, resistance=10.0))
+        with self.assertRaises(ValueError):
+            PeriodicSteadyState().solve(self.circuit)
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.circuit = Circuit()
+        gnd = self.circuit.create_node(0, 0, is_ground=True)
+        n1 = self.circuit.create_node(0, 0)
+        n2 = self.circuit.create_node(0, 0)
+        self.circuit.add_dipole(VoltageSourceDC(1, n1, gnd, dc_voltage=10.0))
+        self.circuit.add_dipole(Resistor(2, n1, n2, resistance=1000.0))
+        self.circuit.add_dipole(Resistor(3, n2, gnd, resistance=1000.0))
+
+    def test_dc_phases_and_matrix(self):
+        solver = DCSolver()
+        profile = SolverProfile(condition=True, allocations=True)
+        solver.add_observer(profile)
+        solver.solve(self.circuit)
+        solver.solve(self.circuit)
+        profile.close()
+
+        self.assertEqual(list(profile.phases), ["group", "compile", "check", "assemble", "solve", "distribute"])
+        self.assertEqual(profile.phases["solve"]["calls"], 2)
+        self.assertIn("peak_bytes", profile.phases["assemble"])
+        matrix = profile.matrices[0]
+        self.assertEqual((matrix["size"], matrix["backend"]), (3, "dense"))
+        self.assertGreater(matrix["condition"], 1.0)
+
+        solver.remove_observer(profile)
+        solver.solve(self.circuit)
+        self.assertEqual(profile.phases["solve"]["calls"], 2)
+
+    def test_condition_estimate(self):
+        """Estimation gecon / onenormest proche du conditionnement exact en norme 1"""
+        rng = np.random.default_rng(1)
+        rows, cols = np.nonzero(rng.random((30, 30)) < 0.2)
+        vals = rng.normal(size=len(rows))
+        diag = np.arange(30)
+        rows, cols = np.concatenate((rows, diag)), np.concatenate((cols, diag))
+        vals = np.concatenate((vals, np.full(30, 5.0)))
+        exact = np.linalg.cond(build_matrix(rows, cols, vals, 30, False), 1)
+        for sparse in (False, True):
+            estimate = condition_estimate(build_matrix(rows, cols, vals, 30, sparse))
+            self.assertLessEqual(estimate, exact * 1.0001)
+            self.assertGreater(estimate, exact / 3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file